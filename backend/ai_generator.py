@@ -1,4 +1,16 @@
-from typing import Any, Dict, List, Optional
+import asyncio
+import threading
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
 
 import anthropic
 
@@ -39,8 +51,16 @@ All responses must be:
 Provide only the direct answer to what was asked.
 """
 
+    # Requests put tools, then this system prompt, first; the breakpoint lets
+    # the API cache that identical prefix instead of re-processing it per call
+    CACHE_CONTROL = {"type": "ephemeral"}
+    SYSTEM_BLOCKS = [
+        {"type": "text", "text": SYSTEM_PROMPT, "cache_control": CACHE_CONTROL}
+    ]
+
     def __init__(self, api_key: str, model: str):
         self.client = anthropic.Anthropic(api_key=api_key)
+        self.async_client = anthropic.AsyncAnthropic(api_key=api_key)
         self.model = model
 
         # Pre-build base API parameters
@@ -50,6 +70,16 @@ Provide only the direct answer to what was asked.
             "max_tokens": 1200,  # Increased to handle complex multi-round responses
         }
 
+        # Token counts summed over all API calls, including prompt cache use
+        self._usage_lock = threading.Lock()
+        self.usage = {
+            "requests": 0,
+            "input_tokens": 0,
+            "output_tokens": 0,
+            "cache_creation_input_tokens": 0,
+            "cache_read_input_tokens": 0,
+        }
+
     def _extract_text_from_response(self, response) -> str:
         """
         Safely extract text content from an Anthropic API response.
@@ -81,51 +111,124 @@ Provide only the direct answer to what was asked.
             f"Content blocks: {block_types}"
         )
 
-    def _build_system_content(self, conversation_history: Optional[str]) -> str:
+    def _build_messages(
+        self,
+        query: str,
+        conversation_history: Optional[Union[str, List[Dict[str, str]]]],
+    ) -> List[Dict[str, Any]]:
         """
-        Build system prompt with conversation history if provided.
+        Build the initial messages: previous turns, then the query.
+
+        History stays out of the system prompt so the cached prefix is the
+        same for every conversation.
 
         Args:
-            conversation_history: Previous messages for context
+            query: The user's question or request
+            conversation_history: Previous messages as role/content dicts, or
+                a formatted transcript string
 
         Returns:
-            Complete system content string
+            Messages list for the API
+        """
+        if not conversation_history:
+            return [{"role": "user", "content": query}]
+        if isinstance(conversation_history, str):
+            return [
+                {
+                    "role": "user",
+                    "content": f"Previous conversation:\n{conversation_history}"
+                    f"\n\n{query}",
+                }
+            ]
+        return [dict(message) for message in conversation_history] + [
+            {"role": "user", "content": query}
+        ]
+
+    def _with_cache_breakpoint(self, messages: List[Dict]) -> List[Dict]:
+        """
+        Copy of messages with a cache breakpoint on the last message.
+
+        Each tool round then reads the prefix written by the round before it.
+        The stored messages are left unmarked, so at most this breakpoint and
+        the system prompt's are sent.
+        """
+        last = messages[-1]
+        content = last["content"]
+        if isinstance(content, str):
+            content = [{"type": "text", "text": content}]
+        content = list(content)
+        content[-1] = {**content[-1], "cache_control": self.CACHE_CONTROL}
+        return messages[:-1] + [{**last, "content": content}]
+
+    def _record_usage(self, response):
+        """Add a response's token counts to the usage totals"""
+        usage = getattr(response, "usage", None)
+        with self._usage_lock:
+            self.usage["requests"] += 1
+            for key in self.usage:
+                value = getattr(usage, key, None)
+                if key != "requests" and isinstance(value, int):
+                    self.usage[key] += value
+
+    def get_usage_stats(self) -> Dict[str, Any]:
+        """
+        Token usage over all API calls, with the prompt cache hit rate.
+
+        cache_hit_rate is the share of prompt tokens read from the cache.
         """
-        if conversation_history:
-            return f"{self.SYSTEM_PROMPT}\n\nPrevious conversation:\n{conversation_history}"
-        return self.SYSTEM_PROMPT
+        with self._usage_lock:
+            stats = dict(self.usage)
+        prompt_tokens = (
+            stats["input_tokens"]
+            + stats["cache_creation_input_tokens"]
+            + stats["cache_read_input_tokens"]
+        )
+        stats["cache_hit_rate"] = (
+            stats["cache_read_input_tokens"] / prompt_tokens if prompt_tokens else 0.0
+        )
+        return stats
 
-    def _execute_tools(self, response, tool_manager) -> List[Dict]:
+    def _execute_tools(self, response, tool_manager, run_tools=None) -> List[Dict]:
         """
         Execute all tools from a response containing tool_use blocks.
 
         Args:
             response: API response containing tool_use content blocks
             tool_manager: Manager to execute tools
+            run_tools: Optional callable used instead of tool_manager.execute_tools
 
         Returns:
             List of tool result dictionaries
         """
-        tool_results = []
-        for content_block in response.content:
-            if content_block.type == "tool_use":
-                try:
-                    tool_result = tool_manager.execute_tool(
-                        content_block.name, **content_block.input
-                    )
-                except Exception as e:
-                    tool_result = f"Error executing tool {content_block.name}: {str(e)}"
-
-                tool_results.append(
-                    {
-                        "type": "tool_result",
-                        "tool_use_id": content_block.id,
-                        "content": tool_result,
-                    }
-                )
-        return tool_results
+        # Searches from the same round run as one batch
+        tool_blocks = self._tool_blocks(response)
+        outputs = (run_tools or tool_manager.execute_tools)(
+            [(content_block.name, content_block.input) for content_block in tool_blocks]
+        )
+        return self._tool_results(tool_blocks, outputs)
+
+    @staticmethod
+    def _tool_blocks(response) -> List[Any]:
+        """Get the tool_use content blocks of a response"""
+        return [
+            content_block
+            for content_block in response.content
+            if content_block.type == "tool_use"
+        ]
+
+    @staticmethod
+    def _tool_results(tool_blocks: List[Any], outputs: List[str]) -> List[Dict]:
+        """Pair tool outputs with the tool_use blocks they answer"""
+        return [
+            {
+                "type": "tool_result",
+                "tool_use_id": content_block.id,
+                "content": tool_result,
+            }
+            for content_block, tool_result in zip(tool_blocks, outputs)
+        ]
 
-    def _final_synthesis(self, messages: List, system_content: str) -> str:
+    def _final_synthesis(self, messages: List, system_content: List[Dict]) -> str:
         """
         Make final API call without tools for response synthesis.
         If Claude returns empty response (wants more tools but can't use them),
@@ -133,40 +236,48 @@ Provide only the direct answer to what was asked.
 
         Args:
             messages: Complete message history including tool results
-            system_content: System prompt content
+            system_content: System prompt blocks
 
         Returns:
             Final synthesized response text
         """
         final_params = {
             **self.base_params,
-            "messages": messages,
+            "messages": self._with_cache_breakpoint(messages),
             "system": system_content,
         }
 
         try:
             final_response = self.client.messages.create(**final_params)
+            self._record_usage(final_response)
             return self._extract_text_from_response(final_response)
         except ValueError as e:
-            # Claude returned empty response or no text content
-            # This happens when max_rounds is reached but Claude wants more tool calls
-            print(f"Warning: Final synthesis returned no content: {e}")
-            print("Falling back to summarizing available tool results")
-
-            # Provide a fallback response based on the query
-            return (
-                "I've searched through the course materials but need more tool calls "
-                "to fully answer your question. Please try asking a more specific question, "
-                "or break your question into smaller parts."
-            )
+            return self._synthesis_fallback(e)
+
+    def _synthesis_fallback(self, error: ValueError) -> str:
+        """Response used when the final synthesis call returns no text"""
+        # Claude returned empty response or no text content
+        # This happens when max_rounds is reached but Claude wants more tool calls
+        print(f"Warning: Final synthesis returned no content: {error}")
+        print("Falling back to summarizing available tool results")
+
+        # Provide a fallback response based on the query
+        return (
+            "I've searched through the course materials but need more tool calls "
+            "to fully answer your question. Please try asking a more specific question, "
+            "or break your question into smaller parts."
+        )
 
     def generate_response(
         self,
         query: str,
-        conversation_history: Optional[str] = None,
+        conversation_history: Optional[Union[str, List[Dict[str, str]]]] = None,
         tools: Optional[List] = None,
         tool_manager=None,
         max_rounds: int = 2,
+        run_tools: Optional[
+            Callable[[List[Tuple[str, Dict[str, Any]]]], List[str]]
+        ] = None,
     ) -> str:
         """
         Generate AI response with iterative tool usage support (up to max_rounds).
@@ -177,23 +288,25 @@ Provide only the direct answer to what was asked.
             tools: Available tools the AI can use
             tool_manager: Manager to execute tools
             max_rounds: Maximum sequential tool calling rounds (default: 2)
+            run_tools: Optional callable that executes one round's
+                (tool name, input) calls instead of tool_manager.execute_tools
 
         Returns:
             Generated response as string
         """
 
-        # Build system content
-        system_content = self._build_system_content(conversation_history)
+        # Static system prompt; history goes into the messages
+        system_content = self.SYSTEM_BLOCKS
 
         # Initialize messages list
-        messages = [{"role": "user", "content": query}]
+        messages = self._build_messages(query, conversation_history)
 
         # Iterative tool calling loop
         for round_num in range(1, max_rounds + 1):
             # Prepare API call parameters
             api_params = {
                 **self.base_params,
-                "messages": messages,
+                "messages": self._with_cache_breakpoint(messages),
                 "system": system_content,
             }
 
@@ -204,6 +317,7 @@ Provide only the direct answer to what was asked.
 
             # Make API call
             response = self.client.messages.create(**api_params)
+            self._record_usage(response)
 
             # Check if Claude used tools
             if response.stop_reason == "tool_use" and tool_manager:
@@ -211,7 +325,7 @@ Provide only the direct answer to what was asked.
                 messages.append({"role": "assistant", "content": response.content})
 
                 # Execute tools and get results
-                tool_results = self._execute_tools(response, tool_manager)
+                tool_results = self._execute_tools(response, tool_manager, run_tools)
 
                 # Add tool results to messages
                 if tool_results:
@@ -225,3 +339,176 @@ Provide only the direct answer to what was asked.
 
         # Max rounds reached - make final synthesis call without tools
         return self._final_synthesis(messages, system_content)
+
+    async def agenerate_response(
+        self,
+        query: str,
+        conversation_history: Optional[Union[str, List[Dict[str, str]]]] = None,
+        tools: Optional[List] = None,
+        tool_manager=None,
+        max_rounds: int = 2,
+        run_tools: Optional[
+            Callable[[List[Tuple[str, Dict[str, Any]]]], Awaitable[List[str]]]
+        ] = None,
+    ) -> str:
+        """
+        Async version of generate_response that never blocks the event loop.
+
+        API calls are awaited on the async client. Each round's tool calls are
+        passed as (name, input) pairs to run_tools, which returns their outputs;
+        without it, tool_manager.execute_tools runs in a worker thread.
+
+        Args:
+            query: The user's question or request
+            conversation_history: Previous messages for context
+            tools: Available tools the AI can use
+            tool_manager: Manager to execute tools
+            max_rounds: Maximum sequential tool calling rounds (default: 2)
+            run_tools: Optional async tool executor used instead of tool_manager
+
+        Returns:
+            Generated response as string
+        """
+        if run_tools is None and tool_manager:
+
+            async def run_tools(calls):
+                return await asyncio.to_thread(tool_manager.execute_tools, calls)
+
+        system_content = self.SYSTEM_BLOCKS
+        messages = self._build_messages(query, conversation_history)
+
+        for round_num in range(1, max_rounds + 1):
+            api_params = {
+                **self.base_params,
+                "messages": self._with_cache_breakpoint(messages),
+                "system": system_content,
+            }
+            if tools:
+                api_params["tools"] = tools
+                api_params["tool_choice"] = {"type": "auto"}
+
+            response = await self.async_client.messages.create(**api_params)
+            self._record_usage(response)
+
+            if response.stop_reason == "tool_use" and run_tools:
+                messages.append({"role": "assistant", "content": response.content})
+
+                tool_blocks = self._tool_blocks(response)
+                outputs = await run_tools(
+                    [
+                        (content_block.name, content_block.input)
+                        for content_block in tool_blocks
+                    ]
+                )
+                tool_results = self._tool_results(tool_blocks, outputs)
+                if tool_results:
+                    messages.append({"role": "user", "content": tool_results})
+                continue
+
+            return self._extract_text_from_response(response)
+
+        # Max rounds reached - make final synthesis call without tools
+        try:
+            final_response = await self.async_client.messages.create(
+                **self.base_params,
+                messages=self._with_cache_breakpoint(messages),
+                system=system_content,
+            )
+            self._record_usage(final_response)
+            return self._extract_text_from_response(final_response)
+        except ValueError as e:
+            return self._synthesis_fallback(e)
+
+    async def astream_response(
+        self,
+        query: str,
+        conversation_history: Optional[Union[str, List[Dict[str, str]]]] = None,
+        tools: Optional[List] = None,
+        tool_manager=None,
+        max_rounds: int = 2,
+        run_tools: Optional[
+            Callable[[List[Tuple[str, Dict[str, Any]]]], Awaitable[List[str]]]
+        ] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream a response as events while the tool loop runs.
+
+        Every round uses the streaming API and yields {"type": "text", "text"}
+        for each text delta as it arrives. If a round then ends in tool calls,
+        its text was a remark such as "Let me search..." rather than the
+        answer: {"type": "status", "text"} repeats it so consumers can drop
+        it from the answer, followed by {"type": "tool", "name", "input"}
+        before each tool call runs. Tool calls are executed as in
+        agenerate_response.
+
+        Raises:
+            ValueError: If a round ends without tool use or any text
+        """
+        if run_tools is None and tool_manager:
+
+            async def run_tools(calls):
+                return await asyncio.to_thread(tool_manager.execute_tools, calls)
+
+        system_content = self.SYSTEM_BLOCKS
+        messages = self._build_messages(query, conversation_history)
+
+        for round_num in range(1, max_rounds + 2):
+            api_params = {
+                **self.base_params,
+                "messages": self._with_cache_breakpoint(messages),
+                "system": system_content,
+            }
+            # The round after max_rounds is the final synthesis, without tools
+            final_round = round_num > max_rounds
+            if tools and not final_round:
+                api_params["tools"] = tools
+                api_params["tool_choice"] = {"type": "auto"}
+
+            streamed: List[str] = []
+            async with self.async_client.messages.stream(**api_params) as stream:
+                async for text in stream.text_stream:
+                    if not text:
+                        continue
+                    streamed.append(text)
+                    yield {"type": "text", "text": text}
+                response = await stream.get_final_message()
+            self._record_usage(response)
+
+            if final_round:
+                if not streamed:
+                    yield {
+                        "type": "text",
+                        "text": self._synthesis_fallback(
+                            ValueError(f"Stop reason: {response.stop_reason}")
+                        ),
+                    }
+                return
+
+            if response.stop_reason == "tool_use" and run_tools:
+                messages.append({"role": "assistant", "content": response.content})
+
+                # The round's text turned out to precede tool calls
+                if streamed:
+                    yield {"type": "status", "text": "".join(streamed)}
+
+                tool_blocks = self._tool_blocks(response)
+                for content_block in tool_blocks:
+                    yield {
+                        "type": "tool",
+                        "name": content_block.name,
+                        "input": content_block.input,
+                    }
+                outputs = await run_tools(
+                    [
+                        (content_block.name, content_block.input)
+                        for content_block in tool_blocks
+                    ]
+                )
+                tool_results = self._tool_results(tool_blocks, outputs)
+                if tool_results:
+                    messages.append({"role": "user", "content": tool_results})
+                continue
+
+            if not streamed:
+                self._extract_text_from_response(response)
+            return
@@ -2,14 +2,18 @@ import warnings
 
 warnings.filterwarnings("ignore", message="resource_tracker: There appear to be.*")
 
+import json
 import os
-from typing import Dict, List, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional
 
 from config import config
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
+from fastapi.responses import StreamingResponse
 from fastapi.staticfiles import StaticFiles
+from folder_watcher import FolderWatcher
+from ingest_jobs import IngestJob, IngestJobManager, resolve_ingest_paths
 from pydantic import BaseModel
 from rag_system import RAGSystem
 
@@ -32,6 +36,12 @@ app.add_middleware(
 # Initialize RAG system
 rag_system = RAGSystem(config)
 
+# Background ingestion runs on a single worker so startup never blocks
+ingest_jobs = IngestJobManager(rag_system)
+
+# Optional watcher that queues incremental re-indexing of the docs folder
+docs_watcher: Optional[FolderWatcher] = None
+
 
 # Pydantic models for request/response
 class QueryRequest(BaseModel):
@@ -56,6 +66,32 @@ class CourseStats(BaseModel):
     course_titles: List[str]
 
 
+class IngestRequest(BaseModel):
+    """Request model for queuing course folders or files for ingestion"""
+
+    paths: List[str]
+    clear_existing: bool = False
+
+
+class IngestJobStatus(BaseModel):
+    """Response model for ingestion job progress"""
+
+    job_id: str
+    paths: List[str]
+    status: str
+    created_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    current_path: Optional[str] = None
+    files_total: int
+    files_done: int
+    courses_added: int
+    chunks_added: int
+    courses_removed: int = 0
+    error: Optional[str] = None
+    file_errors: Dict[str, str] = {}
+
+
 # API Endpoints
 
 
@@ -68,36 +104,75 @@ async def query_documents(request: QueryRequest):
         if not session_id:
             session_id = rag_system.session_manager.create_session()
 
-        # Process query using RAG system
-        answer, sources = rag_system.query(request.query, session_id)
+        # Process query using RAG system without blocking the event loop
+        answer, sources = await rag_system.aquery(request.query, session_id)
 
         return QueryResponse(answer=answer, sources=sources, session_id=session_id)
     except Exception as e:
-        # Log error details for debugging
-        error_msg = str(e)
-        print(f"Error processing query: {error_msg}")
-
-        # Import traceback for detailed error logging
-        import traceback
-
-        print(traceback.format_exc())
-
-        # Provide helpful error messages for common issues
-        if "API key" in error_msg or "authentication" in error_msg.lower():
-            detail = "Authentication error: Please check your Anthropic API key in the .env file"
-        elif "vector store" in error_msg.lower() or "chroma" in error_msg.lower():
-            detail = "Database error: Unable to search course content"
-        elif "rate limit" in error_msg.lower():
-            detail = "Rate limit exceeded: Please try again in a moment"
-        elif (
-            "No text content found" in error_msg
-            or "list index out of range" in error_msg
-        ):
-            detail = "Response processing error: The AI returned an unexpected response format. Please try rephrasing your question."
-        else:
-            detail = f"An error occurred while processing your query: {error_msg}"
+        raise HTTPException(status_code=500, detail=query_error_detail(e))
+
+
+@app.post("/api/query/stream")
+async def stream_query(request: QueryRequest):
+    """
+    Process a query and stream the response as Server-Sent Events.
+
+    Events, in order: "session" with the session ID, "text" for each piece
+    of text as Claude writes it, "status" when a round's text turns out to
+    precede tool calls (clients drop it from the answer), "tool" for each
+    tool call, "sources" once the answer is complete, then "done". A failure
+    ends the stream with an "error" event.
+    """
+    session_id = request.session_id
+    if not session_id:
+        session_id = rag_system.session_manager.create_session()
+
+    async def events() -> AsyncIterator[str]:
+        yield sse_event("session", {"session_id": session_id})
+        try:
+            async for event in rag_system.astream_query(request.query, session_id):
+                yield sse_event(event.pop("type"), event)
+        except Exception as e:
+            yield sse_event("error", {"detail": query_error_detail(e)})
+            return
+        yield sse_event("done", {})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def sse_event(event: str, data: Dict[str, Any]) -> str:
+    """Format one Server-Sent Event with a JSON payload"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
 
-        raise HTTPException(status_code=500, detail=detail)
+def query_error_detail(error: Exception) -> str:
+    """Log a failed query and turn its error into a message for the user"""
+    # Log error details for debugging
+    error_msg = str(error)
+    print(f"Error processing query: {error_msg}")
+
+    # Import traceback for detailed error logging
+    import traceback
+
+    print(traceback.format_exc())
+
+    # Provide helpful error messages for common issues
+    if "API key" in error_msg or "authentication" in error_msg.lower():
+        return (
+            "Authentication error: Please check your Anthropic API key in the .env file"
+        )
+    elif "vector store" in error_msg.lower() or "chroma" in error_msg.lower():
+        return "Database error: Unable to search course content"
+    elif "rate limit" in error_msg.lower():
+        return "Rate limit exceeded: Please try again in a moment"
+    elif "No text content found" in error_msg or "list index out of range" in error_msg:
+        return "Response processing error: The AI returned an unexpected response format. Please try rephrasing your question."
+    else:
+        return f"An error occurred while processing your query: {error_msg}"
 
 
 @app.get("/api/courses", response_model=CourseStats)
@@ -113,6 +188,41 @@ async def get_course_stats():
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.get("/api/cache-stats")
+async def get_cache_stats() -> Dict[str, Dict[str, Any]]:
+    """Get hit/miss counters for the query caches"""
+    return rag_system.get_cache_stats()
+
+
+@app.post("/api/ingest", response_model=IngestJobStatus, status_code=202)
+async def enqueue_ingest(request: IngestRequest):
+    """Queue course folders or files under the docs folder for ingestion"""
+    if not request.paths:
+        raise HTTPException(status_code=400, detail="No paths given")
+    if request.clear_existing and not config.INGEST_ALLOW_CLEAR:
+        raise HTTPException(
+            status_code=403, detail="Clearing the index is disabled on this server"
+        )
+    try:
+        paths = resolve_ingest_paths(request.paths, config.DOCS_PATH)
+    except PermissionError as e:
+        raise HTTPException(status_code=403, detail=str(e))
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+    job = ingest_jobs.submit(paths, clear_existing=request.clear_existing)
+    return IngestJobStatus(**job.to_dict())
+
+
+@app.get("/api/ingest/{job_id}", response_model=IngestJobStatus)
+async def get_ingest_status(job_id: str):
+    """Get progress of a background ingestion job"""
+    job = ingest_jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Unknown ingest job: {job_id}")
+    return IngestJobStatus(**job.to_dict())
+
+
 @app.on_event("startup")
 async def startup_event():
     """Validate configuration and load initial documents on startup"""
@@ -135,21 +245,53 @@ async def startup_event():
     else:
         print(f"✓ MAX_RESULTS configured: {config.MAX_RESULTS}")
 
-    # Load initial documents
-    docs_path = "../docs"
+    # Load initial documents in the background; queries are served meanwhile
+    docs_path = config.DOCS_PATH
     if os.path.exists(docs_path):
-        print("Loading initial documents...")
-        try:
-            courses, chunks = rag_system.add_course_folder(
-                docs_path, clear_existing=False
-            )
-            print(f"✓ Loaded {courses} courses with {chunks} chunks")
-        except Exception as e:
-            print(f"Error loading documents: {e}")
+        job = ingest_jobs.submit([docs_path])
+        print(f"✓ Queued initial documents for ingestion (job {job.job_id})")
+        if config.WATCH_DOCS:
+            start_docs_watcher(docs_path)
     else:
         print(f"WARNING: Documents folder '{docs_path}' not found")
 
 
+def start_docs_watcher(docs_path: str):
+    """Re-index course files in docs_path as they are created, edited or deleted"""
+    global docs_watcher
+
+    def retry_failures(job: IngestJob):
+        # Files that did not make it into the index are picked up again
+        if job.status == "failed":
+            docs_watcher.retry(job.paths, job.removed_paths)
+        else:
+            docs_watcher.retry(list(job.file_errors))
+
+    def queue_changes(changed: List[str], deleted: List[str]):
+        job = ingest_jobs.submit(changed, removed_paths=deleted, on_done=retry_failures)
+        print(
+            f"Detected {len(changed)} changed and {len(deleted)} deleted course "
+            f"files (job {job.job_id})"
+        )
+
+    docs_watcher = FolderWatcher(
+        docs_path,
+        queue_changes,
+        debounce_seconds=config.WATCH_DEBOUNCE_SECONDS,
+        poll_interval=config.WATCH_POLL_INTERVAL,
+    )
+    docs_watcher.start()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop watching, cancel queued ingestion and let a running job finish"""
+    if docs_watcher:
+        docs_watcher.stop(timeout=5)
+    ingest_jobs.shutdown(timeout=5)
+    rag_system.query_executor.shutdown(wait=False)
+
+
 import os
 from pathlib import Path
 
@@ -0,0 +1,123 @@
+"""
+Benchmark DocumentProcessor.chunk_text against the previous implementation.
+
+Chunks the shipped docs/ scripts and synthetic versions scaled 100x, checks
+that both implementations produce identical chunks, and reports timings.
+
+Usage (from the backend directory):
+    uv run python benchmarks/bench_chunk_text.py [--scale 100] [--repeat 3]
+"""
+
+import argparse
+import os
+import re
+import sys
+import time
+from typing import List
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from config import config
+from document_processor import DocumentProcessor
+
+DOCS_PATH = os.path.join(os.path.dirname(__file__), "..", "..", "docs")
+
+
+def legacy_chunk_text(text: str, chunk_size: int, chunk_overlap: int) -> List[str]:
+    """The original quadratic chunk_text, kept as the reference implementation"""
+    text = re.sub(r"\s+", " ", text.strip())
+    sentence_endings = re.compile(
+        r"(?<!\w\.\w.)(?<![A-Z][a-z]\.)(?<=\.|\!|\?)\s+(?=[A-Z])"
+    )
+    sentences = sentence_endings.split(text)
+    sentences = [s.strip() for s in sentences if s.strip()]
+
+    chunks = []
+    i = 0
+    while i < len(sentences):
+        current_chunk = []
+        current_size = 0
+        for j in range(i, len(sentences)):
+            sentence = sentences[j]
+            space_size = 1 if current_chunk else 0
+            total_addition = len(sentence) + space_size
+            if current_size + total_addition > chunk_size and current_chunk:
+                break
+            current_chunk.append(sentence)
+            current_size += total_addition
+
+        if current_chunk:
+            chunks.append(" ".join(current_chunk))
+            if chunk_overlap > 0:
+                overlap_size = 0
+                overlap_sentences = 0
+                for k in range(len(current_chunk) - 1, -1, -1):
+                    sentence_len = len(current_chunk[k]) + (
+                        1 if k < len(current_chunk) - 1 else 0
+                    )
+                    if overlap_size + sentence_len <= chunk_overlap:
+                        overlap_size += sentence_len
+                        overlap_sentences += 1
+                    else:
+                        break
+                next_start = i + len(current_chunk) - overlap_sentences
+                i = max(next_start, i + 1)
+            else:
+                i += len(current_chunk)
+        else:
+            i += 1
+
+    return chunks
+
+
+def best_time(func, repeat: int) -> float:
+    """Run func repeat times and return the fastest wall time in seconds"""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scale", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    chunk_size, chunk_overlap = config.CHUNK_SIZE, config.CHUNK_OVERLAP
+    processor = DocumentProcessor(chunk_size, chunk_overlap)
+
+    corpora = []
+    for file_name in sorted(os.listdir(DOCS_PATH)):
+        with open(os.path.join(DOCS_PATH, file_name), encoding="utf-8") as file:
+            text = file.read()
+        corpora.append((file_name, text))
+        corpora.append((f"{file_name} x{args.scale}", "\n".join([text] * args.scale)))
+
+    print(f"chunk_size={chunk_size} chunk_overlap={chunk_overlap}")
+    print(
+        f"{'corpus':<28}{'MB':>8}{'chunks':>9}{'legacy s':>11}"
+        f"{'new s':>9}{'speedup':>9}{'MB/s':>8}"
+    )
+    for name, text in corpora:
+        expected = legacy_chunk_text(text, chunk_size, chunk_overlap)
+        actual = processor.chunk_text(text)
+        if actual != expected:
+            raise SystemExit(f"Output mismatch for {name}")
+
+        legacy_seconds = best_time(
+            lambda: legacy_chunk_text(text, chunk_size, chunk_overlap), args.repeat
+        )
+        new_seconds = best_time(lambda: processor.chunk_text(text), args.repeat)
+        megabytes = len(text.encode("utf-8")) / 1e6
+        print(
+            f"{name:<28}{megabytes:>8.2f}{len(actual):>9}{legacy_seconds:>11.3f}"
+            f"{new_seconds:>9.3f}{legacy_seconds / new_seconds:>8.1f}x"
+            f"{megabytes / new_seconds:>8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
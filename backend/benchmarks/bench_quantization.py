@@ -0,0 +1,129 @@
+"""
+Benchmark int8 and binary quantized search against exact float32 search.
+
+Runs the NumPy backend over the shipped docs/ courses (chunked and embedded
+with the configured model, queried with their lesson titles) and over a
+synthetic clustered corpus of MiniLM-sized vectors. For each quantization
+and rerank factor it reports the bytes a full scan reads, query latency and
+recall@k against exact search.
+
+Usage (from the backend directory):
+    uv run python benchmarks/bench_quantization.py [--rows 50000] [--skip-shipped]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from vector_backends import NumpyCollection
+
+DOCS_PATH = os.path.join(os.path.dirname(__file__), "..", "..", "docs")
+MODES = [("none", 1), ("int8", 2), ("int8", 8), ("binary", 8), ("binary", 32)]
+
+
+def shipped_corpus():
+    """Chunk embeddings of the docs/ courses and their lesson titles as queries"""
+    from chromadb.utils.embedding_functions import (
+        SentenceTransformerEmbeddingFunction,
+    )
+    from config import config
+    from document_processor import DocumentProcessor
+
+    processor = DocumentProcessor(config.CHUNK_SIZE, config.CHUNK_OVERLAP)
+    embed = SentenceTransformerEmbeddingFunction(model_name=config.EMBEDDING_MODEL)
+    documents, titles = [], []
+    for file_name in sorted(os.listdir(DOCS_PATH)):
+        course, chunks = processor.process_course_document(
+            os.path.join(DOCS_PATH, file_name)
+        )
+        documents.extend(chunk.content for chunk in chunks)
+        titles.extend(lesson.title for lesson in course.lessons)
+    return np.asarray(embed(documents), np.float32), np.asarray(embed(titles))
+
+
+def synthetic_corpus(rows: int, queries: int, dimensions: int, clusters: int):
+    """Clustered unit vectors, and queries near random corpus rows"""
+    rng = np.random.default_rng(0)
+    centers = rng.standard_normal((clusters, dimensions))
+    vectors = centers[rng.integers(0, clusters, rows)]
+    vectors += 0.7 * rng.standard_normal((rows, dimensions))
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    picked = vectors[rng.integers(0, rows, queries)]
+    noisy = picked + 0.3 * rng.standard_normal(picked.shape) / np.sqrt(dimensions)
+    return vectors.astype(np.float32), noisy.astype(np.float32)
+
+
+def run(name: str, vectors: np.ndarray, queries: np.ndarray, top_k: int):
+    print(
+        f"\n{name}: {len(vectors)} vectors x {vectors.shape[1]} dims, "
+        f"{len(queries)} queries, top_k={top_k}"
+    )
+    print(f"{'mode':<10}{'rerank':>7}{'scan MB':>9}{'query ms':>10}{'recall':>8}")
+
+    exact_ids = None
+    with tempfile.TemporaryDirectory() as directory:
+        for quantization, rerank_factor in MODES:
+            collection = NumpyCollection(
+                os.path.join(directory, f"{quantization}-{rerank_factor}"),
+                None,
+                quantization=quantization,
+                rerank_factor=rerank_factor,
+            )
+            ids = [str(i) for i in range(len(vectors))]
+            for start in range(0, len(vectors), 10_000):
+                collection.add(
+                    ids=ids[start : start + 10_000],
+                    embeddings=vectors[start : start + 10_000],
+                )
+
+            started = time.perf_counter()
+            found = [
+                collection.query(query_embeddings=[query], n_results=top_k)["ids"][0]
+                for query in queries
+            ]
+            seconds = time.perf_counter() - started
+
+            if exact_ids is None:
+                exact_ids = found
+            recall = np.mean(
+                [
+                    len(set(got) & set(expected)) / len(expected)
+                    for got, expected in zip(found, exact_ids)
+                ]
+            )
+            print(
+                f"{quantization:<10}{rerank_factor:>7}"
+                f"{collection.search_memory_bytes() / 1e6:>9.2f}"
+                f"{1000 * seconds / len(queries):>10.3f}{recall:>8.1%}"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--dimensions", type=int, default=384)
+    parser.add_argument("--clusters", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument(
+        "--skip-shipped", action="store_true", help="Skip embedding docs/"
+    )
+    args = parser.parse_args()
+
+    if not args.skip_shipped:
+        vectors, queries = shipped_corpus()
+        run("shipped docs", vectors, queries, args.top_k)
+    vectors, queries = synthetic_corpus(
+        args.rows, args.queries, args.dimensions, args.clusters
+    )
+    run("synthetic", vectors, queries, args.top_k)
+
+
+if __name__ == "__main__":
+    main()
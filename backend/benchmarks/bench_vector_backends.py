@@ -0,0 +1,159 @@
+"""
+Benchmark the ChromaDB and NumPy vector backends on a synthetic corpus.
+
+Loads the same random 384-dim vectors (MiniLM's size) with course and lesson
+metadata into both backends, then times ingestion, unfiltered and filtered
+top-k queries one at a time and in batches, and reports how often the two
+backends return the same top-k IDs.
+
+Usage (from the backend directory):
+    uv run python benchmarks/bench_vector_backends.py [--rows 20000] [--queries 200]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from vector_backends import create_backend
+
+FIELDS = ("course_title", "lesson_number")
+
+
+def make_corpus(rows: int, dimensions: int, courses: int, lessons: int, seed: int):
+    """Random unit vectors with round-robin course and lesson metadata"""
+    rng = np.random.default_rng(seed)
+    vectors = rng.standard_normal((rows, dimensions)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    ids = [f"chunk_{i}" for i in range(rows)]
+    metadatas = [
+        {
+            "course_title": f"Course {i % courses}",
+            "lesson_number": (i // courses) % lessons,
+            "chunk_index": i,
+        }
+        for i in range(rows)
+    ]
+    documents = [f"Synthetic chunk {i}" for i in range(rows)]
+    return ids, vectors, metadatas, documents
+
+
+def timed(func):
+    """Run func once and return (result, seconds)"""
+    started = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--dimensions", type=int, default=384)
+    parser.add_argument("--courses", type=int, default=20)
+    parser.add_argument("--lessons", type=int, default=10)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--batch-size", type=int, default=5000)
+    args = parser.parse_args()
+
+    ids, vectors, metadatas, documents = make_corpus(
+        args.rows, args.dimensions, args.courses, args.lessons, seed=0
+    )
+    queries = make_corpus(args.queries, args.dimensions, 1, 1, seed=1)[1]
+    filters = [
+        {
+            "$and": [
+                {"course_title": f"Course {i % args.courses}"},
+                {"lesson_number": i % args.lessons},
+            ]
+        }
+        for i in range(args.queries)
+    ]
+
+    print(
+        f"rows={args.rows} dimensions={args.dimensions} queries={args.queries} "
+        f"top_k={args.top_k}"
+    )
+    print(
+        f"{'backend':<10}{'ingest s':>10}{'open s':>9}{'query ms':>10}"
+        f"{'batch ms':>10}{'filter ms':>11}{'disk MB':>9}"
+    )
+
+    top_ids = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for name in ("chroma", "numpy"):
+            path = os.path.join(directory, name)
+            backend = create_backend(name, path, FIELDS)
+            collection = backend.get_or_create_collection("course_content", None)
+            batch_size = min(args.batch_size, backend.get_max_batch_size())
+
+            def ingest():
+                for start in range(0, args.rows, batch_size):
+                    end = start + batch_size
+                    collection.add(
+                        ids=ids[start:end],
+                        embeddings=vectors[start:end],
+                        metadatas=metadatas[start:end],
+                        documents=documents[start:end],
+                    )
+
+            _, ingest_seconds = timed(ingest)
+            del collection, backend
+
+            # Reopen from disk, as the server does at startup
+            def reopen():
+                backend = create_backend(name, path, FIELDS)
+                return backend.get_or_create_collection("course_content", None)
+
+            collection, open_seconds = timed(reopen)
+            collection.query(query_embeddings=queries[:1], n_results=args.top_k)
+
+            single, single_seconds = timed(
+                lambda: [
+                    collection.query(query_embeddings=[query], n_results=args.top_k)
+                    for query in queries
+                ]
+            )
+            _, batch_seconds = timed(
+                lambda: collection.query(query_embeddings=queries, n_results=args.top_k)
+            )
+            _, filter_seconds = timed(
+                lambda: [
+                    collection.query(
+                        query_embeddings=[query], n_results=args.top_k, where=where
+                    )
+                    for query, where in zip(queries, filters)
+                ]
+            )
+            top_ids[name] = [result["ids"][0] for result in single]
+
+            disk_bytes = sum(
+                os.path.getsize(os.path.join(root, file_name))
+                for root, _, file_names in os.walk(path)
+                for file_name in file_names
+            )
+            print(
+                f"{name:<10}{ingest_seconds:>10.2f}{open_seconds:>9.2f}"
+                f"{1000 * single_seconds / args.queries:>10.3f}"
+                f"{1000 * batch_seconds / args.queries:>10.3f}"
+                f"{1000 * filter_seconds / args.queries:>11.3f}"
+                f"{disk_bytes / 1e6:>9.1f}"
+            )
+
+    overlap = np.mean(
+        [
+            len(set(chroma) & set(numpy)) / args.top_k
+            for chroma, numpy in zip(top_ids["chroma"], top_ids["numpy"])
+        ]
+    )
+    # NumPy search is exact, so this is Chroma's HNSW recall at top_k
+    print(f"top-{args.top_k} overlap: {overlap:.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,430 @@
+import asyncio
+import functools
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Hashable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+import numpy as np
+
+_MISSING = object()
+
+
+class LRUCache:
+    """Thread-safe, size-bounded mapping that evicts the least recently used entry"""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Get a value and mark it as recently used"""
+        with self._lock:
+            value = self._entries.get(key, _MISSING)
+            if value is _MISSING:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any):
+        """Store a value, evicting the oldest entries beyond max_entries"""
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """Remove all entries"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current size"""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "size": len(self._entries),
+            "max_size": self.max_entries,
+        }
+
+
+class QueryEmbeddingCache:
+    """
+    Two-tier cache of query embeddings keyed by model name and normalized text.
+
+    Lookups try an in-memory LRU first, then an optional SQLite file that
+    survives restarts. Only texts missing from both tiers are sent to the
+    embedding model, in a single batch.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        max_entries: int = 1024,
+        disk_path: Optional[str] = None,
+        max_disk_entries: int = 100_000,
+    ):
+        self.model_name = model_name
+        self.memory = LRUCache(max_entries)
+        self.disk_path = disk_path or None
+        self.max_disk_entries = max_disk_entries
+        self.disk_hits = 0
+        self.misses = 0
+        self._disk_lock = threading.Lock()
+        self._disk: Optional[sqlite3.Connection] = None
+        if self.disk_path:
+            self._open_disk()
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """Collapse whitespace so trivially different queries share an entry"""
+        return " ".join(text.split())
+
+    def _key(self, text: str) -> str:
+        return f"{self.model_name}\x00{self.normalize(text)}"
+
+    def _open_disk(self):
+        directory = os.path.dirname(os.path.abspath(self.disk_path))
+        os.makedirs(directory, exist_ok=True)
+        try:
+            self._disk = sqlite3.connect(self.disk_path, check_same_thread=False)
+            self._disk.execute(
+                "CREATE TABLE IF NOT EXISTS query_embeddings "
+                "(key TEXT PRIMARY KEY, embedding BLOB NOT NULL)"
+            )
+            self._disk.commit()
+        except sqlite3.Error as e:
+            print(f"Error opening query embedding cache {self.disk_path}: {e}")
+            self._disk = None
+
+    def _disk_get(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        if self._disk is None or not keys:
+            return {}
+        placeholders = ",".join("?" * len(keys))
+        with self._disk_lock:
+            rows = self._disk.execute(
+                f"SELECT key, embedding FROM query_embeddings "
+                f"WHERE key IN ({placeholders})",
+                keys,
+            ).fetchall()
+        return {key: np.frombuffer(blob, dtype=np.float32) for key, blob in rows}
+
+    def _disk_put(self, items: Dict[str, np.ndarray]):
+        if self._disk is None or not items:
+            return
+        rows = [
+            (key, np.asarray(vector, dtype=np.float32).tobytes())
+            for key, vector in items.items()
+        ]
+        with self._disk_lock:
+            try:
+                self._disk.executemany(
+                    "INSERT OR REPLACE INTO query_embeddings (key, embedding) "
+                    "VALUES (?, ?)",
+                    rows,
+                )
+                # Oldest entries go first once the file reaches its bound
+                self._disk.execute(
+                    "DELETE FROM query_embeddings WHERE rowid <= "
+                    "(SELECT MAX(rowid) FROM query_embeddings) - ?",
+                    (self.max_disk_entries,),
+                )
+                self._disk.commit()
+            except sqlite3.Error as e:
+                print(f"Error writing query embedding cache: {e}")
+
+    def embed(
+        self,
+        texts: Sequence[str],
+        embedding_function: Callable[[List[str]], Sequence[Any]],
+    ) -> List[np.ndarray]:
+        """
+        Get embeddings for texts, computing only the ones not cached.
+
+        Args:
+            texts: Query texts to embed
+            embedding_function: Called once with the list of uncached texts
+
+        Returns:
+            One float32 vector per text, in input order
+        """
+        keys = [self._key(text) for text in texts]
+        found: Dict[str, np.ndarray] = {}
+        for key in keys:
+            vector = self.memory.get(key)
+            if vector is not None:
+                found[key] = vector
+
+        missing = [key for key in dict.fromkeys(keys) if key not in found]
+        from_disk = self._disk_get(missing)
+        self.disk_hits += len(from_disk)
+        for key, vector in from_disk.items():
+            self.memory.put(key, vector)
+        found.update(from_disk)
+
+        # Embed each distinct uncached text once
+        to_embed = {key: text for key, text in zip(keys, texts) if key not in found}
+        if to_embed:
+            self.misses += len(to_embed)
+            vectors = embedding_function(
+                [self.normalize(text) for text in to_embed.values()]
+            )
+            computed = {
+                key: np.asarray(vector, dtype=np.float32)
+                for key, vector in zip(to_embed, vectors)
+            }
+            for key, vector in computed.items():
+                self.memory.put(key, vector)
+            self._disk_put(computed)
+            found.update(computed)
+
+        return [found[key] for key in keys]
+
+    def clear(self):
+        """Drop all cached embeddings from both tiers"""
+        self.memory.clear()
+        if self._disk is not None:
+            with self._disk_lock:
+                self._disk.execute("DELETE FROM query_embeddings")
+                self._disk.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for both tiers"""
+        memory = self.memory.stats()
+        lookups = memory["hits"] + self.disk_hits + self.misses
+        return {
+            "memory_hits": memory["hits"],
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": (memory["hits"] + self.disk_hits) / lookups if lookups else 0.0,
+            "memory_size": memory["size"],
+            "memory_max_size": memory["max_size"],
+            "evictions": memory["evictions"],
+            "disk_enabled": self._disk is not None,
+        }
+
+
+class SemanticAnswerCache:
+    """
+    Answers to earlier questions, found again by query embedding similarity.
+
+    A lookup returns the answer whose question embedding is most similar to
+    the new one, if the cosine similarity reaches the threshold. Embeddings
+    barely separate questions that differ only in a number or a course name,
+    so each entry also carries an exact signature of those details and only
+    entries with the same signature are compared. Entries are
+    tied to the index generation they were answered at and are all dropped
+    once the index changes, so an answer never outlives its course content.
+    """
+
+    def __init__(self, threshold: float = 0.95, max_entries: int = 512):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.generation = 0
+        self._entries: "OrderedDict[str, Tuple[np.ndarray, Any, Hashable]]" = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def _unit(embedding: Any) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32).ravel()
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _sync_generation(self, generation: int):
+        """Drop every entry answered at an older index generation"""
+        if generation > self.generation:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self.generation = generation
+
+    def get(
+        self, embedding: Any, generation: int, signature: Hashable = None
+    ) -> Optional[Any]:
+        """
+        Get the cached answer for the most similar question, if similar enough.
+
+        Args:
+            embedding: Embedding of the new question
+            generation: Current index generation
+            signature: Details of the question that must match exactly
+
+        Returns:
+            The cached value, or None on a miss
+        """
+        query = self._unit(embedding)
+        with self._lock:
+            self._sync_generation(generation)
+            keys = [
+                key for key, entry in self._entries.items() if entry[2] == signature
+            ]
+            if not keys or generation < self.generation:
+                self.misses += 1
+                return None
+            matrix = np.stack([self._entries[key][0] for key in keys])
+            scores = matrix @ query
+            best = int(np.argmax(scores))
+            if scores[best] < self.threshold:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(keys[best])
+            self.hits += 1
+            return self._entries[keys[best]][1]
+
+    def put(
+        self,
+        question: str,
+        embedding: Any,
+        generation: int,
+        value: Any,
+        signature: Hashable = None,
+    ):
+        """
+        Cache the answer to a question.
+
+        An answer computed against an index that has since changed is not
+        stored.
+
+        Args:
+            question: The question text; asking it again replaces the entry
+            embedding: Embedding of the question
+            generation: Index generation read before the answer was computed
+            value: The answer to return for similar questions
+            signature: Details of the question that must match exactly
+        """
+        if self.max_entries <= 0:
+            return
+        key = QueryEmbeddingCache.normalize(question).lower()
+        with self._lock:
+            self._sync_generation(generation)
+            if generation < self.generation:
+                return
+            self._entries[key] = (self._unit(embedding), value, signature)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Remove all entries"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters, current size and the similarity threshold"""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "invalidations": self.invalidations,
+            "size": len(self._entries),
+            "max_size": self.max_entries,
+            "threshold": self.threshold,
+        }
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that compute the same thing.
+
+    The first caller for a key runs the computation; callers arriving with
+    the same key while it is in flight wait for it and get the same result
+    or exception. Nothing is kept once it finishes, so this is not a cache.
+    Sync and async callers share in-flight work, but a sync call must not
+    wait on the event loop thread that is running the computation.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, Future] = {}
+        self.leaders = 0
+        self.shared = 0
+
+    def _join(self, key: Hashable) -> Tuple[Future, bool]:
+        """The in-flight future for key, and whether this caller must run it"""
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                self.shared += 1
+                return future, False
+            future = Future()
+            self._calls[key] = future
+            self.leaders += 1
+            return future, True
+
+    def _finish(self, key: Hashable, future: Future, result: Any = None, error=None):
+        with self._lock:
+            self._calls.pop(key, None)
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """Run fn, or wait for the identical call already running it"""
+        future, leader = self._join(key)
+        if not leader:
+            return future.result()
+        try:
+            result = fn()
+        except BaseException as e:
+            self._finish(key, future, error=e)
+            raise
+        self._finish(key, future, result)
+        return result
+
+    async def ado(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Async version of do for a coroutine function"""
+        future, leader = self._join(key)
+        if leader:
+            task = asyncio.ensure_future(fn())
+            task.add_done_callback(functools.partial(self._finish_task, key, future))
+        # Shielded so a caller that gives up does not cancel the others' answer
+        return await asyncio.shield(asyncio.wrap_future(future))
+
+    def _finish_task(self, key: Hashable, future: Future, task: asyncio.Future):
+        if task.cancelled():
+            self._finish(key, future, error=asyncio.CancelledError())
+        elif task.exception() is not None:
+            self._finish(key, future, error=task.exception())
+        else:
+            self._finish(key, future, task.result())
+
+    def stats(self) -> Dict[str, Any]:
+        """Computations run and callers that shared one already in flight"""
+        with self._lock:
+            in_flight = len(self._calls)
+        return {"leaders": self.leaders, "shared": self.shared, "in_flight": in_flight}
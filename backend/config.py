@@ -7,6 +7,11 @@ from dotenv import load_dotenv
 load_dotenv()
 
 
+def _env_flag(name: str) -> bool:
+    """Read an on/off setting from the environment; off unless 1, true or yes"""
+    return os.getenv(name, "").lower() in ("1", "true", "yes")
+
+
 @dataclass
 class Config:
     """Configuration settings for the RAG system"""
@@ -25,8 +30,65 @@ class Config:
     MAX_HISTORY: int = 2  # Number of conversation messages to remember
     MAX_TOOL_ROUNDS: int = 2  # Maximum sequential tool calling rounds
 
+    # Query settings
+    QUERY_WORKERS: int = 8  # Threads running searches for concurrent queries
+    COALESCE_QUERIES: bool = True  # Identical first-turn questions share one answer
+    # Search the raw question during the first Claude round; a search tool call
+    # whose query words mostly appear in the question gets those results
+    SPECULATIVE_PREFETCH: bool = _env_flag("SPECULATIVE_PREFETCH")
+    PREFETCH_MIN_OVERLAP: float = 0.8  # Share of tool query words in the question
+
+    # Answer cache settings
+    # Answer first-turn questions similar to an earlier one from a cache,
+    # without calling Claude; entries are dropped whenever the index changes
+    SEMANTIC_ANSWER_CACHE: bool = _env_flag("SEMANTIC_ANSWER_CACHE")
+    ANSWER_CACHE_THRESHOLD: float = 0.95  # Min cosine similarity of the questions
+    ANSWER_CACHE_SIZE: int = 512  # Cached answers kept (LRU)
+
+    # Ingestion settings
+    INGEST_WORKERS: int = 1  # Worker processes for parsing course files (1 = serial)
+    INGEST_BATCH_SIZE: int = 256  # Chunks held in memory per vector store write
+    VECTOR_WRITE_BATCH_SIZE: int = 256  # Max records per ChromaDB add/update call
+    EMBEDDING_PIPELINE: bool = True  # Embed the next batch while writing the last
+    PDF_PAGE_WORKERS: int = 4  # Worker processes for extracting large PDFs' pages
+    PDF_PARALLEL_MIN_PAGES: int = 32  # Smaller PDFs are extracted serially
+
+    # Tool execution settings
+    TOOL_WORKERS: int = 16  # Threads running tool calls, shared by all queries
+    TOOL_TIMEOUT: float = 30.0  # Seconds before a tool call is reported as failed
+
+    # Query embedding cache settings
+    QUERY_EMBEDDING_CACHE_SIZE: int = 1024  # Embeddings kept in memory (LRU)
+    SEARCH_RESULT_CACHE_SIZE: int = 1024  # Search results and outlines (LRU)
+
+    # Course folder loaded at startup; /api/ingest may only read inside it
+    DOCS_PATH: str = "../docs"
+    # Let /api/ingest callers wipe the index with clear_existing
+    INGEST_ALLOW_CLEAR: bool = _env_flag("INGEST_ALLOW_CLEAR")
+
+    # Folder watcher settings
+    WATCH_DOCS: bool = _env_flag("WATCH_DOCS")
+    WATCH_DEBOUNCE_SECONDS: float = 2.0  # Quiet period before re-indexing changes
+    WATCH_POLL_INTERVAL: float = 2.0  # Seconds between scans without watchdog
+
+    # Vector backend: "chroma" (ChromaDB) or "numpy" (in-process flat index)
+    VECTOR_BACKEND: str = os.getenv("VECTOR_BACKEND", "chroma")
+    # NumPy backend only: "none", "int8" or "binary" codes for candidate search
+    VECTOR_QUANTIZATION: str = os.getenv("VECTOR_QUANTIZATION", "none")
+    QUANTIZATION_RERANK_FACTOR: int = 8  # Candidates per result rescored exactly
+    # One content collection per course; course-filtered searches read one shard
+    SHARD_BY_COURSE: bool = _env_flag("SHARD_BY_COURSE")
+    SHARD_SEARCH_WORKERS: int = 4  # Threads for searches that span all shards
+
     # Database paths
     CHROMA_PATH: str = "./chroma_db"  # ChromaDB storage location
+    NUMPY_INDEX_PATH: str = "./numpy_index"  # NumPy backend storage location
+    INGEST_MANIFEST_PATH: str = (
+        "./ingest_manifest.json"  # Ingested file manifest, next to CHROMA_PATH
+    )
+    QUERY_EMBEDDING_CACHE_PATH: str = (
+        "./query_embedding_cache.db"  # On-disk embedding cache, "" to disable
+    )
 
 
 config = Config()
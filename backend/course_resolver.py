@@ -0,0 +1,167 @@
+import re
+import threading
+from typing import Dict, FrozenSet, Iterable, List, Optional
+
+
+def _normalize(text: str) -> str:
+    return " ".join(text.casefold().split())
+
+
+_WORD = re.compile(r"[^\W_]+")
+
+# Title words too common to say which course a question is about
+_STOP_WORDS = frozenset(
+    "a an and for from in into of on the to with your course courses".split()
+)
+
+
+def _title_words(normalized: str) -> FrozenSet[str]:
+    return frozenset(
+        word
+        for word in _WORD.findall(normalized)
+        if len(word) > 1 and word not in _STOP_WORDS
+    )
+
+
+def _trigrams(text: str) -> FrozenSet[str]:
+    padded = f"  {text} "
+    return frozenset(padded[i : i + 3] for i in range(len(padded) - 2))
+
+
+class CourseNameResolver:
+    """
+    Resolves partial or misspelled course names against the known titles.
+
+    Matching runs in increasing order of fuzziness: exact title, then
+    case-insensitive equality, then a unique case-insensitive prefix or
+    substring, then trigram similarity with a clear winner. When none of
+    these gives a single confident answer, resolve returns None and the
+    caller falls back to semantic search.
+    """
+
+    def __init__(
+        self,
+        titles: Iterable[str] = (),
+        min_similarity: float = 0.5,
+        min_margin: float = 0.1,
+    ):
+        """
+        Args:
+            titles: Initial course titles
+            min_similarity: Lowest share of the name's trigrams a title must contain
+            min_margin: How far the best trigram match must lead the runner-up
+        """
+        self.min_similarity = min_similarity
+        self.min_margin = min_margin
+        self._lock = threading.Lock()
+        self._titles: Dict[str, str] = {}  # Title -> normalized title
+        self._trigrams: Dict[str, FrozenSet[str]] = {}
+        self._words: Dict[str, FrozenSet[str]] = {}
+        self.set_titles(titles)
+
+    def set_titles(self, titles: Iterable[str]):
+        """Replace all known titles"""
+        normalized = {title: _normalize(title) for title in titles}
+        trigrams = {title: _trigrams(value) for title, value in normalized.items()}
+        words = {title: _title_words(value) for title, value in normalized.items()}
+        with self._lock:
+            self._titles, self._trigrams = normalized, trigrams
+            self._words = words
+
+    def add_title(self, title: str):
+        """Add or refresh a course title"""
+        # Copy on write so concurrent resolves never see a dict being mutated
+        normalized = _normalize(title)
+        with self._lock:
+            self._titles = {**self._titles, title: normalized}
+            self._trigrams = {**self._trigrams, title: _trigrams(normalized)}
+            self._words = {**self._words, title: _title_words(normalized)}
+
+    def remove_title(self, title: str):
+        """Forget a course title"""
+        with self._lock:
+            self._titles = {k: v for k, v in self._titles.items() if k != title}
+            self._trigrams = {k: v for k, v in self._trigrams.items() if k != title}
+            self._words = {k: v for k, v in self._words.items() if k != title}
+
+    @property
+    def titles(self) -> List[str]:
+        """Known course titles"""
+        return list(self._titles)
+
+    def mentioned_titles(self, text: str) -> FrozenSet[str]:
+        """
+        Find the course titles a free-text question refers to.
+
+        A title counts as mentioned when the text shares one of its
+        distinctive words, so "the MCP course" mentions "MCP: Build
+        Rich-Context AI Apps with Anthropic".
+
+        Args:
+            text: Question or other free text
+
+        Returns:
+            The mentioned titles, empty if none
+        """
+        words = _title_words(_normalize(text))
+        return frozenset(
+            title for title, title_words in self._words.items() if title_words & words
+        )
+
+    def resolve(self, course_name: str) -> Optional[str]:
+        """
+        Find the course title a name refers to.
+
+        Args:
+            course_name: Full, partial or approximate course name
+
+        Returns:
+            The matching title, or None if there is no unambiguous match
+        """
+        titles, trigrams = self._titles, self._trigrams
+        if course_name in titles:
+            return course_name
+
+        query = _normalize(course_name)
+        if not query:
+            return None
+
+        exact = [title for title, normalized in titles.items() if normalized == query]
+        if len(exact) == 1:
+            return exact[0]
+
+        prefixed = [
+            title
+            for title, normalized in titles.items()
+            if normalized.startswith(query)
+        ]
+        if len(prefixed) == 1:
+            return prefixed[0]
+
+        containing = [
+            title for title, normalized in titles.items() if query in normalized
+        ]
+        if len(containing) == 1:
+            return containing[0]
+        if len(containing) > 1:
+            return None  # Several titles contain the name; let semantics decide
+
+        return self._resolve_trigrams(query, trigrams)
+
+    def _resolve_trigrams(
+        self, query: str, trigrams: Dict[str, FrozenSet[str]]
+    ) -> Optional[str]:
+        # Score by how much of the name appears in each title, so short
+        # names are not penalized for the rest of a long title
+        query_trigrams = _trigrams(query)
+        best_title, best, runner_up = None, 0.0, 0.0
+        for title, title_trigrams in trigrams.items():
+            score = len(query_trigrams & title_trigrams) / len(query_trigrams)
+            if score > best:
+                best_title, best, runner_up = title, score, best
+            elif score > runner_up:
+                runner_up = score
+
+        if best >= self.min_similarity and best - runner_up >= self.min_margin:
+            return best_title
+        return None
@@ -1,271 +1,418 @@
 import os
 import re
-from typing import List, Tuple
+import time
+from bisect import bisect_left
+from itertools import chain, islice
+from typing import Iterator, List, Optional, Tuple
 
 from models import Course, CourseChunk, Lesson
+from text_extraction import extract_lines
+
+# Sentence boundaries: whitespace after ., ! or ? that is followed by a capital
+# letter, ignoring common abbreviations. The cheap punctuation lookbehind comes
+# first so most positions are rejected before the abbreviation checks run.
+SENTENCE_BOUNDARY_PATTERN = re.compile(
+    r"(?<=[.!?])(?<!\w\.\w.)(?<![A-Z][a-z]\.)\s+(?=[A-Z])"
+)
+
+COURSE_TITLE_PATTERN = re.compile(r"^Course Title:\s*(.+)$", re.IGNORECASE)
+COURSE_LINK_PATTERN = re.compile(r"^Course Link:\s*(.+)$", re.IGNORECASE)
+COURSE_INSTRUCTOR_PATTERN = re.compile(r"^Course Instructor:\s*(.+)$", re.IGNORECASE)
+LESSON_PATTERN = re.compile(r"^Lesson\s+(\d+):\s*(.+)$", re.IGNORECASE)
+LESSON_LINK_PATTERN = re.compile(r"^Lesson Link:\s*(.+)$", re.IGNORECASE)
+
+# File types picked up from course folders
+COURSE_FILE_EXTENSIONS = (".pdf", ".docx", ".txt")
+
+
+def process_course_file(
+    file_path: str, chunk_size: int, chunk_overlap: int
+) -> Tuple[Course, List[CourseChunk], float]:
+    """
+    Process a single course file, suitable for running in a worker process.
+
+    PDF pages are extracted serially here; the pool already parallelizes
+    across files.
+
+    Args:
+        file_path: Path to the course document
+        chunk_size: Maximum chunk size in characters
+        chunk_overlap: Characters to overlap between chunks
+
+    Returns:
+        Tuple of (Course object, list of chunks, seconds spent processing)
+    """
+    start = time.perf_counter()
+    processor = DocumentProcessor(chunk_size, chunk_overlap)
+    course, course_chunks = processor.process_course_document(file_path)
+    return course, course_chunks, time.perf_counter() - start
 
 
 class DocumentProcessor:
     """Processes course documents and extracts structured information"""
 
-    def __init__(self, chunk_size: int, chunk_overlap: int):
+    def __init__(
+        self,
+        chunk_size: int,
+        chunk_overlap: int,
+        pdf_page_workers: int = 1,
+        pdf_parallel_min_pages: int = 32,
+    ):
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
+        self.pdf_page_workers = pdf_page_workers
+        self.pdf_parallel_min_pages = pdf_parallel_min_pages
 
     def read_file(self, file_path: str) -> str:
-        """Read content from file with UTF-8 encoding"""
-        try:
-            with open(file_path, "r", encoding="utf-8") as file:
-                return file.read()
-        except UnicodeDecodeError:
-            # If UTF-8 fails, try with error handling
-            with open(file_path, "r", encoding="utf-8", errors="ignore") as file:
-                return file.read()
+        """Read a course file's text, extracting PDF and DOCX content"""
+        if not file_path.lower().endswith((".pdf", ".docx")):
+            try:
+                with open(file_path, "r", encoding="utf-8") as file:
+                    return file.read()
+            except UnicodeDecodeError:
+                pass
+        # Binary formats, or text that is not valid UTF-8
+        return "\n".join(self._extract_lines(file_path))
+
+    def _extract_lines(self, file_path: str, parallel: bool = True) -> Iterator[str]:
+        return extract_lines(
+            file_path,
+            page_workers=self.pdf_page_workers if parallel else 1,
+            parallel_min_pages=self.pdf_parallel_min_pages,
+        )
 
     def chunk_text(self, text: str) -> List[str]:
-        """Split text into sentence-based chunks with overlap using config settings"""
+        """
+        Split text into sentence-based chunks with overlap using config settings.
+
+        After whitespace normalization sentences are separated by single spaces,
+        so their character offsets act as prefix sums: the joined length of
+        sentences i..j is ends[j] - starts[i]. Chunk ends advance with a moving
+        pointer and overlap starts are found by bisection, so each sentence is
+        visited a bounded number of times and chunks are sliced straight from
+        the normalized text.
+        """
 
         # Clean up the text
-        text = re.sub(r"\s+", " ", text.strip())  # Normalize whitespace
-
-        # Better sentence splitting that handles abbreviations
-        # This regex looks for periods followed by whitespace and capital letters
-        # but ignores common abbreviations
-        sentence_endings = re.compile(
-            r"(?<!\w\.\w.)(?<![A-Z][a-z]\.)(?<=\.|\!|\?)\s+(?=[A-Z])"
-        )
-        sentences = sentence_endings.split(text)
-
-        # Clean sentences
-        sentences = [s.strip() for s in sentences if s.strip()]
-
+        text = " ".join(text.split())  # Normalize whitespace
+        if not text:
+            return []
+
+        # Sentence spans as offsets into the normalized text
+        starts = [0]
+        ends = []
+        for match in SENTENCE_BOUNDARY_PATTERN.finditer(text):
+            ends.append(match.start())
+            starts.append(match.end())
+        ends.append(len(text))
+
+        sentence_count = len(starts)
         chunks = []
         i = 0
-
-        while i < len(sentences):
-            current_chunk = []
-            current_size = 0
-
-            # Build chunk starting from sentence i
-            for j in range(i, len(sentences)):
-                sentence = sentences[j]
-
-                # Calculate size with space
-                space_size = 1 if current_chunk else 0
-                total_addition = len(sentence) + space_size
-
-                # Check if adding this sentence would exceed chunk size
-                if current_size + total_addition > self.chunk_size and current_chunk:
-                    break
-
-                current_chunk.append(sentence)
-                current_size += total_addition
-
-            # Add chunk if we have content
-            if current_chunk:
-                chunks.append(" ".join(current_chunk))
-
-                # Calculate overlap for next chunk
-                if hasattr(self, "chunk_overlap") and self.chunk_overlap > 0:
-                    # Find how many sentences to overlap
-                    overlap_size = 0
-                    overlap_sentences = 0
-
-                    # Count backwards from end of current chunk
-                    for k in range(len(current_chunk) - 1, -1, -1):
-                        sentence_len = len(current_chunk[k]) + (
-                            1 if k < len(current_chunk) - 1 else 0
-                        )
-                        if overlap_size + sentence_len <= self.chunk_overlap:
-                            overlap_size += sentence_len
-                            overlap_sentences += 1
-                        else:
-                            break
-
-                    # Move start position considering overlap
-                    next_start = i + len(current_chunk) - overlap_sentences
-                    i = max(next_start, i + 1)  # Ensure we make progress
-                else:
-                    # No overlap - move to next sentence after current chunk
-                    i += len(current_chunk)
+        end = 0
+
+        while i < sentence_count:
+            # Extend the chunk while it fits; a single sentence always fits
+            end = max(end, i)
+            while (
+                end + 1 < sentence_count
+                and ends[end + 1] - starts[i] <= self.chunk_size
+            ):
+                end += 1
+
+            chunks.append(text[starts[i] : ends[end]])
+
+            if self.chunk_overlap > 0:
+                # First sentence of the longest suffix that fits in the overlap
+                overlap_start = bisect_left(
+                    starts, ends[end] - self.chunk_overlap, i, end + 1
+                )
+                i = max(overlap_start, i + 1)  # Ensure we make progress
             else:
-                # No sentences fit, move to next
-                i += 1
+                # No overlap - move to next sentence after current chunk
+                i = end + 1
 
         return chunks
 
-    def process_course_document(
-        self, file_path: str
-    ) -> Tuple[Course, List[CourseChunk]]:
-        """
-        Process a course document with expected format:
-        Line 1: Course Title: [title]
-        Line 2: Course Link: [url]
-        Line 3: Course Instructor: [instructor]
-        Following lines: Lesson markers and content
+    def _read_lines(self, file_path: str, parallel: bool = True) -> Iterator[str]:
         """
-        content = self.read_file(file_path)
-        filename = os.path.basename(file_path)
+        Yield a document's lines one at a time without line endings.
 
-        lines = content.strip().split("\n")
-
-        # Extract course metadata from first three lines
+        PDF and DOCX text is extracted first; undecodable bytes in text files
+        are dropped, matching read_file's fallback. Leading blank lines and
+        leading whitespace are skipped, as if the whole document had been
+        stripped before splitting.
+        """
+        lines = self._extract_lines(file_path, parallel)
+        try:
+            started = False
+            for line in lines:
+                if not started:
+                    if not line.strip():
+                        continue
+                    line = line.lstrip()
+                    started = True
+                yield line
+        finally:
+            lines.close()
+
+    def _parse_course_header(self, header_lines: List[str], filename: str) -> Course:
+        """Build the Course object from the first lines of a document"""
         course_title = filename  # Default fallback
         course_link = None
         instructor_name = "Unknown"
 
         # Parse course title from first line
-        if len(lines) >= 1 and lines[0].strip():
-            title_match = re.match(
-                r"^Course Title:\s*(.+)$", lines[0].strip(), re.IGNORECASE
-            )
+        if len(header_lines) >= 1 and header_lines[0].strip():
+            title_match = COURSE_TITLE_PATTERN.match(header_lines[0].strip())
             if title_match:
                 course_title = title_match.group(1).strip()
             else:
-                course_title = lines[0].strip()
+                course_title = header_lines[0].strip()
 
         # Parse remaining lines for course metadata
-        for i in range(1, min(len(lines), 4)):  # Check first 4 lines for metadata
-            line = lines[i].strip()
+        for line in header_lines[1:4]:  # Check first 4 lines for metadata
+            line = line.strip()
             if not line:
                 continue
 
             # Try to match course link
-            link_match = re.match(r"^Course Link:\s*(.+)$", line, re.IGNORECASE)
+            link_match = COURSE_LINK_PATTERN.match(line)
             if link_match:
                 course_link = link_match.group(1).strip()
                 continue
 
             # Try to match instructor
-            instructor_match = re.match(
-                r"^Course Instructor:\s*(.+)$", line, re.IGNORECASE
-            )
+            instructor_match = COURSE_INSTRUCTOR_PATTERN.match(line)
             if instructor_match:
                 instructor_name = instructor_match.group(1).strip()
                 continue
 
         # Create course object with title as ID
-        course = Course(
+        return Course(
             title=course_title,
             course_link=course_link,
             instructor=instructor_name if instructor_name != "Unknown" else None,
         )
 
-        # Process lessons and create chunks
-        course_chunks = []
-        current_lesson = None
-        lesson_title = None
-        lesson_link = None
-        lesson_content = []
-        chunk_counter = 0
+    def peek_course_metadata(self, file_path: str) -> Course:
+        """
+        Parse only the header of a course document.
+
+        Reads the first few lines (course title, link and instructor) and
+        stops, so checking whether a file's course is already indexed costs a
+        small read rather than a full parse. PDFs are read page by page here,
+        so only the first page is extracted.
+
+        Args:
+            file_path: Path to the course document
+
+        Returns:
+            Course object without lessons
+        """
+        lines = self._read_lines(file_path, parallel=False)
+        try:
+            header_lines = list(islice(lines, 4))
+        finally:
+            lines.close()
+        return self._parse_course_header(header_lines, os.path.basename(file_path))
+
+    def stream_course_document(
+        self, file_path: str
+    ) -> Tuple[Course, Iterator[List[CourseChunk]]]:
+        """
+        Parse a course document incrementally, one lesson at a time.
+
+        Only the header is read up front. The returned iterator reads the rest
+        of the file line by line and yields each lesson's chunks as soon as the
+        lesson ends, appending the lesson to course.lessons at the same time,
+        so peak memory is bounded by the largest lesson rather than the file.
+        The course's lesson list is complete once the iterator is exhausted.
+
+        Args:
+            file_path: Path to the course document
+
+        Returns:
+            Tuple of (Course object, iterator of per-lesson chunk lists)
+        """
+        lines = self._read_lines(file_path)
+        try:
+            header_lines = list(islice(lines, 4))
+        except Exception:
+            lines.close()
+            raise
+
+        course = self._parse_course_header(header_lines, os.path.basename(file_path))
 
         # Start processing from line 4 (after metadata)
         start_index = 3
-        if len(lines) > 3 and not lines[3].strip():
+        if len(header_lines) > 3 and not header_lines[3].strip():
             start_index = 4  # Skip empty line after instructor
 
-        i = start_index
-        while i < len(lines):
-            line = lines[i]
+        return course, self._iter_lesson_chunks(
+            course, header_lines[start_index:], lines, len(header_lines) > 2
+        )
 
-            # Check for lesson markers (e.g., "Lesson 0: Introduction")
-            lesson_match = re.match(
-                r"^Lesson\s+(\d+):\s*(.+)$", line.strip(), re.IGNORECASE
-            )
+    def _iter_lesson_chunks(
+        self,
+        course: Course,
+        body_start: List[str],
+        lines: Iterator[str],
+        allow_fallback: bool,
+    ) -> Iterator[List[CourseChunk]]:
+        """Yield chunk lists lesson by lesson from the document body"""
+        body = chain(body_start, lines)
+
+        # Raw body lines are kept only until the first chunk is produced; a
+        # document without any lesson content is chunked as a whole instead
+        fallback_lines: Optional[List[str]] = [] if allow_fallback else None
+
+        def next_line() -> Optional[str]:
+            line = next(body, None)
+            if line is not None and fallback_lines is not None:
+                fallback_lines.append(line)
+            return line
 
-            if lesson_match:
-                # Process previous lesson if it exists
-                if current_lesson is not None and lesson_content:
-                    lesson_text = "\n".join(lesson_content).strip()
-                    if lesson_text:
-                        # Add lesson to course
-                        lesson = Lesson(
-                            lesson_number=current_lesson,
-                            title=lesson_title,
-                            lesson_link=lesson_link,
+        chunk_counter = 0
+        current_lesson = None
+        lesson_title = None
+        lesson_link = None
+        lesson_content: List[str] = []
+
+        try:
+            line = next_line()
+            while line is not None:
+                following = None
+
+                # Check for lesson markers (e.g., "Lesson 0: Introduction")
+                lesson_match = LESSON_PATTERN.match(line.strip())
+                if lesson_match:
+                    # Process previous lesson if it exists
+                    if current_lesson is not None and lesson_content:
+                        lesson_chunks = self._build_lesson_chunks(
+                            course,
+                            current_lesson,
+                            lesson_title,
+                            lesson_link,
+                            lesson_content,
+                            chunk_counter,
+                            is_last=False,
+                        )
+                        if lesson_chunks:
+                            chunk_counter += len(lesson_chunks)
+                            fallback_lines = None
+                            yield lesson_chunks
+
+                    # Start new lesson
+                    current_lesson = int(lesson_match.group(1))
+                    lesson_title = lesson_match.group(2).strip()
+                    lesson_link = None
+
+                    # Check if next line is a lesson link
+                    following = next_line()
+                    if following is not None:
+                        link_match = LESSON_LINK_PATTERN.match(following.strip())
+                        if link_match:
+                            lesson_link = link_match.group(1).strip()
+                            following = None  # Not part of the lesson content
+
+                    lesson_content = []
+                else:
+                    # Add line to current lesson content
+                    lesson_content.append(line)
+
+                line = following if following is not None else next_line()
+
+            # Process the last lesson
+            if current_lesson is not None and lesson_content:
+                lesson_chunks = self._build_lesson_chunks(
+                    course,
+                    current_lesson,
+                    lesson_title,
+                    lesson_link,
+                    lesson_content,
+                    chunk_counter,
+                    is_last=True,
+                )
+                if lesson_chunks:
+                    chunk_counter += len(lesson_chunks)
+                    fallback_lines = None
+                    yield lesson_chunks
+
+            # If no lessons found, treat entire content as one document
+            if chunk_counter == 0 and fallback_lines:
+                remaining_content = "\n".join(fallback_lines).strip()
+                if remaining_content:
+                    yield [
+                        CourseChunk(
+                            content=chunk,
+                            course_title=course.title,
+                            chunk_index=index,
+                        )
+                        for index, chunk in enumerate(
+                            self.chunk_text(remaining_content)
                         )
-                        course.lessons.append(lesson)
-
-                        # Create chunks for this lesson
-                        chunks = self.chunk_text(lesson_text)
-                        for idx, chunk in enumerate(chunks):
-                            # For the first chunk of each lesson, add lesson context
-                            if idx == 0:
-                                chunk_with_context = (
-                                    f"Lesson {current_lesson} content: {chunk}"
-                                )
-                            else:
-                                chunk_with_context = chunk
-
-                            course_chunk = CourseChunk(
-                                content=chunk_with_context,
-                                course_title=course.title,
-                                lesson_number=current_lesson,
-                                chunk_index=chunk_counter,
-                            )
-                            course_chunks.append(course_chunk)
-                            chunk_counter += 1
-
-                # Start new lesson
-                current_lesson = int(lesson_match.group(1))
-                lesson_title = lesson_match.group(2).strip()
-                lesson_link = None
-
-                # Check if next line is a lesson link
-                if i + 1 < len(lines):
-                    next_line = lines[i + 1].strip()
-                    link_match = re.match(
-                        r"^Lesson Link:\s*(.+)$", next_line, re.IGNORECASE
-                    )
-                    if link_match:
-                        lesson_link = link_match.group(1).strip()
-                        i += 1  # Skip the link line so it's not added to content
-
-                lesson_content = []
+                    ]
+        finally:
+            lines.close()
+
+    def _build_lesson_chunks(
+        self,
+        course: Course,
+        lesson_number: int,
+        lesson_title: str,
+        lesson_link: Optional[str],
+        lesson_content: List[str],
+        chunk_counter: int,
+        is_last: bool,
+    ) -> List[CourseChunk]:
+        """Register a finished lesson on the course and chunk its content"""
+        lesson_text = "\n".join(lesson_content).strip()
+        if not lesson_text:
+            return []
+
+        # Add lesson to course
+        course.lessons.append(
+            Lesson(
+                lesson_number=lesson_number,
+                title=lesson_title,
+                lesson_link=lesson_link,
+            )
+        )
+
+        lesson_chunks = []
+        for idx, chunk in enumerate(self.chunk_text(lesson_text)):
+            if is_last:
+                # For any chunk of the last lesson, add lesson context & course title
+                chunk_with_context = (
+                    f"Course {course.title} Lesson {lesson_number} content: {chunk}"
+                )
+            elif idx == 0:
+                # For the first chunk of each lesson, add lesson context
+                chunk_with_context = f"Lesson {lesson_number} content: {chunk}"
             else:
-                # Add line to current lesson content
-                lesson_content.append(line)
-
-            i += 1
-
-        # Process the last lesson
-        if current_lesson is not None and lesson_content:
-            lesson_text = "\n".join(lesson_content).strip()
-            if lesson_text:
-                lesson = Lesson(
-                    lesson_number=current_lesson,
-                    title=lesson_title,
-                    lesson_link=lesson_link,
+                chunk_with_context = chunk
+
+            lesson_chunks.append(
+                CourseChunk(
+                    content=chunk_with_context,
+                    course_title=course.title,
+                    lesson_number=lesson_number,
+                    chunk_index=chunk_counter + idx,
                 )
-                course.lessons.append(lesson)
-
-                chunks = self.chunk_text(lesson_text)
-                for idx, chunk in enumerate(chunks):
-                    # For any chunk of each lesson, add lesson context & course title
-
-                    chunk_with_context = f"Course {course_title} Lesson {current_lesson} content: {chunk}"
-
-                    course_chunk = CourseChunk(
-                        content=chunk_with_context,
-                        course_title=course.title,
-                        lesson_number=current_lesson,
-                        chunk_index=chunk_counter,
-                    )
-                    course_chunks.append(course_chunk)
-                    chunk_counter += 1
-
-        # If no lessons found, treat entire content as one document
-        if not course_chunks and len(lines) > 2:
-            remaining_content = "\n".join(lines[start_index:]).strip()
-            if remaining_content:
-                chunks = self.chunk_text(remaining_content)
-                for chunk in chunks:
-                    course_chunk = CourseChunk(
-                        content=chunk,
-                        course_title=course.title,
-                        chunk_index=chunk_counter,
-                    )
-                    course_chunks.append(course_chunk)
-                    chunk_counter += 1
+            )
+        return lesson_chunks
 
+    def process_course_document(
+        self, file_path: str
+    ) -> Tuple[Course, List[CourseChunk]]:
+        """
+        Process a course document with expected format:
+        Line 1: Course Title: [title]
+        Line 2: Course Link: [url]
+        Line 3: Course Instructor: [instructor]
+        Following lines: Lesson markers and content
+        """
+        course, lesson_chunks = self.stream_course_document(file_path)
+        course_chunks = [chunk for chunks in lesson_chunks for chunk in chunks]
         return course, course_chunks
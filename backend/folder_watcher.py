@@ -0,0 +1,184 @@
+import os
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+from document_processor import COURSE_FILE_EXTENSIONS
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:  # Optional dependency, fall back to polling
+    FileSystemEventHandler = object
+    Observer = None
+
+# (size, mtime_ns) of each course file, keyed by path
+FolderSnapshot = Dict[str, Tuple[int, int]]
+
+
+class _WakeHandler(FileSystemEventHandler):
+    """Wakes the watcher thread on any file system event in the folder"""
+
+    def __init__(self, wake: threading.Event):
+        self.wake = wake
+
+    def on_any_event(self, event):
+        self.wake.set()
+
+
+class FolderWatcher:
+    """
+    Watches a course folder and reports created, modified and deleted files.
+
+    Native file system events (inotify via the optional watchdog package) only
+    wake the watcher; without watchdog the folder is polled instead. Either way
+    changes are found by comparing cheap stat snapshots of the folder, and a
+    burst of events is debounced until the folder has been quiet for
+    debounce_seconds, so a file still being copied is reported once.
+    """
+
+    def __init__(
+        self,
+        folder_path: str,
+        on_changes: Callable[[List[str], List[str]], None],
+        debounce_seconds: float = 2.0,
+        poll_interval: float = 2.0,
+        use_native: bool = True,
+    ):
+        """
+        Args:
+            folder_path: Folder containing course documents
+            on_changes: Called with (created or modified paths, deleted paths)
+            debounce_seconds: Quiet period required before reporting changes
+            poll_interval: Seconds between scans when polling
+            use_native: Use native file system events when watchdog is installed
+        """
+        self.folder_path = folder_path
+        self.on_changes = on_changes
+        self.debounce_seconds = debounce_seconds
+        self.poll_interval = poll_interval
+        self.use_native = use_native and Observer is not None
+        self.snapshot: FolderSnapshot = {}
+        self._snapshot_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._observer = None
+
+    def scan(self) -> FolderSnapshot:
+        """Stat every course file in the folder without reading it"""
+        snapshot = {}
+        try:
+            with os.scandir(self.folder_path) as entries:
+                for entry in entries:
+                    if not entry.name.lower().endswith(COURSE_FILE_EXTENSIONS):
+                        continue
+                    try:
+                        if not entry.is_file():
+                            continue
+                        stat = entry.stat()
+                    except OSError:
+                        continue  # Deleted while scanning
+                    snapshot[entry.path] = (stat.st_size, stat.st_mtime_ns)
+        except FileNotFoundError:
+            pass
+        return snapshot
+
+    def check(self) -> Tuple[List[str], List[str]]:
+        """
+        Compare the folder with the last snapshot and take a new one.
+
+        Returns:
+            Tuple of (created or modified paths, deleted paths), sorted
+        """
+        current = self.scan()
+        with self._snapshot_lock:
+            changed = sorted(
+                path
+                for path, stat in current.items()
+                if self.snapshot.get(path) != stat
+            )
+            deleted = sorted(path for path in self.snapshot if path not in current)
+            self.snapshot = current
+        return changed, deleted
+
+    def retry(self, changed: List[str], deleted: List[str] = ()):
+        """
+        Report paths again on the next check, e.g. after they failed to ingest.
+
+        Args:
+            changed: Created or modified paths to report as changed again
+            deleted: Deleted paths to report as deleted again
+        """
+        with self._snapshot_lock:
+            for path in changed:
+                self.snapshot.pop(path, None)
+            for path in deleted:
+                self.snapshot.setdefault(path, (-1, -1))
+
+    def start(self):
+        """Take the initial snapshot and start watching in the background"""
+        if self._thread is not None:
+            return
+        self.snapshot = self.scan()
+        self._stop.clear()
+
+        if self.use_native:
+            self._observer = Observer()
+            self._observer.schedule(
+                _WakeHandler(self._wake), self.folder_path, recursive=False
+            )
+            self._observer.start()
+
+        self._thread = threading.Thread(
+            target=self._run, name="folder-watcher", daemon=True
+        )
+        self._thread.start()
+        mode = "file system events" if self.use_native else "polling"
+        print(f"Watching {self.folder_path} for course changes ({mode})")
+
+    def stop(self, timeout: Optional[float] = None):
+        """Stop watching"""
+        self._stop.set()
+        self._wake.set()
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join(timeout)
+            self._observer = None
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            if self.use_native:
+                self._wake.wait()
+            else:
+                self._wake.wait(self.poll_interval)
+            self._wake.clear()
+            if self._stop.is_set():
+                return
+
+            latest = self.scan()
+            if latest == self.snapshot:
+                continue
+            if not self._wait_until_quiet(latest):
+                return
+
+            changed, deleted = self.check()
+            if not changed and not deleted:
+                continue
+            try:
+                self.on_changes(changed, deleted)
+            except Exception as e:
+                print(f"Error handling changes in {self.folder_path}: {e}")
+
+    def _wait_until_quiet(self, latest: FolderSnapshot) -> bool:
+        """Wait until two scans debounce_seconds apart agree; False if stopped"""
+        while True:
+            if self._stop.wait(self.debounce_seconds):
+                return False
+            self._wake.clear()
+            current = self.scan()
+            if current == latest:
+                return True
+            latest = current
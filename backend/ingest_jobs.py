@@ -0,0 +1,280 @@
+import os
+import queue
+import threading
+import time
+import uuid
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from document_processor import COURSE_FILE_EXTENSIONS
+
+
+def resolve_ingest_paths(paths: List[str], docs_root: str) -> List[str]:
+    """
+    Resolve paths given to the ingest API, allowing only course material.
+
+    Relative paths are taken relative to docs_root. Symlinks and ".." are
+    resolved before checking, so nothing outside docs_root can be named.
+
+    Args:
+        paths: Requested folders or course files
+        docs_root: Folder the API may ingest from
+
+    Returns:
+        The resolved absolute paths, in order
+
+    Raises:
+        PermissionError: A path is outside docs_root or is not a course file
+        FileNotFoundError: A path inside docs_root does not exist
+    """
+    root = os.path.realpath(docs_root)
+    resolved = []
+    for path in paths:
+        real = os.path.realpath(os.path.join(root, path))
+        if os.path.commonpath([root, real]) != root:
+            raise PermissionError(f"Path is outside the docs folder: {path}")
+        if not os.path.exists(real):
+            raise FileNotFoundError(f"Path not found: {path}")
+        if os.path.isfile(real) and not real.lower().endswith(COURSE_FILE_EXTENSIONS):
+            raise PermissionError(f"Not a course file: {path}")
+        resolved.append(real)
+    return resolved
+
+
+@dataclass
+class IngestJob:
+    """Progress and outcome of one queued ingestion request"""
+
+    job_id: str
+    paths: List[str]
+    clear_existing: bool = False
+    removed_paths: List[str] = field(default_factory=list)  # Deleted course files
+    status: str = "queued"  # queued, running, completed or failed
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    current_path: Optional[str] = None  # File or folder being ingested
+    files_total: int = 0  # Files that need processing (unchanged files excluded)
+    files_done: int = 0
+    courses_added: int = 0
+    chunks_added: int = 0
+    courses_removed: int = 0
+    error: Optional[str] = None
+    # Paths, or files in a folder, that could not be ingested, with the reason
+    file_errors: Dict[str, str] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Snapshot of the job for API responses"""
+        return asdict(self)
+
+
+class IngestJobManager:
+    """
+    Runs ingestion requests in the background, one job at a time.
+
+    Jobs are queued and executed in order on a single worker thread, so there
+    is only ever one writer to the vector store while queries are served from
+    whatever is already indexed.
+    """
+
+    def __init__(self, rag_system, max_finished_jobs: int = 100):
+        self.rag_system = rag_system
+        self.max_finished_jobs = max_finished_jobs
+        self.jobs: Dict[str, IngestJob] = {}
+        self._on_done: Dict[str, Callable[[IngestJob], None]] = {}
+        self._queue: "queue.Queue[Optional[IngestJob]]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._worker: Optional[threading.Thread] = None
+
+    def start(self):
+        """Start the worker thread if it is not already running"""
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(
+                    target=self._run, name="ingest-worker", daemon=True
+                )
+                self._worker.start()
+
+    def submit(
+        self,
+        paths: List[str],
+        clear_existing: bool = False,
+        removed_paths: Optional[List[str]] = None,
+        on_done: Optional[Callable[[IngestJob], None]] = None,
+    ) -> IngestJob:
+        """
+        Queue folders and/or files for ingestion.
+
+        Args:
+            paths: Course folders or individual course files
+            clear_existing: Whether to clear existing data before the first path
+            removed_paths: Deleted course files whose courses should be removed
+            on_done: Called on the worker thread with the job once it finishes
+
+        Returns:
+            The queued job
+        """
+        job = IngestJob(
+            job_id=uuid.uuid4().hex,
+            paths=list(paths),
+            clear_existing=clear_existing,
+            removed_paths=list(removed_paths or []),
+        )
+        with self._lock:
+            self.jobs[job.job_id] = job
+            if on_done:
+                self._on_done[job.job_id] = on_done
+            self._prune_finished_jobs()
+        self._queue.put(job)
+        self.start()
+        return job
+
+    def get(self, job_id: str) -> Optional[IngestJob]:
+        """Get a job by ID"""
+        with self._lock:
+            return self.jobs.get(job_id)
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until all queued jobs have finished, returning False on timeout"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._queue.all_tasks_done.wait(remaining)
+        return True
+
+    def shutdown(self, timeout: Optional[float] = None):
+        """
+        Stop the worker, cancelling jobs that have not started yet.
+
+        The running job, if any, is given up to timeout seconds to finish;
+        the worker is a daemon thread, so it never blocks interpreter exit.
+        """
+        while True:
+            try:
+                job = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if job is not None:
+                job.status = "failed"
+                job.error = "Cancelled at shutdown"
+                job.finished_at = time.time()
+            self._queue.task_done()
+
+        if self._worker is None:
+            return
+        self._queue.put(None)
+        self._worker.join(timeout)
+        self._worker = None
+
+    def _prune_finished_jobs(self):
+        """Forget the oldest finished jobs beyond max_finished_jobs"""
+        finished = [
+            job for job in self.jobs.values() if job.status in ("completed", "failed")
+        ]
+        for job in finished[: max(0, len(finished) - self.max_finished_jobs)]:
+            del self.jobs[job.job_id]
+
+    def _run(self):
+        while True:
+            job = self._queue.get()
+            try:
+                if job is None:
+                    return
+                self._run_job(job)
+                on_done = self._on_done.pop(job.job_id, None)
+                if on_done:
+                    try:
+                        on_done(job)
+                    except Exception as e:
+                        print(f"Error in ingest job {job.job_id} callback: {e}")
+            finally:
+                self._queue.task_done()
+
+    def _run_job(self, job: IngestJob):
+        job.status = "running"
+        job.started_at = time.time()
+        print(
+            f"Ingest job {job.job_id} started: "
+            f"{', '.join(job.paths + job.removed_paths)}"
+        )
+
+        try:
+            for path in job.removed_paths:
+                job.current_path = path
+                if self.rag_system.remove_course_file(path):
+                    job.courses_removed += 1
+            failed_paths = 0
+            for index, path in enumerate(job.paths):
+                job.current_path = path
+                clear_existing = job.clear_existing and index == 0
+                try:
+                    self._ingest_path(job, path, clear_existing)
+                except Exception as e:
+                    # One bad file must not keep the rest of the job from running
+                    failed_paths += 1
+                    job.file_errors[path] = str(e)
+                    print(f"Ingest job {job.job_id} skipped {path}: {e}")
+            if job.paths and failed_paths == len(job.paths):
+                raise RuntimeError("; ".join(job.file_errors.values()))
+            job.status = "completed"
+        except Exception as e:
+            job.status = "failed"
+            job.error = str(e)
+            print(f"Ingest job {job.job_id} failed: {e}")
+        finally:
+            job.current_path = None
+            job.finished_at = time.time()
+
+        if job.status == "completed":
+            print(
+                f"Ingest job {job.job_id} completed: {job.courses_added} courses, "
+                f"{job.chunks_added} chunks, {job.courses_removed} removed in "
+                f"{job.finished_at - job.started_at:.2f}s"
+            )
+
+    def _ingest_path(self, job: IngestJob, path: str, clear_existing: bool):
+        if os.path.isdir(path):
+            self._ingest_folder(job, path, clear_existing)
+        elif os.path.isfile(path):
+            self._ingest_file(job, path, clear_existing)
+        else:
+            raise FileNotFoundError(f"Path not found: {path}")
+
+    def _ingest_folder(self, job: IngestJob, folder_path: str, clear_existing: bool):
+        files_before = job.files_done
+        chunks_before = job.chunks_added
+
+        def progress(file_path: str, files_done: int, files_total: int, chunks: int):
+            if files_done == 0:
+                job.files_total += files_total
+            job.current_path = file_path
+            job.files_done = files_before + files_done
+            job.chunks_added = chunks_before + chunks
+
+        errors: Dict[str, str] = {}
+        courses, chunks = self.rag_system.add_course_folder(
+            folder_path, clear_existing=clear_existing, progress=progress, errors=errors
+        )
+        job.courses_added += courses
+        job.chunks_added = chunks_before + chunks
+        job.file_errors.update(errors)
+        if errors and len(errors) == job.files_done - files_before:
+            raise RuntimeError(f"No file in {folder_path} could be ingested")
+
+    def _ingest_file(self, job: IngestJob, file_path: str, clear_existing: bool):
+        if clear_existing:
+            self.rag_system.vector_store.clear_all_data()
+            self.rag_system.manifest.clear()
+        job.files_total += 1
+        course, chunks = self.rag_system.add_course_document(file_path)
+        job.files_done += 1
+        if course is None:
+            raise ValueError(
+                f"Could not ingest {file_path}: unreadable, or its course is "
+                f"already provided by another file"
+            )
+        job.courses_added += 1
+        job.chunks_added += chunks
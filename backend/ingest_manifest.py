@@ -0,0 +1,127 @@
+import hashlib
+import json
+import os
+from typing import Any, Dict, List, Optional
+
+
+class IngestManifest:
+    """Persistent record of ingested course files, used to skip unchanged files"""
+
+    HASH_BLOCK_SIZE = 1024 * 1024
+
+    def __init__(self, manifest_path: str):
+        self.manifest_path = manifest_path
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self.layout: Optional[Dict[str, Any]] = None
+        self.dirty = False
+        self.load()
+
+    @staticmethod
+    def path_key(file_path: str) -> str:
+        """Normalize a file path into a manifest key"""
+        return os.path.abspath(file_path)
+
+    @classmethod
+    def file_digest(cls, file_path: str) -> str:
+        """Compute the SHA-256 hex digest of a file without loading it whole"""
+        digest = hashlib.sha256()
+        with open(file_path, "rb") as file:
+            for block in iter(lambda: file.read(cls.HASH_BLOCK_SIZE), b""):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def load(self):
+        """Load manifest entries from disk, starting empty if missing or corrupt"""
+        self.entries = {}
+        self.layout = None
+        if not os.path.exists(self.manifest_path):
+            return
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as file:
+                data = json.load(file)
+            self.entries = data.get("files", {})
+            self.layout = data.get("layout")
+        except (OSError, ValueError) as e:
+            print(f"Error loading ingest manifest {self.manifest_path}: {e}")
+
+    def save(self):
+        """Write manifest entries to disk atomically if anything changed"""
+        if not self.dirty:
+            return
+        directory = os.path.dirname(os.path.abspath(self.manifest_path))
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.manifest_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            json.dump(
+                {"version": 1, "layout": self.layout, "files": self.entries},
+                file,
+                indent=2,
+            )
+        os.replace(tmp_path, self.manifest_path)
+        self.dirty = False
+
+    def set_layout(self, layout: Dict[str, Any]):
+        """Record the index layout the ingested files were written with"""
+        if layout != self.layout:
+            self.layout = dict(layout)
+            self.dirty = True
+
+    def get(self, file_path: str) -> Optional[Dict[str, Any]]:
+        """Get the manifest entry for a file, if any"""
+        return self.entries.get(self.path_key(file_path))
+
+    def find_course_file(self, course_title: str) -> Optional[str]:
+        """Get the manifest key of the file that provides a course, if any"""
+        for key, entry in self.entries.items():
+            if entry.get("course_title") == course_title:
+                return key
+        return None
+
+    def is_unchanged(self, file_path: str) -> bool:
+        """
+        Check whether a file matches its manifest entry.
+
+        Size and mtime are compared first so unchanged files are never read.
+        If only the mtime differs, the content hash decides, and a matching
+        hash refreshes the stored mtime.
+        """
+        entry = self.get(file_path)
+        if not entry:
+            return False
+
+        stat = os.stat(file_path)
+        if stat.st_size != entry.get("size"):
+            return False
+        if stat.st_mtime_ns == entry.get("mtime_ns"):
+            return True
+
+        if self.file_digest(file_path) != entry.get("sha256"):
+            return False
+        entry["mtime_ns"] = stat.st_mtime_ns
+        self.dirty = True
+        return True
+
+    def record(self, file_path: str, course_title: str, chunk_ids: List[str]):
+        """Record a file as ingested with its course title and chunk ids"""
+        stat = os.stat(file_path)
+        self.entries[self.path_key(file_path)] = {
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "sha256": self.file_digest(file_path),
+            "course_title": course_title,
+            "chunk_ids": list(chunk_ids),
+        }
+        self.dirty = True
+
+    def remove(self, file_path: str) -> Optional[Dict[str, Any]]:
+        """Remove a file from the manifest, returning its old entry"""
+        entry = self.entries.pop(self.path_key(file_path), None)
+        if entry is not None:
+            self.dirty = True
+        return entry
+
+    def clear(self):
+        """Forget all ingested files"""
+        if self.entries:
+            self.entries = {}
+            self.dirty = True
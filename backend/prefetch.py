@@ -0,0 +1,140 @@
+import re
+import threading
+import time
+from concurrent.futures import Executor
+from typing import Any, Dict, Optional, Set
+
+from vector_store import SearchResults, VectorStore
+
+
+class PrefetchStats:
+    """Thread-safe counters for speculative searches"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.launched = 0
+        self.hits = 0
+        self.misses = 0
+        self.saved_seconds = 0.0
+
+    def record_launch(self):
+        with self._lock:
+            self.launched += 1
+
+    def record_hit(self, saved_seconds: float):
+        with self._lock:
+            self.hits += 1
+            self.saved_seconds += saved_seconds
+
+    def record_miss(self):
+        with self._lock:
+            self.misses += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and the search time saved by hits"""
+        with self._lock:
+            finished = self.hits + self.misses
+            return {
+                "launched": self.launched,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / finished if finished else 0.0,
+                "saved_ms": round(self.saved_seconds * 1000, 1),
+            }
+
+
+class SpeculativeSearch:
+    """
+    A content search for the user's raw question, started before Claude asks.
+
+    The search runs on an executor while the first API round is in flight.
+    The first search tool call without course or lesson filters whose query
+    words mostly appear in the question is answered with its results, so
+    that call costs no embedding or vector query. Call close() when the
+    query is done so unused searches are counted as misses.
+    """
+
+    def __init__(
+        self,
+        store: VectorStore,
+        question: str,
+        executor: Executor,
+        stats: PrefetchStats,
+        min_overlap: float = 0.8,
+    ):
+        self.question_words = self.words(question)
+        self.stats = stats
+        self.min_overlap = min_overlap
+        self.search_seconds = 0.0
+        self._lock = threading.Lock()
+        self._done = False
+        self.future = executor.submit(self._search, store, question)
+        stats.record_launch()
+
+    @staticmethod
+    def words(text: str) -> Set[str]:
+        """Lowercased words of a text, ignoring punctuation"""
+        return set(re.findall(r"\w+", text.lower()))
+
+    def _search(self, store: VectorStore, question: str) -> SearchResults:
+        started = time.perf_counter()
+        try:
+            return store.search(question)
+        finally:
+            self.search_seconds = time.perf_counter() - started
+
+    def matches(
+        self,
+        query: str,
+        course_name: Optional[str] = None,
+        lesson_number: Optional[int] = None,
+    ) -> bool:
+        """Whether a search tool call asks for what was prefetched"""
+        if course_name or lesson_number is not None:
+            return False
+        query_words = self.words(query)
+        if not query_words:
+            return False
+        overlap = len(query_words & self.question_words) / len(query_words)
+        return overlap >= self.min_overlap
+
+    def take(
+        self,
+        query: str,
+        course_name: Optional[str] = None,
+        lesson_number: Optional[int] = None,
+    ) -> Optional[SearchResults]:
+        """
+        Prefetched results for a matching search tool call, or None.
+
+        Results are handed out once; later calls search normally.
+        """
+        if not self.matches(query, course_name, lesson_number):
+            return None
+        with self._lock:
+            if self._done:
+                return None
+            self._done = True
+
+        waited = time.perf_counter()
+        try:
+            results = self.future.result()
+        except Exception:
+            results = None
+        waited = time.perf_counter() - waited
+
+        if results is None or results.error:
+            self.stats.record_miss()
+            return None
+        # The call would have spent search_seconds; it only waited for the rest
+        self.stats.record_hit(max(0.0, self.search_seconds - waited))
+        return results
+
+    def close(self):
+        """Count the search as a miss if no tool call used it"""
+        with self._lock:
+            if self._done:
+                return
+            self._done = True
+        self.future.cancel()
+        self.stats.record_miss()
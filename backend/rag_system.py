@@ -1,13 +1,43 @@
+import asyncio
+import multiprocessing
 import os
-from typing import Dict, List, Optional, Tuple
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+)
 
 from ai_generator import AIGenerator
-from document_processor import DocumentProcessor
+from caching import QueryEmbeddingCache, SemanticAnswerCache, SingleFlight
+from document_processor import (
+    COURSE_FILE_EXTENSIONS,
+    DocumentProcessor,
+    process_course_file,
+)
+from ingest_manifest import IngestManifest
 from models import Course, CourseChunk, Lesson
+from prefetch import PrefetchStats, SpeculativeSearch
 from search_tools import CourseOutlineTool, CourseSearchTool, ToolManager
 from session_manager import SessionManager
 from vector_store import VectorStore
 
+# Numbers in a question, written as digits or as words up to twenty
+_NUMBER_WORDS = (
+    "zero one two three four five six seven eight nine ten eleven twelve "
+    "thirteen fourteen fifteen sixteen seventeen eighteen nineteen twenty"
+).split()
+_NUMBER = re.compile(r"\d+|\b(?:" + "|".join(_NUMBER_WORDS) + r")\b", re.IGNORECASE)
+
 
 class RAGSystem:
     """Main orchestrator for the Retrieval-Augmented Generation system"""
@@ -17,18 +47,41 @@ class RAGSystem:
 
         # Initialize core components
         self.document_processor = DocumentProcessor(
-            config.CHUNK_SIZE, config.CHUNK_OVERLAP
+            config.CHUNK_SIZE,
+            config.CHUNK_OVERLAP,
+            pdf_page_workers=config.PDF_PAGE_WORKERS,
+            pdf_parallel_min_pages=config.PDF_PARALLEL_MIN_PAGES,
         )
         self.vector_store = VectorStore(
-            config.CHROMA_PATH, config.EMBEDDING_MODEL, config.MAX_RESULTS
+            (
+                config.NUMPY_INDEX_PATH
+                if config.VECTOR_BACKEND == "numpy"
+                else config.CHROMA_PATH
+            ),
+            config.EMBEDDING_MODEL,
+            config.MAX_RESULTS,
+            write_batch_size=config.VECTOR_WRITE_BATCH_SIZE,
+            pipeline_embeddings=config.EMBEDDING_PIPELINE,
+            query_cache_size=config.QUERY_EMBEDDING_CACHE_SIZE,
+            query_cache_path=config.QUERY_EMBEDDING_CACHE_PATH,
+            result_cache_size=config.SEARCH_RESULT_CACHE_SIZE,
+            backend=config.VECTOR_BACKEND,
+            quantization=config.VECTOR_QUANTIZATION,
+            rerank_factor=config.QUANTIZATION_RERANK_FACTOR,
+            shard_by_course=config.SHARD_BY_COURSE,
+            shard_search_workers=config.SHARD_SEARCH_WORKERS,
         )
         self.ai_generator = AIGenerator(
             config.ANTHROPIC_API_KEY, config.ANTHROPIC_MODEL
         )
         self.session_manager = SessionManager(config.MAX_HISTORY)
+        self.manifest = IngestManifest(config.INGEST_MANIFEST_PATH)
+        self._check_index_layout()
 
         # Initialize search tools
-        self.tool_manager = ToolManager()
+        self.tool_manager = ToolManager(
+            max_workers=config.TOOL_WORKERS, timeout=config.TOOL_TIMEOUT or None
+        )
         self.search_tool = CourseSearchTool(self.vector_store)
         self.tool_manager.register_tool(self.search_tool)
 
@@ -36,6 +89,48 @@ class RAGSystem:
         self.outline_tool = CourseOutlineTool(self.vector_store)
         self.tool_manager.register_tool(self.outline_tool)
 
+        # Searches of async queries run on a bounded pool, off the event loop;
+        # each round gets its own sources back, so queries never share them
+        self.query_executor = ThreadPoolExecutor(
+            max_workers=max(1, config.QUERY_WORKERS),
+            thread_name_prefix="query",
+        )
+
+        # Opt-in: search the raw question while Claude plans its first tool call
+        self.prefetch_stats = PrefetchStats()
+
+        # Opt-in: first-turn answers reused for near-identical questions
+        self.answer_cache = SemanticAnswerCache(
+            threshold=config.ANSWER_CACHE_THRESHOLD,
+            max_entries=config.ANSWER_CACHE_SIZE,
+        )
+
+        # Concurrent identical first-turn questions wait for one answer
+        self.query_flights = SingleFlight()
+
+    def _check_index_layout(self):
+        """
+        Clear the index if it was written with a different content layout.
+
+        Switching SHARD_BY_COURSE over an existing index would leave every
+        chunk where searches no longer look, while the manifest still skips
+        the files. Clearing both makes the next folder ingest re-index them.
+        """
+        layout = {"shard_by_course": bool(self.config.SHARD_BY_COURSE)}
+        # Manifests written before the layout was recorded are unsharded
+        recorded = self.manifest.layout or {"shard_by_course": False}
+        if self.manifest.entries and recorded != layout:
+            print(
+                f"Index layout changed from {recorded} to {layout}; "
+                "clearing the index so course files are re-indexed"
+            )
+            self.vector_store.clear_all_data(drop_shards=True)
+            self.manifest.clear()
+            self.manifest.set_layout(layout)
+            self.manifest.save()
+        else:
+            self.manifest.set_layout(layout)
+
     def add_course_document(self, file_path: str) -> Tuple[Course, int]:
         """
         Add a single course document to the knowledge base.
@@ -44,34 +139,54 @@ class RAGSystem:
             file_path: Path to the course document
 
         Returns:
-            Tuple of (Course object, number of chunks created)
+            Tuple of (Course object, number of chunks created); the course is
+            None if the file could not be processed or was skipped because
+            another file already provides its course
         """
         try:
-            # Process the document
-            course, course_chunks = self.document_processor.process_course_document(
+            # Parse the header now and stream lesson chunks into the store
+            course, lesson_chunks = self.document_processor.stream_course_document(
                 file_path
             )
 
-            # Add course metadata to vector store for semantic search
-            self.vector_store.add_course_metadata(course)
-
-            # Add course content chunks to vector store
-            self.vector_store.add_course_content(course_chunks)
+            # Upsert course metadata and content, then remember the file
+            existing_course_titles = set(self.vector_store.get_existing_course_titles())
+            indexed = self._index_course(
+                file_path, course, lesson_chunks, existing_course_titles
+            )
+            self.manifest.save()
 
-            return course, len(course_chunks)
+            if indexed is None:
+                return None, 0
+            return course, indexed[1]
         except Exception as e:
             print(f"Error processing course document {file_path}: {e}")
             return None, 0
 
     def add_course_folder(
-        self, folder_path: str, clear_existing: bool = False
+        self,
+        folder_path: str,
+        clear_existing: bool = False,
+        workers: Optional[int] = None,
+        progress: Optional[Callable[[str, int, int, int], None]] = None,
+        errors: Optional[Dict[str, str]] = None,
     ) -> Tuple[int, int]:
         """
         Add all course documents from a folder.
 
+        Files are parsed and chunked either serially or across a process pool,
+        while all vector store writes happen on the calling thread in folder
+        order, so both modes produce the same index.
+
         Args:
             folder_path: Path to folder containing course documents
             clear_existing: Whether to clear existing data first
+            workers: Worker processes for parsing (defaults to config.INGEST_WORKERS)
+            progress: Optional callback called with (file path, files done,
+                files to process, chunks so far); once with the folder path
+                and 0 files done before parsing starts, then after each file
+            errors: Optional dict that receives an error message for each
+                file that could not be parsed or indexed, keyed by its path
 
         Returns:
             Tuple of (total courses added, total chunks created)
@@ -83,6 +198,7 @@ class RAGSystem:
         if clear_existing:
             print("Clearing existing data for fresh rebuild...")
             self.vector_store.clear_all_data()
+            self.manifest.clear()
 
         if not os.path.exists(folder_path):
             print(f"Folder {folder_path} does not exist")
@@ -91,35 +207,280 @@ class RAGSystem:
         # Get existing course titles to avoid re-processing
         existing_course_titles = set(self.vector_store.get_existing_course_titles())
 
-        # Process each file in the folder
-        for file_name in os.listdir(folder_path):
-            file_path = os.path.join(folder_path, file_name)
-            if os.path.isfile(file_path) and file_name.lower().endswith(
-                (".pdf", ".docx", ".txt")
+        file_paths = [
+            os.path.join(folder_path, file_name)
+            for file_name in os.listdir(folder_path)
+            if os.path.isfile(os.path.join(folder_path, file_name))
+            and file_name.lower().endswith(COURSE_FILE_EXTENSIONS)
+        ]
+
+        # Skip files whose size/mtime (or content hash) match the manifest
+        # and whose course is still indexed, without reading them
+        pending_paths = []
+        for file_path in file_paths:
+            entry = self.manifest.get(file_path)
+            if (
+                entry
+                and entry.get("course_title") in existing_course_titles
+                and self.manifest.is_unchanged(file_path)
+            ):
+                continue
+            pending_paths.append(file_path)
+        skipped = len(file_paths) - len(pending_paths)
+        if skipped:
+            print(f"Skipped {skipped} unchanged course files")
+        file_paths = self._skip_duplicate_files(pending_paths, existing_course_titles)
+
+        if workers is None:
+            workers = getattr(self.config, "INGEST_WORKERS", 1)
+        workers = max(1, min(workers, len(file_paths)))
+
+        if progress:
+            progress(folder_path, 0, len(file_paths), 0)
+
+        started = time.perf_counter()
+        results = self._process_course_files(file_paths, workers)
+        for files_done, (file_path, result) in enumerate(results, start=1):
+            chunk_count = self._index_file_result(
+                file_path, result, existing_course_titles, errors
+            )
+            if chunk_count is not None:
+                total_courses += 1
+                total_chunks += chunk_count
+            if progress:
+                progress(file_path, files_done, len(file_paths), total_chunks)
+
+        self.manifest.save()
+
+        elapsed = time.perf_counter() - started
+        if total_chunks:
+            print(
+                f"Ingested {total_chunks} chunks from {total_courses} courses in "
+                f"{elapsed:.2f}s ({total_chunks / max(elapsed, 1e-9):.1f} chunks/sec, "
+                f"{workers} worker{'s' if workers != 1 else ''})"
+            )
+
+        return total_courses, total_chunks
+
+    def _skip_duplicate_files(
+        self, file_paths: List[str], existing_course_titles: set
+    ) -> List[str]:
+        """
+        Drop files whose course is already provided by another file.
+
+        Only each file's header is read, so duplicates are skipped before any
+        lesson is parsed or chunked. A title counts as taken when it is
+        indexed from a different file or claimed by an earlier file in the
+        list; files that cannot be peeked are kept so the error is reported
+        when they are processed.
+        """
+        claimed: Dict[str, str] = {}
+        kept = []
+        for file_path in file_paths:
+            key = self.manifest.path_key(file_path)
+            try:
+                course_title = self.document_processor.peek_course_metadata(
+                    file_path
+                ).title
+            except Exception:
+                kept.append(file_path)
+                continue
+
+            owner = claimed.get(course_title) or self.manifest.find_course_file(
+                course_title
+            )
+            if owner not in (None, key) and (
+                course_title in claimed or course_title in existing_course_titles
             ):
+                print(f"Course already exists: {course_title} - skipping")
+                continue
+            claimed[course_title] = key
+            kept.append(file_path)
+        return kept
+
+    def remove_course_file(self, file_path: str) -> Optional[str]:
+        """
+        Remove the course provided by a deleted course file.
+
+        Args:
+            file_path: Path of the course file that was deleted
+
+        Returns:
+            Title of the removed course, or None if the file was never indexed
+        """
+        entry = self.manifest.remove(file_path)
+        if not entry:
+            return None
+
+        course_title = entry.get("course_title")
+        # Another file may have taken over the course in the meantime
+        if self.manifest.find_course_file(course_title) is None:
+            self.vector_store.delete_course(course_title)
+            print(f"Removed course: {course_title}")
+        self.manifest.save()
+        return course_title
+
+    def _index_file_result(
+        self,
+        file_path: str,
+        result: Any,
+        existing_course_titles: set,
+        errors: Optional[Dict[str, str]] = None,
+    ) -> Optional[int]:
+        """
+        Index one result of _process_course_files and report it.
+
+        Failures are printed and, if an errors dict is given, recorded in it
+        under the file's path.
+
+        Returns:
+            Number of chunks written, or None if the file was not indexed
+        """
+        file_name = os.path.basename(file_path)
+        if isinstance(result, Exception):
+            print(f"Error processing {file_name}: {result}")
+            if errors is not None:
+                errors[file_path] = str(result)
+            return None
+
+        course, chunk_batches, parse_seconds = result
+        if not course:
+            if errors is not None:
+                errors[file_path] = "No course found in file"
+            return None
+        try:
+            write_started = time.perf_counter()
+            indexed = self._index_course(
+                file_path, course, chunk_batches, existing_course_titles
+            )
+            write_seconds = time.perf_counter() - write_started
+            if indexed is None:
+                return None
+
+            is_new, chunk_count = indexed
+            timing = (
+                f"streamed in {write_seconds:.2f}s"
+                if parse_seconds is None
+                else f"parse {parse_seconds:.2f}s, write {write_seconds:.2f}s"
+            )
+            print(
+                f"{'Added new' if is_new else 'Updated'} course: {course.title} "
+                f"({chunk_count} chunks, {timing})"
+            )
+            return chunk_count
+        except Exception as e:
+            print(f"Error processing {file_name}: {e}")
+            if errors is not None:
+                errors[file_path] = str(e)
+            return None
+
+    def _index_course(
+        self,
+        file_path: str,
+        course: Course,
+        chunk_batches: Iterable[List[CourseChunk]],
+        existing_course_titles: set,
+    ) -> Optional[Tuple[bool, int]]:
+        """
+        Upsert a parsed course into the vector store and record it in the manifest.
+
+        Chunks are written in batches of at most config.INGEST_BATCH_SIZE as
+        they are produced; the catalog entry is written afterwards, once the
+        course's lesson list is complete.
+
+        Args:
+            file_path: Path of the file the course was parsed from
+            course: Parsed course metadata
+            chunk_batches: Iterable of chunk lists, e.g. one per lesson
+            existing_course_titles: Indexed course titles, updated in place
+
+        Returns:
+            Tuple of (whether the course is new, number of chunks), or None when
+            the course is already provided by a different file and was skipped
+        """
+        owner = self.manifest.find_course_file(course.title)
+        if course.title in existing_course_titles and owner not in (
+            None,
+            self.manifest.path_key(file_path),
+        ):
+            print(f"Course already exists: {course.title} - skipping")
+            if hasattr(chunk_batches, "close"):
+                chunk_batches.close()
+            return None
+
+        # A retitled file would otherwise leave its old course behind
+        previous = self.manifest.get(file_path)
+        if previous and previous.get("course_title") != course.title:
+            self.vector_store.delete_course(previous["course_title"])
+            existing_course_titles.discard(previous["course_title"])
+
+        is_new = course.title not in existing_course_titles
+        chunk_ids = self.vector_store.upsert_course_content(
+            course.title,
+            self._bounded_batches(chunk_batches, self.config.INGEST_BATCH_SIZE),
+        )
+        self.vector_store.add_course_metadata(course)
+        self.manifest.record(file_path, course.title, chunk_ids)
+        existing_course_titles.add(course.title)
+        return is_new, len(chunk_ids)
+
+    @staticmethod
+    def _bounded_batches(
+        chunk_batches: Iterable[List[CourseChunk]], batch_size: int
+    ) -> Iterator[List[CourseChunk]]:
+        """Regroup chunk lists into batches of at most batch_size chunks"""
+        batch: List[CourseChunk] = []
+        for chunks in chunk_batches:
+            for chunk in chunks:
+                batch.append(chunk)
+                if len(batch) >= batch_size:
+                    yield batch
+                    batch = []
+        if batch:
+            yield batch
+
+    def _process_course_files(
+        self, file_paths: List[str], workers: int
+    ) -> Iterator[Tuple[str, Any]]:
+        """
+        Parse and chunk course files, yielding results in input order.
+
+        Each yielded result is either a (Course, chunk batches, parse seconds)
+        tuple or the exception raised while processing that file. Serially,
+        files are streamed: only the header is parsed up front, the chunk
+        batches are produced lazily and parse seconds is None. With a process
+        pool, each file is parsed fully in a worker.
+        """
+        if workers <= 1:
+            for file_path in file_paths:
                 try:
-                    # Check if this course might already exist
-                    # We'll process the document to get the course ID, but only add if new
-                    course, course_chunks = (
-                        self.document_processor.process_course_document(file_path)
+                    course, lesson_chunks = (
+                        self.document_processor.stream_course_document(file_path)
                     )
-
-                    if course and course.title not in existing_course_titles:
-                        # This is a new course - add it to the vector store
-                        self.vector_store.add_course_metadata(course)
-                        self.vector_store.add_course_content(course_chunks)
-                        total_courses += 1
-                        total_chunks += len(course_chunks)
-                        print(
-                            f"Added new course: {course.title} ({len(course_chunks)} chunks)"
-                        )
-                        existing_course_titles.add(course.title)
-                    elif course:
-                        print(f"Course already exists: {course.title} - skipping")
+                    yield file_path, (course, lesson_chunks, None)
                 except Exception as e:
-                    print(f"Error processing {file_name}: {e}")
-
-        return total_courses, total_chunks
+                    yield file_path, e
+            return
+
+        chunk_size = self.config.CHUNK_SIZE
+        chunk_overlap = self.config.CHUNK_OVERLAP
+        # Spawn rather than fork: the server runs other threads (tool pool,
+        # watcher, ingest worker) whose held locks a forked child would inherit
+        with ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+        ) as executor:
+            futures = [
+                executor.submit(
+                    process_course_file, file_path, chunk_size, chunk_overlap
+                )
+                for file_path in file_paths
+            ]
+            for file_path, future in zip(file_paths, futures):
+                try:
+                    course, course_chunks, parse_seconds = future.result()
+                    yield file_path, (course, [course_chunks], parse_seconds)
+                except Exception as e:
+                    yield file_path, e
 
     def query(
         self, query: str, session_id: Optional[str] = None
@@ -134,35 +495,326 @@ class RAGSystem:
         Returns:
             Tuple of (response, sources list - empty for tool-based approach)
         """
-        # Create prompt for the AI with clear instructions
+        # Get conversation history if session exists
+        history = None
+        if session_id:
+            history = self.session_manager.get_history_messages(session_id)
+
+        # A first-turn question like an earlier one is answered from the cache
+        cache_key = self._answer_cache_key(query, history)
+        cached = self._cached_answer(cache_key)
+        if cached:
+            response, sources = cached
+            if session_id:
+                self.session_manager.add_exchange(session_id, query, response)
+            return response, sources
+
+        # Generate response using AI with tools; identical first-turn questions
+        # asked at the same time share one generation
+        flight_key = self._flight_key(query, history)
+        if flight_key is None:
+            response, sources = self._generate_answer(query, history, cache_key)
+        else:
+            response, sources = self.query_flights.do(
+                flight_key, lambda: self._generate_answer(query, history, cache_key)
+            )
+            sources = list(sources)
+
+        # Update conversation history
+        if session_id:
+            self.session_manager.add_exchange(session_id, query, response)
+
+        # Return response with sources from tool searches
+        return response, sources
+
+    def _generate_answer(
+        self,
+        query: str,
+        history: Optional[List[Dict[str, str]]],
+        cache_key: Optional[Tuple[Any, int, Tuple]],
+    ) -> Tuple[str, List[str]]:
+        """Run Claude with the search tools for query() and cache the answer"""
         prompt = f"""Answer this question about course materials: {query}"""
 
-        # Get conversation history if session exists
+        sources: List[str] = []
+        prefetch = self._start_prefetch(query)
+        try:
+            response = self.ai_generator.generate_response(
+                query=prompt,
+                conversation_history=history,
+                tools=self.tool_manager.get_tool_definitions(),
+                tool_manager=self.tool_manager,
+                max_rounds=self.config.MAX_TOOL_ROUNDS,
+                run_tools=self._source_collector(sources, prefetch),
+            )
+        finally:
+            if prefetch:
+                prefetch.close()
+
+        self._cache_answer(query, cache_key, response, sources)
+        return response, sources
+
+    async def aquery(
+        self, query: str, session_id: Optional[str] = None
+    ) -> Tuple[str, List[str]]:
+        """
+        Async version of query for serving many queries on one event loop.
+
+        Claude is called through the async client and tool calls run on the
+        bounded query executor, so the event loop is free while a query waits
+        on the API or the vector store. Sources are collected per query.
+
+        Args:
+            query: User's question
+            session_id: Optional session ID for conversation context
+
+        Returns:
+            Tuple of (response, sources from this query's searches)
+        """
         history = None
         if session_id:
-            history = self.session_manager.get_conversation_history(session_id)
-
-        # Generate response using AI with tools
-        response = self.ai_generator.generate_response(
-            query=prompt,
-            conversation_history=history,
-            tools=self.tool_manager.get_tool_definitions(),
-            tool_manager=self.tool_manager,
-            max_rounds=self.config.MAX_TOOL_ROUNDS,
+            history = self.session_manager.get_history_messages(session_id)
+
+        # Embedding the question may run the model, so keep it off the loop
+        cache_key = await asyncio.get_running_loop().run_in_executor(
+            self.query_executor, self._answer_cache_key, query, history
         )
+        cached = self._cached_answer(cache_key)
+        if cached:
+            response, sources = cached
+            if session_id:
+                self.session_manager.add_exchange(session_id, query, response)
+            return response, sources
+
+        flight_key = self._flight_key(query, history)
+        if flight_key is None:
+            response, sources = await self._agenerate_answer(query, history, cache_key)
+        else:
+            response, sources = await self.query_flights.ado(
+                flight_key, lambda: self._agenerate_answer(query, history, cache_key)
+            )
+            sources = list(sources)
 
-        # Get sources from the search tool
-        sources = self.tool_manager.get_last_sources()
+        if session_id:
+            self.session_manager.add_exchange(session_id, query, response)
 
-        # Reset sources after retrieving them
-        self.tool_manager.reset_sources()
+        return response, sources
 
-        # Update conversation history
+    async def _agenerate_answer(
+        self,
+        query: str,
+        history: Optional[List[Dict[str, str]]],
+        cache_key: Optional[Tuple[Any, int, Tuple]],
+    ) -> Tuple[str, List[str]]:
+        """Run Claude with the search tools for aquery() and cache the answer"""
+        prompt = f"""Answer this question about course materials: {query}"""
+
+        sources: List[str] = []
+        prefetch = self._start_prefetch(query)
+        try:
+            response = await self.ai_generator.agenerate_response(
+                query=prompt,
+                conversation_history=history,
+                tools=self.tool_manager.get_tool_definitions(),
+                tool_manager=self.tool_manager,
+                max_rounds=self.config.MAX_TOOL_ROUNDS,
+                run_tools=self._tool_runner(sources, prefetch),
+            )
+        finally:
+            if prefetch:
+                prefetch.close()
+
+        self._cache_answer(query, cache_key, response, sources)
+        return response, sources
+
+    async def astream_query(
+        self, query: str, session_id: Optional[str] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream a query's progress and answer as events.
+
+        Yields the "text", "status" and "tool" events of
+        AIGenerator.astream_response, then {"type": "sources", "sources": [...]}
+        once the answer is complete. Text a "status" event takes back is left
+        out of the answer recorded in the session at the end.
+
+        Args:
+            query: User's question
+            session_id: Optional session ID for conversation context
+        """
+        prompt = f"""Answer this question about course materials: {query}"""
+
+        history = None
+        if session_id:
+            history = self.session_manager.get_history_messages(session_id)
+
+        cache_key = await asyncio.get_running_loop().run_in_executor(
+            self.query_executor, self._answer_cache_key, query, history
+        )
+        cached = self._cached_answer(cache_key)
+        if cached:
+            response, sources = cached
+            yield {"type": "text", "text": response}
+            if session_id:
+                self.session_manager.add_exchange(session_id, query, response)
+            yield {"type": "sources", "sources": sources}
+            return
+
+        sources: List[str] = []
+        answer: List[str] = []
+        round_start = 0
+        prefetch = self._start_prefetch(query)
+        try:
+            async for event in self.ai_generator.astream_response(
+                query=prompt,
+                conversation_history=history,
+                tools=self.tool_manager.get_tool_definitions(),
+                tool_manager=self.tool_manager,
+                max_rounds=self.config.MAX_TOOL_ROUNDS,
+                run_tools=self._tool_runner(sources, prefetch),
+            ):
+                if event["type"] == "text":
+                    answer.append(event["text"])
+                elif event["type"] == "status":
+                    # The text since the last tool round came before more tools
+                    del answer[round_start:]
+                elif event["type"] == "tool":
+                    round_start = len(answer)
+                yield event
+        finally:
+            if prefetch:
+                prefetch.close()
+
+        response = "".join(answer)
+        self._cache_answer(query, cache_key, response, sources)
         if session_id:
             self.session_manager.add_exchange(session_id, query, response)
 
-        # Return response with sources from tool searches
-        return response, sources
+        yield {"type": "sources", "sources": sources}
+
+    def _answer_cache_key(
+        self, query: str, history: Optional[List[Dict[str, str]]]
+    ) -> Optional[Tuple[Any, int, Tuple]]:
+        """
+        Embedding, index generation and signature to look a question up by.
+
+        Returns None when the answer cache is disabled or the question follows
+        earlier turns, since its answer then depends on the conversation.
+        """
+        if not self.config.SEMANTIC_ANSWER_CACHE or history:
+            return None
+        # Read the generation first so an answer is never filed under a newer index
+        generation = self.vector_store.generation
+        embedding = self.vector_store.embed_query(query)
+        return embedding, generation, self._question_signature(query)
+
+    def _question_signature(self, query: str) -> Tuple:
+        """
+        Details a cached answer's question must share exactly with a new one.
+
+        "Lesson 1 of the MCP course" and "lesson 2 of the MCP course" embed
+        almost identically, so the numbers and the courses a question mentions
+        have to match on top of the similarity threshold.
+        """
+        numbers = tuple(
+            int(number) if number.isdigit() else _NUMBER_WORDS.index(number.lower())
+            for number in _NUMBER.findall(query)
+        )
+        courses = self.vector_store.course_resolver.mentioned_titles(query)
+        return numbers, tuple(sorted(courses))
+
+    def _flight_key(
+        self, query: str, history: Optional[List[Dict[str, str]]]
+    ) -> Optional[str]:
+        """
+        Key under which identical in-flight questions share one answer.
+
+        Returns None when coalescing is disabled or the question follows
+        earlier turns, since its answer then depends on the conversation.
+        """
+        if not self.config.COALESCE_QUERIES or history:
+            return None
+        return QueryEmbeddingCache.normalize(query).lower()
+
+    def _cached_answer(
+        self, cache_key: Optional[Tuple[Any, int, Tuple]]
+    ) -> Optional[Tuple[str, List[str]]]:
+        """Cached (response, sources) for a similar earlier question, if any"""
+        if cache_key is None:
+            return None
+        cached = self.answer_cache.get(*cache_key)
+        if cached is None:
+            return None
+        response, sources = cached
+        return response, list(sources)
+
+    def _cache_answer(
+        self,
+        query: str,
+        cache_key: Optional[Tuple[Any, int, Tuple]],
+        response: str,
+        sources: List[str],
+    ):
+        """Remember a first-turn answer for similar questions"""
+        if cache_key is not None:
+            embedding, generation, signature = cache_key
+            self.answer_cache.put(
+                query, embedding, generation, (response, list(sources)), signature
+            )
+
+    def _start_prefetch(self, query: str) -> Optional[SpeculativeSearch]:
+        """Start searching the raw question if speculative prefetch is enabled"""
+        if not self.config.SPECULATIVE_PREFETCH:
+            return None
+        return SpeculativeSearch(
+            self.vector_store,
+            query,
+            self.query_executor,
+            self.prefetch_stats,
+            min_overlap=self.config.PREFETCH_MIN_OVERLAP,
+        )
+
+    def _source_collector(
+        self, sources: List[str], prefetch: Optional[SpeculativeSearch] = None
+    ) -> Callable[[List[Tuple[str, Dict[str, Any]]]], List[str]]:
+        """
+        Tool executor for one query's rounds.
+
+        The query reports the sources of its latest search; they are written
+        into the given list rather than kept on the shared tools. A matching
+        search call is answered from the query's prefetch, if any.
+        """
+
+        def run_tools(calls: List[Tuple[str, Dict[str, Any]]]) -> List[str]:
+            outputs, round_sources = self.tool_manager.run_tools(calls, prefetch)
+            if round_sources:
+                sources[:] = round_sources
+            return outputs
+
+        return run_tools
+
+    def _tool_runner(
+        self, sources: List[str], prefetch: Optional[SpeculativeSearch] = None
+    ) -> Callable[[List[Tuple[str, Dict[str, Any]]]], Awaitable[List[str]]]:
+        """Async version of _source_collector that runs on the query executor"""
+        collect = self._source_collector(sources, prefetch)
+
+        async def run_tools(calls: List[Tuple[str, Dict[str, Any]]]) -> List[str]:
+            return await asyncio.get_running_loop().run_in_executor(
+                self.query_executor, collect, calls
+            )
+
+        return run_tools
+
+    def get_cache_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Get hit/miss counters for the system's caches and prompt cache usage"""
+        return {
+            **self.vector_store.get_cache_stats(),
+            "prompt_cache": self.ai_generator.get_usage_stats(),
+            "prefetch": self.prefetch_stats.stats(),
+            "answers": self.answer_cache.stats(),
+            "query_flights": self.query_flights.stats(),
+        }
 
     def get_course_analytics(self) -> Dict:
         """Get analytics about the course catalog"""
@@ -1,7 +1,15 @@
+import threading
+import time
 from abc import ABC, abstractmethod
-from typing import Any, Dict, Optional, Protocol
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Dict, List, Optional, Protocol, Tuple
 
-from vector_store import SearchResults, VectorStore
+from prefetch import SpeculativeSearch
+from vector_store import SearchRequest, SearchResults, VectorStore
+
+# A tool's text output and the sources it used, for one call
+ToolResult = Tuple[str, List[Dict[str, Any]]]
 
 
 class Tool(ABC):
@@ -17,6 +25,16 @@ class Tool(ABC):
         """Execute the tool with given parameters"""
         pass
 
+    def run(self, prefetch: Optional[SpeculativeSearch] = None, **kwargs) -> ToolResult:
+        """
+        Execute the tool for one query without changing the tool's state.
+
+        Concurrent queries share tool instances, so tools that track sources
+        return them here instead of storing them. The default runs execute
+        and reports no sources.
+        """
+        return self.execute(**kwargs), []
+
 
 class CourseSearchTool(Tool):
     """Tool for searching course content with semantic course name matching"""
@@ -67,15 +85,92 @@ class CourseSearchTool(Tool):
         Returns:
             Formatted search results or error message
         """
+        output, self.last_sources = self.run(
+            query=query,
+            course_name=course_name,
+            lesson_number=lesson_number,
+        )
+        return output
+
+    def run(
+        self,
+        prefetch: Optional[SpeculativeSearch] = None,
+        *,
+        query: str,
+        course_name: Optional[str] = None,
+        lesson_number: Optional[int] = None,
+    ) -> ToolResult:
+        """Search for one query and return the output with its sources"""
+        # Use the prefetched results or the vector store's unified search interface
+        results = prefetch.take(query, course_name, lesson_number) if prefetch else None
+        if results is None:
+            results = self.store.search(
+                query=query, course_name=course_name, lesson_number=lesson_number
+            )
+        return self._format_search(results, course_name, lesson_number)
+
+    def execute_many(self, calls: List[Dict[str, Any]]) -> List[str]:
+        """
+        Execute several searches as one vector store batch.
 
-        # Use the vector store's unified search interface
-        results = self.store.search(
-            query=query, course_name=course_name, lesson_number=lesson_number
+        Args:
+            calls: Keyword arguments of each search, as passed to execute
+
+        Returns:
+            Formatted results or error message for each call, in order
+        """
+        results = self.run_many(calls)
+        # Keep the sources of every search in the batch, not just the last
+        self.last_sources = [source for _, sources in results for source in sources]
+        return [output for output, _ in results]
+
+    def run_many(
+        self,
+        calls: List[Dict[str, Any]],
+        prefetch: Optional[SpeculativeSearch] = None,
+    ) -> List[ToolResult]:
+        """Search for several calls as one batch, without changing tool state"""
+        results: List[Optional[SearchResults]] = [
+            (
+                prefetch.take(
+                    call["query"], call.get("course_name"), call.get("lesson_number")
+                )
+                if prefetch
+                else None
+            )
+            for call in calls
+        ]
+        pending = [i for i, result in enumerate(results) if result is None]
+        searched = self.store.search_many(
+            [
+                SearchRequest(
+                    calls[i]["query"],
+                    calls[i].get("course_name"),
+                    calls[i].get("lesson_number"),
+                )
+                for i in pending
+            ]
         )
+        for i, result in zip(pending, searched):
+            results[i] = result
+
+        return [
+            self._format_search(
+                result, call.get("course_name"), call.get("lesson_number")
+            )
+            for call, result in zip(calls, results)
+        ]
 
+    def _format_search(
+        self,
+        results: SearchResults,
+        course_name: Optional[str],
+        lesson_number: Optional[int],
+    ) -> ToolResult:
+        """Turn search results into the tool's text output and sources"""
         # Handle errors
         if results.error:
-            return results.error
+            return results.error, []
 
         # Handle empty results
         if results.is_empty():
@@ -84,12 +179,12 @@ class CourseSearchTool(Tool):
                 filter_info += f" in course '{course_name}'"
             if lesson_number:
                 filter_info += f" in lesson {lesson_number}"
-            return f"No relevant content found{filter_info}."
+            return f"No relevant content found{filter_info}.", []
 
         # Format and return results
         return self._format_results(results)
 
-    def _format_results(self, results: SearchResults) -> str:
+    def _format_results(self, results: SearchResults) -> ToolResult:
         """Format search results with course and lesson context"""
         formatted = []
         sources = []  # Track sources for the UI with links
@@ -130,10 +225,7 @@ class CourseSearchTool(Tool):
 
             formatted.append(f"{header}\n{doc}")
 
-        # Store sources for retrieval
-        self.last_sources = sources
-
-        return "\n\n".join(formatted)
+        return "\n\n".join(formatted), sources
 
 
 class CourseOutlineTool(Tool):
@@ -202,16 +294,34 @@ class CourseOutlineTool(Tool):
 class ToolManager:
     """Manages available tools for the AI"""
 
-    def __init__(self):
+    def __init__(self, max_workers: int = 4, timeout: Optional[float] = None):
+        """
+        Args:
+            max_workers: Threads running tool calls, shared by concurrent rounds
+            timeout: Default seconds to wait for a tool's calls; None waits forever
+        """
         self.tools = {}
+        self.timeouts: Dict[str, Optional[float]] = {}
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+
+    def register_tool(self, tool: Tool, timeout: Optional[float] = None):
+        """
+        Register any tool that implements the Tool interface.
 
-    def register_tool(self, tool: Tool):
-        """Register any tool that implements the Tool interface"""
+        Args:
+            tool: The tool to register
+            timeout: Seconds to wait for this tool's calls instead of the default
+        """
         tool_def = tool.get_tool_definition()
         tool_name = tool_def.get("name")
         if not tool_name:
             raise ValueError("Tool must have a 'name' in its definition")
         self.tools[tool_name] = tool
+        if timeout is not None:
+            self.timeouts[tool_name] = timeout
 
     def get_tool_definitions(self) -> list:
         """Get all tool definitions for Anthropic tool calling"""
@@ -224,6 +334,148 @@ class ToolManager:
 
         return self.tools[tool_name].execute(**kwargs)
 
+    def execute_tools(self, calls: List[Tuple[str, Dict[str, Any]]]) -> List[str]:
+        """
+        Execute several tool calls and keep their sources for get_last_sources.
+
+        Args:
+            calls: (tool name, keyword arguments) for each call
+
+        Returns:
+            One result per call, in order, as from run_tools
+        """
+        outputs, sources_by_tool = self._run_round(calls)
+        for tool_name, sources in sources_by_tool.items():
+            tool = self.tools[tool_name]
+            if hasattr(tool, "last_sources"):
+                tool.last_sources = sources
+        return outputs
+
+    def run_tools(
+        self,
+        calls: List[Tuple[str, Dict[str, Any]]],
+        prefetch: Optional[SpeculativeSearch] = None,
+    ) -> Tuple[List[str], List[Dict[str, Any]]]:
+        """
+        Execute one round of tool calls for a query, batching where supported.
+
+        Calls to different tools run concurrently, so a round takes as long as
+        its slowest tool. Calls to the same tool run in one worker, in order.
+        Tools are called through run(), which leaves their state alone, so
+        concurrent queries can share them and a call abandoned after its
+        timeout cannot affect another query.
+
+        Args:
+            calls: (tool name, keyword arguments) for each call
+            prefetch: The query's speculative search, if any
+
+        Returns:
+            Tuple of (one result per call, in order, with an error message for
+            a call that raised or timed out; the round's sources)
+        """
+        outputs, sources_by_tool = self._run_round(calls, prefetch)
+        # Like get_last_sources, report the first tool that found sources
+        for tool_name in self.tools:
+            if sources_by_tool.get(tool_name):
+                return outputs, sources_by_tool[tool_name]
+        return outputs, []
+
+    def _run_round(
+        self,
+        calls: List[Tuple[str, Dict[str, Any]]],
+        prefetch: Optional[SpeculativeSearch] = None,
+    ) -> Tuple[List[str], Dict[str, List[Dict[str, Any]]]]:
+        """Run a round's calls and group the sources by the tool that found them"""
+        outputs: List[Optional[str]] = [None] * len(calls)
+        sources_by_tool: Dict[str, List[Dict[str, Any]]] = {}
+        by_tool: Dict[str, List[int]] = {}
+        for i, (tool_name, _) in enumerate(calls):
+            by_tool.setdefault(tool_name, []).append(i)
+
+        def collect(tool_name: str, results: List[ToolResult]):
+            for i, (output, _) in zip(by_tool[tool_name], results):
+                outputs[i] = output
+            if tool_name in self.tools:
+                sources_by_tool[tool_name] = [
+                    source for _, sources in results for source in sources
+                ]
+
+        if len(by_tool) == 1 and self._tool_timeout(next(iter(by_tool))) is None:
+            # Nothing to overlap or time out; skip the thread hop
+            tool_name, indices = next(iter(by_tool.items()))
+            collect(
+                tool_name,
+                self._run_tool_calls(
+                    tool_name, [calls[i][1] for i in indices], prefetch
+                ),
+            )
+            return outputs, sources_by_tool
+
+        executor = self._get_executor()
+        started = time.monotonic()
+        futures = {
+            tool_name: executor.submit(
+                self._run_tool_calls,
+                tool_name,
+                [calls[i][1] for i in indices],
+                prefetch,
+            )
+            for tool_name, indices in by_tool.items()
+        }
+        for tool_name, future in futures.items():
+            timeout = self._tool_timeout(tool_name)
+            remaining = None
+            if timeout is not None:
+                remaining = max(0.0, started + timeout - time.monotonic())
+            try:
+                collect(tool_name, future.result(timeout=remaining))
+            except FutureTimeoutError:
+                # The worker finishes in the background; its results are dropped
+                for i in by_tool[tool_name]:
+                    outputs[i] = (
+                        f"Error executing tool {tool_name}: "
+                        f"timed out after {timeout:g}s"
+                    )
+
+        return outputs, sources_by_tool
+
+    def _run_tool_calls(
+        self,
+        tool_name: str,
+        calls: List[Dict[str, Any]],
+        prefetch: Optional[SpeculativeSearch] = None,
+    ) -> List[ToolResult]:
+        """Run one tool's calls in order; a failing call gets its error message"""
+        tool = self.tools.get(tool_name)
+        if tool is None:
+            return [(f"Tool '{tool_name}' not found", [])] * len(calls)
+        if len(calls) > 1 and hasattr(tool, "run_many"):
+            try:
+                return tool.run_many(calls, prefetch)
+            except Exception:
+                pass  # Run the calls one by one so each reports its own error
+
+        results = []
+        for kwargs in calls:
+            try:
+                results.append(tool.run(prefetch, **kwargs))
+            except Exception as e:
+                results.append((f"Error executing tool {tool_name}: {str(e)}", []))
+        return results
+
+    def _tool_timeout(self, tool_name: str) -> Optional[float]:
+        """Seconds to wait for a tool's calls, or None to wait until done"""
+        return self.timeouts.get(tool_name, self.timeout)
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Thread pool that runs the tools of a round in parallel"""
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=max(1, self.max_workers), thread_name_prefix="tool"
+                )
+            return self._executor
+
     def get_last_sources(self) -> list:
         """Get sources from the last search operation"""
         # Check all tools for last_sources attribute
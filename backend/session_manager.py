@@ -60,6 +60,16 @@ class SessionManager:
 
         return "\n".join(formatted_messages)
 
+    def get_history_messages(self, session_id: Optional[str]) -> List[Dict[str, str]]:
+        """Get a session's history as role/content dicts for the messages API"""
+        if not session_id or session_id not in self.sessions:
+            return []
+
+        return [
+            {"role": msg.role, "content": msg.content}
+            for msg in self.sessions[session_id]
+        ]
+
     def clear_session(self, session_id: str):
         """Clear all messages from a session"""
         if session_id in self.sessions:
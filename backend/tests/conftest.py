@@ -2,11 +2,13 @@
 Pytest configuration and fixtures for RAG chatbot tests.
 """
 
+import hashlib
+import json
 import os
 import sys
 from dataclasses import dataclass
 from typing import Any, Dict, List, Optional
-from unittest.mock import MagicMock, Mock, patch
+from unittest.mock import AsyncMock, MagicMock, Mock, patch
 
 import pytest
 
@@ -150,6 +152,9 @@ def mock_vector_store(sample_course_data):
         )
 
     mock_store.search = Mock(side_effect=mock_search)
+    mock_store.search_many = Mock(
+        side_effect=lambda requests: [mock_search(*request[:3]) for request in requests]
+    )
 
     # Mock link retrieval methods
     mock_store.get_course_link = Mock(return_value="https://example.com/course/123")
@@ -298,6 +303,104 @@ def create_mock_tool_use(tool_name: str, tool_input: dict, tool_id: str = None):
     return mock_tool
 
 
+def write_course_file(folder, file_name: str, title: str, lessons: int = 2) -> str:
+    """
+    Helper function to write a small course document in the expected format.
+
+    Args:
+        folder: Directory to write the file into
+        file_name: Name of the file to create
+        title: Course title
+        lessons: Number of lessons to generate
+
+    Returns:
+        Path of the written file
+    """
+    lines = [
+        f"Course Title: {title}",
+        f"Course Link: https://example.com/{file_name}",
+        "Course Instructor: Test Instructor",
+        "",
+    ]
+    for number in range(lessons):
+        lines.append(f"Lesson {number}: Topic {number}")
+        lines.append(f"Lesson Link: https://example.com/{file_name}/{number}")
+        for sentence in range(30):
+            lines.append(
+                f"This is sentence {sentence} of lesson {number} in {title}. "
+                f"It explains concept {sentence} in some detail."
+            )
+    path = os.path.join(str(folder), file_name)
+    with open(path, "w", encoding="utf-8") as file:
+        file.write("\n".join(lines))
+    return path
+
+
+@pytest.fixture
+def course_folder(tmp_path):
+    """Folder with a few small course documents"""
+    for index in range(3):
+        write_course_file(tmp_path, f"course{index}.txt", f"Test Course {index}")
+    return str(tmp_path)
+
+
+def make_fake_embedding_function(dimensions: int = 64):
+    """
+    Helper function to build a deterministic embedding function for ChromaDB.
+
+    Texts are embedded as normalized bag-of-words hash vectors, so texts that
+    share words are close together. Every embedded text is recorded in the
+    `embedded` list so tests can count model calls.
+    """
+    import numpy as np
+    from chromadb.api.types import EmbeddingFunction
+
+    class FakeEmbeddingFunction(EmbeddingFunction):
+        def __init__(self):
+            self.embedded = []
+
+        def __call__(self, input):
+            self.embedded.extend(input)
+            vectors = []
+            for text in input:
+                vector = np.zeros(dimensions, dtype=np.float32)
+                for word in text.lower().split():
+                    word = word.strip(".,!?:;\"'()")
+                    if word:
+                        digest = hashlib.md5(word.encode("utf-8")).digest()
+                        vector[int.from_bytes(digest[:4], "little") % dimensions] += 1
+                norm = np.linalg.norm(vector)
+                vectors.append(vector / norm if norm else vector)
+            return vectors
+
+    return FakeEmbeddingFunction()
+
+
+@pytest.fixture
+def fake_embedding_function():
+    """Deterministic embedding function that records embedded texts"""
+    return make_fake_embedding_function()
+
+
+@pytest.fixture(params=["chroma", "numpy", "numpy-int8", "numpy-binary"])
+def real_vector_store(request, tmp_path, fake_embedding_function):
+    """VectorStore on each backend in a temporary directory with fake embeddings"""
+    backend, _, quantization = request.param.partition("-")
+    with patch(
+        "chromadb.utils.embedding_functions.SentenceTransformerEmbeddingFunction",
+        return_value=fake_embedding_function,
+    ):
+        from vector_store import VectorStore
+
+        return VectorStore(
+            str(tmp_path / "chroma"),
+            "fake-model",
+            max_results=5,
+            backend=backend,
+            quantization=quantization or "none",
+        )
+
+
 # ============================================================================
 # API Testing Fixtures
 # ============================================================================
@@ -319,10 +422,30 @@ def mock_rag_system():
         ]
     ))
 
+    # Async query path used by the API delegates to the query mock
+    mock_rag.aquery = AsyncMock(side_effect=lambda *args: mock_rag.query(*args))
+
+    # Streamed query: one tool call, the answer in two pieces, then sources
+    async def astream_query(query, session_id=None):
+        yield {"type": "tool", "name": "search_course_content", "input": {"query": query}}
+        yield {"type": "text", "text": "This is a test "}
+        yield {"type": "text", "text": "streamed response."}
+        yield {"type": "sources", "sources": [{"text": "Introduction to MCP - Lesson 1"}]}
+
+    mock_rag.astream_query = Mock(side_effect=astream_query)
+
     # Mock session manager
     mock_rag.session_manager = Mock()
     mock_rag.session_manager.create_session = Mock(return_value="test_session_123")
 
+    # Mock cache statistics
+    mock_rag.get_cache_stats = Mock(return_value={
+        "query_embeddings": {"memory_hits": 3, "disk_hits": 1, "misses": 2}
+    })
+
+    # Mock folder ingestion
+    mock_rag.add_course_folder = Mock(return_value=(2, 10))
+
     # Mock get_course_analytics
     mock_rag.get_course_analytics = Mock(return_value={
         "total_courses": 2,
@@ -336,12 +459,14 @@ def mock_rag_system():
 
 
 @pytest.fixture
-def test_client(mock_rag_system):
+def test_client(mock_rag_system, tmp_path):
     """Create TestClient with mocked RAG system"""
     from fastapi.testclient import TestClient
     from fastapi import FastAPI, HTTPException
+    from fastapi.responses import StreamingResponse
     from pydantic import BaseModel
     from typing import List, Optional, Dict
+    from ingest_jobs import IngestJobManager, resolve_ingest_paths
 
     # Create a test app without static file mounting
     test_app = FastAPI(title="Test Course Materials RAG System")
@@ -368,7 +493,7 @@ def test_client(mock_rag_system):
             if not session_id:
                 session_id = mock_rag_system.session_manager.create_session()
 
-            answer, sources = mock_rag_system.query(request.query, session_id)
+            answer, sources = await mock_rag_system.aquery(request.query, session_id)
 
             return QueryResponse(
                 answer=answer,
@@ -378,6 +503,27 @@ def test_client(mock_rag_system):
         except Exception as e:
             raise HTTPException(status_code=500, detail=str(e))
 
+    @test_app.post("/api/query/stream")
+    async def stream_query(request: QueryRequest):
+        session_id = request.session_id
+        if not session_id:
+            session_id = mock_rag_system.session_manager.create_session()
+
+        def sse_event(event, data):
+            return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+        async def events():
+            yield sse_event("session", {"session_id": session_id})
+            try:
+                async for event in mock_rag_system.astream_query(request.query, session_id):
+                    yield sse_event(event.pop("type"), event)
+            except Exception as e:
+                yield sse_event("error", {"detail": str(e)})
+                return
+            yield sse_event("done", {})
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
     @test_app.get("/api/courses", response_model=CourseStats)
     async def get_course_stats():
         try:
@@ -389,11 +535,47 @@ def test_client(mock_rag_system):
         except Exception as e:
             raise HTTPException(status_code=500, detail=str(e))
 
+    @test_app.get("/api/cache-stats")
+    async def get_cache_stats():
+        return mock_rag_system.get_cache_stats()
+
+    ingest_jobs = IngestJobManager(mock_rag_system)
+
+    class IngestRequest(BaseModel):
+        paths: List[str]
+        clear_existing: bool = False
+
+    @test_app.post("/api/ingest", status_code=202)
+    async def enqueue_ingest(request: IngestRequest):
+        if not request.paths:
+            raise HTTPException(status_code=400, detail="No paths given")
+        if request.clear_existing:
+            raise HTTPException(status_code=403, detail="Clearing is disabled")
+        try:
+            # The test's tmp_path stands in for the docs folder
+            paths = resolve_ingest_paths(request.paths, str(tmp_path))
+        except PermissionError as e:
+            raise HTTPException(status_code=403, detail=str(e))
+        except FileNotFoundError as e:
+            raise HTTPException(status_code=404, detail=str(e))
+        job = ingest_jobs.submit(paths, clear_existing=request.clear_existing)
+        return job.to_dict()
+
+    @test_app.get("/api/ingest/{job_id}")
+    async def get_ingest_status(job_id: str):
+        job = ingest_jobs.get(job_id)
+        if not job:
+            raise HTTPException(status_code=404, detail="Unknown ingest job")
+        return job.to_dict()
+
     @test_app.get("/")
     async def root():
         return {"message": "RAG Chatbot API"}
 
-    return TestClient(test_app)
+    client = TestClient(test_app)
+    client.ingest_jobs = ingest_jobs
+    yield client
+    ingest_jobs.shutdown(timeout=5)
 
 
 @pytest.fixture
@@ -2,9 +2,10 @@
 Unit tests for AIGenerator in ai_generator.py
 """
 
+import asyncio
 import os
 import sys
-from unittest.mock import MagicMock, Mock, patch
+from unittest.mock import AsyncMock, MagicMock, Mock, patch
 
 import pytest
 
@@ -98,17 +99,21 @@ class TestGenerateResponseWithoutTools:
             api_key=test_config.ANTHROPIC_API_KEY, model=test_config.ANTHROPIC_MODEL
         )
 
-        history = "User: What is AI?\nAssistant: AI is artificial intelligence..."
+        history = [
+            {"role": "user", "content": "What is AI?"},
+            {"role": "assistant", "content": "AI is artificial intelligence..."},
+        ]
 
         response = generator.generate_response(
             query="Tell me more", conversation_history=history
         )
 
-        # Check that history was included
+        # History precedes the query in the messages; the system prompt is static
         call_args = mock_client.messages.create.call_args
-        system_content = call_args.kwargs["system"]
-        assert "Previous conversation:" in system_content
-        assert history in system_content
+        messages = call_args.kwargs["messages"]
+        assert messages[:2] == history
+        assert messages[2]["content"][0]["text"] == "Tell me more"
+        assert call_args.kwargs["system"] == AIGenerator.SYSTEM_BLOCKS
 
 
 class TestGenerateResponseWithTools:
@@ -400,7 +405,7 @@ class TestSystemPrompt:
         generator.generate_response(query="Test")
 
         call_args = mock_client.messages.create.call_args
-        system_content = call_args.kwargs["system"]
+        system_content = call_args.kwargs["system"][0]["text"]
 
         # Should include key parts of system prompt
         assert "course materials" in system_content.lower()
@@ -634,3 +639,315 @@ class TestSequentialToolCalling:
         assert messages[2]["role"] == "user"  # First tool result
         assert messages[3]["role"] == "assistant"  # Second tool use
         assert messages[4]["role"] == "user"  # Second tool result
+
+
+class TestPromptCaching:
+    """Test the cacheable request prefix and usage reporting"""
+
+    @patch("ai_generator.anthropic.Anthropic")
+    def test_breakpoints_on_system_and_latest_message(
+        self,
+        mock_anthropic_class,
+        test_config,
+        mock_anthropic_response_with_tool,
+        mock_anthropic_final_response,
+        mock_tool_manager,
+    ):
+        """Test that each round caches the prefix up to its last message"""
+        mock_client = Mock()
+        mock_client.messages.create = Mock(
+            side_effect=[
+                mock_anthropic_response_with_tool,
+                mock_anthropic_final_response,
+            ]
+        )
+        mock_anthropic_class.return_value = mock_client
+
+        generator = AIGenerator(
+            api_key=test_config.ANTHROPIC_API_KEY, model=test_config.ANTHROPIC_MODEL
+        )
+        generator.generate_response(
+            query="What is prompt caching?",
+            tools=mock_tool_manager.get_tool_definitions(),
+            tool_manager=mock_tool_manager,
+        )
+
+        first, second = [
+            call.kwargs for call in mock_client.messages.create.call_args_list
+        ]
+        assert first["system"][-1]["cache_control"] == {"type": "ephemeral"}
+        assert second["system"] == first["system"]
+        assert first["messages"][0]["content"] == [
+            {
+                "type": "text",
+                "text": "What is prompt caching?",
+                "cache_control": {"type": "ephemeral"},
+            }
+        ]
+        # The breakpoint moves: only the newest message is marked
+        assert "cache_control" not in str(second["messages"][0])
+        assert second["messages"][-1]["content"][-1]["cache_control"] == {
+            "type": "ephemeral"
+        }
+
+    @patch("ai_generator.anthropic.Anthropic")
+    def test_usage_counts_cache_tokens(
+        self, mock_anthropic_class, test_config, mock_anthropic_response_no_tool
+    ):
+        """Test that cache reads and writes are summed across calls"""
+        mock_anthropic_response_no_tool.usage = Mock(
+            input_tokens=20,
+            output_tokens=50,
+            cache_creation_input_tokens=0,
+            cache_read_input_tokens=1180,
+        )
+        mock_client = Mock()
+        mock_client.messages.create = Mock(return_value=mock_anthropic_response_no_tool)
+        mock_anthropic_class.return_value = mock_client
+
+        generator = AIGenerator(
+            api_key=test_config.ANTHROPIC_API_KEY, model=test_config.ANTHROPIC_MODEL
+        )
+        generator.generate_response(query="Hello")
+        generator.generate_response(query="Hello again")
+
+        stats = generator.get_usage_stats()
+        assert stats["requests"] == 2
+        assert stats["cache_read_input_tokens"] == 2360
+        assert stats["input_tokens"] == 40
+        assert stats["cache_hit_rate"] == pytest.approx(2360 / 2400)
+
+
+class TestAsyncGenerateResponse:
+    """Test the async response path used by the API"""
+
+    @patch("ai_generator.anthropic.AsyncAnthropic")
+    def test_tool_round_awaits_run_tools(
+        self,
+        mock_async_class,
+        test_config,
+        mock_anthropic_response_with_tool,
+        mock_anthropic_final_response,
+    ):
+        """Test that tool calls go through run_tools and results reach Claude"""
+        mock_client = Mock()
+        mock_client.messages.create = AsyncMock(
+            side_effect=[
+                mock_anthropic_response_with_tool,
+                mock_anthropic_final_response,
+            ]
+        )
+        mock_async_class.return_value = mock_client
+        run_tools = AsyncMock(return_value=["Search output"])
+
+        generator = AIGenerator(
+            api_key=test_config.ANTHROPIC_API_KEY, model=test_config.ANTHROPIC_MODEL
+        )
+        response = asyncio.run(
+            generator.agenerate_response(
+                query="What is prompt caching?",
+                tools=[{"name": "search_course_content"}],
+                tool_manager=Mock(),
+                run_tools=run_tools,
+            )
+        )
+
+        assert "Prompt caching" in response
+        run_tools.assert_awaited_once_with(
+            [
+                (
+                    "search_course_content",
+                    mock_anthropic_response_with_tool.content[0].input,
+                )
+            ]
+        )
+        second_messages = mock_client.messages.create.call_args_list[1].kwargs[
+            "messages"
+        ]
+        assert second_messages[-1]["content"] == [
+            {
+                "type": "tool_result",
+                "tool_use_id": "tool_12345",
+                "content": "Search output",
+                "cache_control": {"type": "ephemeral"},
+            }
+        ]
+
+    @patch("ai_generator.anthropic.AsyncAnthropic")
+    def test_default_runs_tool_manager_in_thread(
+        self,
+        mock_async_class,
+        test_config,
+        mock_anthropic_response_with_tool,
+        mock_anthropic_final_response,
+    ):
+        """Test that without run_tools the tool manager executes the calls"""
+        mock_client = Mock()
+        mock_client.messages.create = AsyncMock(
+            side_effect=[
+                mock_anthropic_response_with_tool,
+                mock_anthropic_final_response,
+            ]
+        )
+        mock_async_class.return_value = mock_client
+        tool_manager = Mock()
+        tool_manager.execute_tools = Mock(return_value=["Search output"])
+
+        generator = AIGenerator(
+            api_key=test_config.ANTHROPIC_API_KEY, model=test_config.ANTHROPIC_MODEL
+        )
+        asyncio.run(
+            generator.agenerate_response(
+                query="What is prompt caching?",
+                tools=[{"name": "search_course_content"}],
+                tool_manager=tool_manager,
+            )
+        )
+
+        tool_manager.execute_tools.assert_called_once()
+        assert mock_client.messages.create.await_count == 2
+
+
+class FakeStream:
+    """Async stream of one message, like AsyncAnthropic.messages.stream()"""
+
+    def __init__(self, response, deltas, log=None):
+        self.response = response
+        self.deltas = deltas
+        self.log = log if log is not None else []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    @property
+    async def text_stream(self):
+        for delta in self.deltas:
+            yield delta
+
+    async def get_final_message(self):
+        self.log.append("message_stop")
+        return self.response
+
+
+class TestStreamResponse:
+    """Test streamed responses for the SSE endpoint"""
+
+    def collect(self, generator, **kwargs):
+        async def run():
+            return [event async for event in generator.astream_response(**kwargs)]
+
+        return asyncio.run(run())
+
+    @patch("ai_generator.anthropic.AsyncAnthropic")
+    def test_text_streams_as_deltas(
+        self, mock_async_class, test_config, mock_anthropic_response_no_tool
+    ):
+        """Test that a direct answer is yielded piece by piece"""
+        mock_client = Mock()
+        mock_client.messages.stream = Mock(
+            return_value=FakeStream(
+                mock_anthropic_response_no_tool, ["This is ", "a direct response"]
+            )
+        )
+        mock_async_class.return_value = mock_client
+
+        generator = AIGenerator(
+            api_key=test_config.ANTHROPIC_API_KEY, model=test_config.ANTHROPIC_MODEL
+        )
+        events = self.collect(generator, query="Hello")
+
+        assert events == [
+            {"type": "text", "text": "This is "},
+            {"type": "text", "text": "a direct response"},
+        ]
+
+    @patch("ai_generator.anthropic.AsyncAnthropic")
+    def test_tool_events_precede_answer(
+        self,
+        mock_async_class,
+        test_config,
+        mock_anthropic_response_with_tool,
+        mock_anthropic_final_response,
+    ):
+        """Test that deltas stream as they arrive and tool rounds are then marked"""
+        log = []
+        mock_client = Mock()
+        mock_client.messages.stream = Mock(
+            side_effect=[
+                FakeStream(
+                    mock_anthropic_response_with_tool,
+                    ["Let me search", " the course."],
+                    log,
+                ),
+                FakeStream(mock_anthropic_final_response, ["Prompt ", "caching"], log),
+            ]
+        )
+        mock_async_class.return_value = mock_client
+        run_tools = AsyncMock(return_value=["Search output"])
+
+        generator = AIGenerator(
+            api_key=test_config.ANTHROPIC_API_KEY, model=test_config.ANTHROPIC_MODEL
+        )
+
+        async def run():
+            async for event in generator.astream_response(
+                query="What is prompt caching?",
+                tools=[{"name": "search_course_content"}],
+                run_tools=run_tools,
+            ):
+                log.append(event)
+
+        asyncio.run(run())
+
+        # Text before a tool call streams live, then is marked as a status update
+        assert log == [
+            {"type": "text", "text": "Let me search"},
+            {"type": "text", "text": " the course."},
+            "message_stop",
+            {"type": "status", "text": "Let me search the course."},
+            {
+                "type": "tool",
+                "name": "search_course_content",
+                "input": mock_anthropic_response_with_tool.content[0].input,
+            },
+            {"type": "text", "text": "Prompt "},
+            {"type": "text", "text": "caching"},
+            "message_stop",
+        ]
+        run_tools.assert_awaited_once()
+
+    @patch("ai_generator.anthropic.AsyncAnthropic")
+    def test_final_round_streams_without_tools(
+        self,
+        mock_async_class,
+        test_config,
+        mock_anthropic_response_with_tool,
+        mock_anthropic_final_response,
+    ):
+        """Test that the synthesis round after max_rounds offers no tools"""
+        mock_client = Mock()
+        mock_client.messages.stream = Mock(
+            side_effect=[
+                FakeStream(mock_anthropic_response_with_tool, []),
+                FakeStream(mock_anthropic_final_response, ["Answer"]),
+            ]
+        )
+        mock_async_class.return_value = mock_client
+
+        generator = AIGenerator(
+            api_key=test_config.ANTHROPIC_API_KEY, model=test_config.ANTHROPIC_MODEL
+        )
+        events = self.collect(
+            generator,
+            query="Compare the courses",
+            tools=[{"name": "search_course_content"}],
+            run_tools=AsyncMock(return_value=["Search output"]),
+            max_rounds=1,
+        )
+
+        assert events[-1] == {"type": "text", "text": "Answer"}
+        final_params = mock_client.messages.stream.call_args_list[1].kwargs
+        assert "tools" not in final_params
@@ -216,6 +216,143 @@ class TestRootEndpoint:
         assert isinstance(data["message"], str)
 
 
+@pytest.mark.api
+class TestCacheStatsEndpoint:
+    """Test /api/cache-stats endpoint"""
+
+    def test_cache_stats(self, test_client, mock_rag_system):
+        """Test that cache counters are returned per cache"""
+        response = test_client.get("/api/cache-stats")
+
+        assert response.status_code == 200
+        assert response.json()["query_embeddings"]["misses"] == 2
+        mock_rag_system.get_cache_stats.assert_called_once()
+
+
+@pytest.mark.api
+class TestStreamEndpoint:
+    """Test /api/query/stream Server-Sent Events endpoint"""
+
+    def read_events(self, response):
+        """Parse an SSE body into (event, data) pairs"""
+        import json
+
+        events = []
+        for block in response.text.strip().split("\n\n"):
+            lines = dict(line.split(": ", 1) for line in block.split("\n"))
+            events.append((lines["event"], json.loads(lines["data"])))
+        return events
+
+    def test_stream_event_order(self, test_client, sample_query_request):
+        """Test session, tool, text, sources and done events in order"""
+        response = test_client.post("/api/query/stream", json=sample_query_request)
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        events = self.read_events(response)
+        assert [event for event, _ in events] == [
+            "session", "tool", "text", "text", "sources", "done"
+        ]
+        assert events[0][1] == {"session_id": "test_session_123"}
+        assert "".join(data["text"] for event, data in events if event == "text") == (
+            "This is a test streamed response."
+        )
+        assert events[4][1]["sources"][0]["text"] == "Introduction to MCP - Lesson 1"
+
+    def test_stream_error_event(self, test_client, mock_rag_system):
+        """Test that a failure mid-stream ends with an error event"""
+        async def failing_stream(query, session_id=None):
+            yield {"type": "text", "text": "Partial"}
+            raise Exception("Rate limit exceeded")
+
+        mock_rag_system.astream_query.side_effect = failing_stream
+
+        response = test_client.post("/api/query/stream", json={
+            "query": "Test",
+            "session_id": "existing_session_123"
+        })
+
+        events = self.read_events(response)
+        assert [event for event, _ in events] == ["session", "text", "error"]
+        assert "Rate limit" in events[-1][1]["detail"]
+
+
+@pytest.mark.api
+class TestIngestEndpoints:
+    """Test background ingestion endpoints"""
+
+    def test_ingest_returns_job_immediately(self, test_client, tmp_path):
+        """Test that ingestion is queued and reported as accepted"""
+        response = test_client.post("/api/ingest", json={"paths": [str(tmp_path)]})
+
+        assert response.status_code == 202
+        data = response.json()
+        assert data["job_id"]
+        assert data["paths"] == [str(tmp_path)]
+        assert data["status"] in ("queued", "running", "completed")
+
+    def test_ingest_status_reports_completion(
+        self, test_client, mock_rag_system, tmp_path
+    ):
+        """Test that job status reflects the finished ingestion"""
+        job_id = test_client.post(
+            "/api/ingest", json={"paths": [str(tmp_path)]}
+        ).json()["job_id"]
+        assert test_client.ingest_jobs.wait(timeout=5)
+
+        response = test_client.get(f"/api/ingest/{job_id}")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["status"] == "completed"
+        assert data["courses_added"] == 2
+        assert data["chunks_added"] == 10
+        mock_rag_system.add_course_folder.assert_called_once()
+
+    def test_ingest_missing_path(self, test_client, tmp_path):
+        """Test that nonexistent paths are rejected"""
+        response = test_client.post(
+            "/api/ingest", json={"paths": [str(tmp_path / "missing")]}
+        )
+
+        assert response.status_code == 404
+
+    def test_ingest_rejects_paths_outside_docs(self, test_client, tmp_path):
+        """Test that files outside the docs folder cannot be ingested"""
+        for path in ["/etc/passwd", str(tmp_path / ".." / "other"), "../../x.txt"]:
+            response = test_client.post("/api/ingest", json={"paths": [path]})
+
+            assert response.status_code == 403
+
+    def test_ingest_rejects_non_course_files(self, test_client, tmp_path):
+        """Test that only course file types are accepted"""
+        (tmp_path / "settings.env").write_text("SECRET=1")
+
+        response = test_client.post("/api/ingest", json={"paths": ["settings.env"]})
+
+        assert response.status_code == 403
+
+    def test_ingest_clear_is_disabled(self, test_client, tmp_path):
+        """Test that anonymous callers cannot wipe the index"""
+        response = test_client.post(
+            "/api/ingest", json={"paths": [str(tmp_path)], "clear_existing": True}
+        )
+
+        assert response.status_code == 403
+
+    def test_ingest_requires_paths(self, test_client):
+        """Test that an empty path list is rejected"""
+        response = test_client.post("/api/ingest", json={"paths": []})
+
+        assert response.status_code == 400
+
+    def test_unknown_job(self, test_client):
+        """Test status of a job that does not exist"""
+        response = test_client.get("/api/ingest/does-not-exist")
+
+        assert response.status_code == 404
+
+
 @pytest.mark.api
 class TestAPIErrorHandling:
     """Test error handling in API endpoints"""
@@ -0,0 +1,318 @@
+"""
+Unit tests for the caches in caching.py
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from caching import LRUCache, QueryEmbeddingCache, SemanticAnswerCache, SingleFlight
+
+
+class CountingEmbedder:
+    """Embedding function that records each batch it is called with"""
+
+    def __init__(self):
+        self.batches = []
+
+    def __call__(self, texts):
+        self.batches.append(list(texts))
+        return [np.array([len(text), 1.0], dtype=np.float32) for text in texts]
+
+
+class TestLRUCache:
+    """Test LRU eviction and counters"""
+
+    def test_evicts_least_recently_used(self):
+        """Test that reading an entry protects it from eviction"""
+        cache = LRUCache(2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")
+        cache.put("c", 3)
+
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        assert cache.get("c") == 3
+        assert cache.evictions == 1
+
+    def test_counts_hits_and_misses(self):
+        """Test hit rate bookkeeping"""
+        cache = LRUCache(4)
+        cache.put("a", 1)
+        cache.get("a")
+        cache.get("missing")
+
+        stats = cache.stats()
+        assert (stats["hits"], stats["misses"], stats["size"]) == (1, 1, 1)
+        assert stats["hit_rate"] == 0.5
+
+    def test_zero_size_stores_nothing(self):
+        """Test that a cache sized zero is disabled"""
+        cache = LRUCache(0)
+        cache.put("a", 1)
+
+        assert len(cache) == 0
+
+
+class TestQueryEmbeddingCache:
+    """Test the memory and disk tiers of the query embedding cache"""
+
+    def test_hits_skip_the_model(self):
+        """Test that repeated and whitespace-variant queries are embedded once"""
+        embedder = CountingEmbedder()
+        cache = QueryEmbeddingCache("model", max_entries=8)
+
+        first = cache.embed(["What is MCP?"], embedder)
+        second = cache.embed(["  What is   MCP? "], embedder)
+
+        assert embedder.batches == [["What is MCP?"]]
+        np.testing.assert_array_equal(first[0], second[0])
+        assert cache.stats()["memory_hits"] == 1
+        assert cache.stats()["misses"] == 1
+
+    def test_misses_embedded_in_one_batch(self):
+        """Test that only uncached texts are embedded, once each, in order"""
+        embedder = CountingEmbedder()
+        cache = QueryEmbeddingCache("model", max_entries=8)
+        cache.embed(["cached"], embedder)
+
+        vectors = cache.embed(["new one", "cached", "new one", "other"], embedder)
+
+        assert embedder.batches[-1] == ["new one", "other"]
+        assert [vector[0] for vector in vectors] == [7, 6, 7, 5]
+
+    def test_model_name_is_part_of_key(self, tmp_path):
+        """Test that embeddings from different models are not shared"""
+        path = str(tmp_path / "cache.db")
+        embedder = CountingEmbedder()
+        QueryEmbeddingCache("model-a", disk_path=path).embed(["query"], embedder)
+
+        QueryEmbeddingCache("model-b", disk_path=path).embed(["query"], embedder)
+
+        assert len(embedder.batches) == 2
+
+    def test_disk_tier_survives_restart(self, tmp_path):
+        """Test that a new cache instance reads embeddings from disk"""
+        path = str(tmp_path / "cache.db")
+        embedder = CountingEmbedder()
+        original = QueryEmbeddingCache("model", disk_path=path).embed(
+            ["persisted query"], embedder
+        )
+
+        restarted = QueryEmbeddingCache("model", disk_path=path)
+        vectors = restarted.embed(["persisted query"], embedder)
+
+        assert len(embedder.batches) == 1
+        np.testing.assert_array_equal(vectors[0], original[0])
+        assert restarted.stats()["disk_hits"] == 1
+        # Promoted to memory, so the next hit does not touch disk
+        restarted.embed(["persisted query"], embedder)
+        assert restarted.stats()["memory_hits"] == 1
+
+    def test_disk_tier_is_bounded(self, tmp_path):
+        """Test that the oldest disk entries are dropped past the bound"""
+        path = str(tmp_path / "cache.db")
+        embedder = CountingEmbedder()
+        cache = QueryEmbeddingCache("model", disk_path=path, max_disk_entries=2)
+        for text in ["one", "two", "three"]:
+            cache.embed([text], embedder)
+
+        restarted = QueryEmbeddingCache("model", disk_path=path)
+        restarted.embed(["one", "two", "three"], embedder)
+
+        assert embedder.batches[-1] == ["one"]
+
+    def test_clear(self, tmp_path):
+        """Test that clearing empties both tiers"""
+        path = str(tmp_path / "cache.db")
+        embedder = CountingEmbedder()
+        cache = QueryEmbeddingCache("model", disk_path=path)
+        cache.embed(["query"], embedder)
+
+        cache.clear()
+        cache.embed(["query"], embedder)
+
+        assert len(embedder.batches) == 2
+
+
+class TestSemanticAnswerCache:
+    """Test similarity matching and generation invalidation of cached answers"""
+
+    def test_similar_question_hits(self):
+        """Test that a nearby embedding reuses the answer and a distant one misses"""
+        cache = SemanticAnswerCache(threshold=0.95, max_entries=8)
+        cache.put("What is in lesson 1?", [1.0, 0.0], 0, ("Intro", []))
+
+        assert cache.get([0.99, 0.05], 0) == ("Intro", [])
+        assert cache.get([0.6, 0.8], 0) is None
+
+        stats = cache.stats()
+        assert (stats["hits"], stats["misses"]) == (1, 1)
+
+    def test_signature_must_match(self):
+        """Test that similar questions with different details do not share answers"""
+        cache = SemanticAnswerCache(threshold=0.9, max_entries=8)
+        cache.put("Lesson 1 of MCP?", [1.0, 0.0], 0, "One", signature=((1,), "MCP"))
+
+        assert cache.get([1.0, 0.0], 0, signature=((2,), "MCP")) is None
+        assert cache.get([1.0, 0.0], 0, signature=((1,), "MCP")) == "One"
+
+    def test_returns_the_most_similar_answer(self):
+        """Test that the closest cached question wins"""
+        cache = SemanticAnswerCache(threshold=0.5, max_entries=8)
+        cache.put("a", [1.0, 0.0], 0, "A")
+        cache.put("b", [0.0, 1.0], 0, "B")
+
+        assert cache.get([0.2, 0.9], 0) == "B"
+
+    def test_new_generation_drops_entries(self):
+        """Test that answers from an older index are never returned"""
+        cache = SemanticAnswerCache(threshold=0.9, max_entries=8)
+        cache.put("q", [1.0, 0.0], 0, "old")
+
+        assert cache.get([1.0, 0.0], 1) is None
+        assert cache.stats()["invalidations"] == 1
+
+        # An answer computed before the write finished is not stored
+        cache.put("q", [1.0, 0.0], 0, "stale")
+        assert cache.get([1.0, 0.0], 1) is None
+
+    def test_evicts_least_recently_used(self):
+        """Test the size bound and that asking again replaces an entry"""
+        cache = SemanticAnswerCache(threshold=0.9, max_entries=2)
+        cache.put("a", [1.0, 0.0, 0.0], 0, "A")
+        cache.put(" A ", [1.0, 0.0, 0.0], 0, "A2")
+        cache.put("b", [0.0, 1.0, 0.0], 0, "B")
+        cache.get([1.0, 0.0, 0.0], 0)
+        cache.put("c", [0.0, 0.0, 1.0], 0, "C")
+
+        assert cache.get([1.0, 0.0, 0.0], 0) == "A2"
+        assert cache.get([0.0, 1.0, 0.0], 0) is None
+        assert cache.stats()["size"] == 2
+
+
+class TestSingleFlight:
+    """Test that concurrent identical calls share one computation"""
+
+    def test_threads_share_result(self):
+        """Test that callers arriving mid-flight get the leader's result"""
+        flights = SingleFlight()
+        release = threading.Event()
+        calls = []
+
+        def compute():
+            calls.append(1)
+            release.wait(5)
+            return "answer"
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            futures = [executor.submit(flights.do, "q", compute) for _ in range(4)]
+            while flights.stats()["shared"] < 3:
+                time.sleep(0.001)
+            release.set()
+            results = [future.result() for future in futures]
+
+        assert results == ["answer"] * 4
+        assert len(calls) == 1
+        assert flights.stats() == {"leaders": 1, "shared": 3, "in_flight": 0}
+
+        # Nothing is kept once the call finishes
+        assert flights.do("q", lambda: "again") == "again"
+
+    def test_errors_are_shared(self):
+        """Test that waiting callers see the leader's exception"""
+        flights = SingleFlight()
+
+        async def failing():
+            await asyncio.sleep(0.01)
+            raise ValueError("boom")
+
+        async def run_all():
+            return await asyncio.gather(
+                *(flights.ado("q", failing) for _ in range(3)), return_exceptions=True
+            )
+
+        results = asyncio.run(run_all())
+
+        assert all(isinstance(result, ValueError) for result in results)
+
+    def test_cancelled_caller_does_not_cancel_others(self):
+        """Test that the computation outlives the caller that started it"""
+        flights = SingleFlight()
+
+        async def compute():
+            await asyncio.sleep(0.05)
+            return "answer"
+
+        async def run():
+            leader = asyncio.ensure_future(flights.ado("q", compute))
+            await asyncio.sleep(0)
+            follower = asyncio.ensure_future(flights.ado("q", compute))
+            await asyncio.sleep(0)
+            leader.cancel()
+            return await follower
+
+        assert asyncio.run(run()) == "answer"
+
+
+class TestVectorStoreQueryEmbeddings:
+    """Test that VectorStore searches go through the cache"""
+
+    def test_repeated_search_embeds_query_once(
+        self, real_vector_store, fake_embedding_function
+    ):
+        """Test that repeating a search embeds the query only once"""
+        from models import Course, CourseChunk
+
+        real_vector_store.add_course_metadata(
+            Course(title="Cached Course", course_link="l", instructor="i")
+        )
+        real_vector_store.add_course_content(
+            [
+                CourseChunk(
+                    content="Caching text.",
+                    course_title="Cached Course",
+                    lesson_number=0,
+                    chunk_index=0,
+                )
+            ]
+        )
+        fake_embedding_function.embedded.clear()
+
+        for _ in range(3):
+            results = real_vector_store.search("caching", course_name="Cached")
+
+        assert results.documents == ["Caching text."]
+        assert fake_embedding_function.embedded == ["caching"]
+        stats = real_vector_store.get_cache_stats()
+        assert stats["query_embeddings"]["misses"] == 1
+        # Repeats are answered by the result cache before embedding
+        assert stats["search_results"]["hits"] == 2
+
+    def test_repeated_query_in_new_generation_skips_model(
+        self, real_vector_store, fake_embedding_function
+    ):
+        """Test that a write invalidates results but not query embeddings"""
+        from models import Course
+
+        real_vector_store.search("caching")
+        real_vector_store.add_course_metadata(
+            Course(title="Another Course", course_link="l", instructor="i")
+        )
+        fake_embedding_function.embedded.clear()
+
+        real_vector_store.search("caching")
+
+        assert fake_embedding_function.embedded == []
+        stats = real_vector_store.get_cache_stats()["query_embeddings"]
+        assert stats["memory_hits"] == 1
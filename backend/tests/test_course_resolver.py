@@ -0,0 +1,131 @@
+"""
+Unit tests for CourseNameResolver in course_resolver.py
+"""
+
+import os
+import sys
+from unittest.mock import Mock, patch
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from course_resolver import CourseNameResolver
+from models import Course
+
+TITLES = [
+    "Building Towards Computer Use with Anthropic",
+    "MCP: Build Rich-Context AI Apps with Anthropic",
+    "Advanced Retrieval for AI with Chroma",
+    "Prompt Compression and Query Optimization",
+]
+
+
+@pytest.fixture
+def resolver():
+    return CourseNameResolver(TITLES)
+
+
+class TestCourseNameResolver:
+    """Test the exact, partial and fuzzy matching stages"""
+
+    @pytest.mark.parametrize(
+        "course_name, expected",
+        [
+            (TITLES[0], TITLES[0]),
+            ("advanced retrieval for ai with chroma", TITLES[2]),
+            ("  Prompt   Compression ", TITLES[3]),
+            ("MCP", TITLES[1]),
+            ("computer use", TITLES[0]),
+            ("Computr Use", TITLES[0]),
+            ("Advnced Retreival", TITLES[2]),
+        ],
+    )
+    def test_resolves(self, resolver, course_name, expected):
+        """Test exact, case-insensitive, prefix, substring and trigram matches"""
+        assert resolver.resolve(course_name) == expected
+
+    @pytest.mark.parametrize("course_name", ["Anthropic", "xyz", "", "   "])
+    def test_ambiguous_or_unknown_returns_none(self, resolver, course_name):
+        """Test that names without a single confident match are left unresolved"""
+        assert resolver.resolve(course_name) is None
+
+    def test_prefix_wins_over_other_substrings(self):
+        """Test that a unique prefix resolves even when other titles contain it"""
+        resolver = CourseNameResolver(["Intro to Python", "Advanced Intro Topics"])
+
+        assert resolver.resolve("intro") == "Intro to Python"
+
+    def test_titles_kept_in_sync(self, resolver):
+        """Test adding and removing titles"""
+        resolver.add_title("Vector Databases 101")
+        assert resolver.resolve("vector databases") == "Vector Databases 101"
+
+        resolver.remove_title("Vector Databases 101")
+        assert resolver.resolve("vector databases") is None
+
+        resolver.set_titles([])
+        assert resolver.titles == []
+
+    def test_mentioned_titles(self, resolver):
+        """Test finding the courses a question talks about"""
+        assert resolver.mentioned_titles("What is lesson 1 of the MCP course?") == {
+            TITLES[1]
+        }
+        assert resolver.mentioned_titles("Compare Chroma and computer use") == {
+            TITLES[0],
+            TITLES[2],
+        }
+        assert resolver.mentioned_titles("What is in the course?") == frozenset()
+
+
+class TestVectorStoreCourseResolution:
+    """Test that VectorStore only queries the catalog as a fallback"""
+
+    @pytest.fixture
+    def store(self, real_vector_store):
+        for title in TITLES:
+            real_vector_store.add_course_metadata(
+                Course(title=title, course_link="l", instructor="i")
+            )
+        real_vector_store.course_catalog.query = Mock(
+            wraps=real_vector_store.course_catalog.query
+        )
+        return real_vector_store
+
+    def test_partial_name_skips_vector_query(self, store):
+        """Test that an obvious partial name is resolved in memory"""
+        assert store._resolve_course_name("MCP") == TITLES[1]
+        store.course_catalog.query.assert_not_called()
+
+    def test_ambiguous_name_falls_back_to_vector_query(self, store):
+        """Test that ambiguous names still resolve semantically"""
+        assert store._resolve_course_name("Anthropic") in TITLES
+        store.course_catalog.query.assert_called_once()
+
+    def test_resolver_follows_ingest_and_delete(self, store):
+        """Test that catalog writes keep the resolver current"""
+        store.add_course_metadata(
+            Course(title="Vector Databases 101", course_link="l", instructor="i")
+        )
+        assert store._resolve_course_name("databases 101") == "Vector Databases 101"
+
+        store.delete_course("Vector Databases 101")
+        assert "Vector Databases 101" not in store.course_resolver.titles
+
+    def test_resolver_built_from_existing_catalog(
+        self, store, tmp_path, fake_embedding_function
+    ):
+        """Test that a restarted store knows the titles already in the catalog"""
+        with patch(
+            "chromadb.utils.embedding_functions.SentenceTransformerEmbeddingFunction",
+            return_value=fake_embedding_function,
+        ):
+            from vector_store import VectorStore
+
+            restarted = VectorStore(
+                str(tmp_path / "chroma"), "fake-model", backend=store.backend_name
+            )
+
+        assert sorted(restarted.course_resolver.titles) == sorted(TITLES)
@@ -4,13 +4,15 @@ Unit tests for CourseSearchTool in search_tools.py
 
 import os
 import sys
+import threading
+import time
 
 import pytest
 
 # Add parent directory to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
 
-from search_tools import CourseSearchTool, ToolManager
+from search_tools import CourseSearchTool, Tool, ToolManager
 from vector_store import SearchResults
 
 
@@ -291,3 +293,136 @@ class TestToolManagerIntegration:
         result = manager.execute_tool("nonexistent_tool", query="test")
 
         assert "not found" in result.lower()
+
+    def test_execute_tools_batches_searches(self, mock_vector_store):
+        """Test that several searches in one round become one batch"""
+        manager = ToolManager()
+        manager.register_tool(CourseSearchTool(mock_vector_store))
+
+        results = manager.execute_tools(
+            [
+                ("search_course_content", {"query": "prompt caching"}),
+                ("search_course_content", {"query": "nonexistent topic"}),
+                ("nonexistent_tool", {"query": "test"}),
+            ]
+        )
+
+        mock_vector_store.search_many.assert_called_once()
+        mock_vector_store.search.assert_not_called()
+        assert results[1] == "No relevant content found."
+        assert "not found" in results[2].lower()
+        assert len(manager.get_last_sources()) > 0
+
+    def test_execute_tools_reports_bad_arguments(self, mock_vector_store):
+        """Test that a malformed call fails alone instead of failing the batch"""
+        manager = ToolManager()
+        manager.register_tool(CourseSearchTool(mock_vector_store))
+
+        results = manager.execute_tools(
+            [
+                ("search_course_content", {"query": "prompt caching"}),
+                ("search_course_content", {"course_name": "MCP"}),
+            ]
+        )
+
+        assert "Error executing tool search_course_content" in results[1]
+        assert not results[0].startswith("Error")
+
+
+class SleepyTool(Tool):
+    """Tool that takes a while to answer"""
+
+    def __init__(self, name, seconds):
+        self.name = name
+        self.seconds = seconds
+
+    def get_tool_definition(self):
+        return {"name": self.name, "description": "", "input_schema": {}}
+
+    def execute(self, **kwargs):
+        time.sleep(self.seconds)
+        return f"{self.name}: {kwargs.get('query')}"
+
+
+class TestConcurrentToolExecution:
+    """Test that different tools of one round run at once"""
+
+    def test_tools_run_concurrently_in_call_order(self):
+        """Test that a round takes about as long as its slowest tool"""
+        manager = ToolManager(max_workers=4)
+        manager.register_tool(SleepyTool("outline", 0.2))
+        manager.register_tool(SleepyTool("search", 0.1))
+
+        started = time.monotonic()
+        results = manager.execute_tools(
+            [
+                ("search", {"query": "a"}),
+                ("outline", {"query": "b"}),
+                ("search", {"query": "c"}),
+            ]
+        )
+        elapsed = time.monotonic() - started
+
+        assert results == ["search: a", "outline: b", "search: c"]
+        assert elapsed < 0.35  # Serial execution would take 0.4s
+
+    def test_same_tool_calls_run_in_one_worker(self):
+        """Test that a tool's own calls never overlap each other"""
+        threads = set()
+        manager = ToolManager(max_workers=4, timeout=5)
+        tool = SleepyTool("search", 0.01)
+        original = tool.execute
+
+        def execute(**kwargs):
+            threads.add(threading.get_ident())
+            return original(**kwargs)
+
+        tool.execute = execute
+        manager.register_tool(tool)
+
+        manager.execute_tools([("search", {"query": str(i)}) for i in range(3)])
+
+        assert len(threads) == 1
+
+    def test_slow_tool_times_out_alone(self):
+        """Test that a tool over its timeout reports an error and others finish"""
+        manager = ToolManager(max_workers=4, timeout=5)
+        manager.register_tool(SleepyTool("slow", 0.5), timeout=0.05)
+        manager.register_tool(SleepyTool("fast", 0.01))
+
+        started = time.monotonic()
+        results = manager.execute_tools(
+            [("slow", {"query": "a"}), ("fast", {"query": "b"})]
+        )
+
+        assert results[0] == "Error executing tool slow: timed out after 0.05s"
+        assert results[1] == "fast: b"
+        assert time.monotonic() - started < 0.4
+
+    def test_abandoned_call_does_not_leak_sources(self, mock_vector_store):
+        """Test that a search finishing after its timeout changes no shared state"""
+        finished = threading.Event()
+        search = mock_vector_store.search.side_effect
+
+        def slow_search(**kwargs):
+            time.sleep(0.2)
+            try:
+                return search(**kwargs)
+            finally:
+                finished.set()
+
+        mock_vector_store.search.side_effect = slow_search
+        manager = ToolManager(max_workers=4)
+        tool = CourseSearchTool(mock_vector_store)
+        manager.register_tool(tool, timeout=0.05)
+
+        outputs, sources = manager.run_tools(
+            [("search_course_content", {"query": "prompt caching"})]
+        )
+        assert finished.wait(5)
+        time.sleep(0.05)
+
+        assert "timed out" in outputs[0]
+        assert sources == []
+        assert tool.last_sources == []
+        assert manager.get_last_sources() == []
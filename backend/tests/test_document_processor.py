@@ -0,0 +1,194 @@
+"""
+Unit tests for DocumentProcessor in document_processor.py
+"""
+
+import os
+import sys
+from unittest.mock import patch
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from document_processor import DocumentProcessor
+
+
+class TestChunkText:
+    """Test sentence-based chunking with overlap"""
+
+    @pytest.mark.parametrize(
+        "text, chunk_size, chunk_overlap, expected",
+        [
+            ("Short text.", 20, 5, ["Short text."]),
+            (
+                "First sentence here. Second one follows! Third? "
+                "Fourth sentence is longer than the rest.",
+                40,
+                15,
+                [
+                    "First sentence here. Second one follows!",
+                    "Third?",
+                    "Fourth sentence is longer than the rest.",
+                ],
+            ),
+            (
+                "One. Two. Three. Four. Five.",
+                12,
+                6,
+                ["One. Two.", "Two. Three.", "Three. Four.", "Four. Five.", "Five."],
+            ),
+            (
+                "No overlap at all. Next sentence. Last one.",
+                25,
+                0,
+                ["No overlap at all.", "Next sentence. Last one."],
+            ),
+            (
+                "A very long sentence that exceeds the chunk size by itself. Tiny.",
+                10,
+                5,
+                [
+                    "A very long sentence that exceeds the chunk size by itself.",
+                    "Tiny.",
+                ],
+            ),
+            (
+                "Dr. Smith met Mr. Jones. They talked e.g. about U.S. policy. Done.",
+                30,
+                10,
+                [
+                    "Dr. Smith met Mr. Jones.",
+                    "They talked e.g. about U.S. policy.",
+                    "Done.",
+                ],
+            ),
+            ("   \n\n  ", 10, 2, []),
+        ],
+    )
+    def test_chunk_text_output(self, text, chunk_size, chunk_overlap, expected):
+        """Test chunk boundaries, overlap and abbreviation handling"""
+        processor = DocumentProcessor(chunk_size, chunk_overlap)
+
+        assert processor.chunk_text(text) == expected
+
+    def test_whitespace_is_normalized(self):
+        """Test that newlines and runs of spaces collapse to single spaces"""
+        processor = DocumentProcessor(100, 0)
+
+        chunks = processor.chunk_text("  First   line.\n\nSecond\tline.  ")
+
+        assert chunks == ["First line. Second line."]
+
+    def test_chunks_respect_size_and_overlap(self):
+        """Test that multi-sentence chunks fit and consecutive chunks overlap"""
+        text = " ".join(f"Sentence number {i} is here." for i in range(200))
+        processor = DocumentProcessor(120, 40)
+
+        chunks = processor.chunk_text(text)
+
+        assert all(len(chunk) <= 120 for chunk in chunks)
+        for previous, current in zip(chunks, chunks[1:]):
+            last_sentence = previous.split(". ")[-1]
+            assert current.startswith(last_sentence.rstrip("."))
+
+
+class TestStreamCourseDocument:
+    """Test incremental, lesson-by-lesson parsing"""
+
+    @pytest.fixture
+    def course_path(self, tmp_path):
+        path = tmp_path / "course.txt"
+        path.write_text(
+            "\n\nCourse Title: Streaming Course\n"
+            "Course Link: https://example.com/stream\n"
+            "Course Instructor: Ada\n"
+            "\n"
+            "Lesson 0: Welcome\n"
+            "Lesson Link: https://example.com/stream/0\n"
+            "Welcome to the course. It streams lessons.\n"
+            "Lesson 1: Details\n"
+            "Details follow here. They are chunked too.\n",
+            encoding="utf-8",
+        )
+        return str(path)
+
+    def test_header_parsed_before_body(self, course_path):
+        """Test that course metadata is available before any lesson is read"""
+        processor = DocumentProcessor(800, 100)
+
+        course, lesson_chunks = processor.stream_course_document(course_path)
+
+        assert course.title == "Streaming Course"
+        assert course.course_link == "https://example.com/stream"
+        assert course.instructor == "Ada"
+        assert course.lessons == []
+
+    def test_peek_reads_only_header(self, course_path):
+        """Test that peeking returns metadata without reading lessons"""
+        processor = DocumentProcessor(800, 100)
+
+        with patch.object(processor, "chunk_text") as mock_chunk:
+            course = processor.peek_course_metadata(course_path)
+
+        assert course.title == "Streaming Course"
+        assert course.instructor == "Ada"
+        assert course.lessons == []
+        mock_chunk.assert_not_called()
+
+    def test_yields_one_lesson_at_a_time(self, course_path):
+        """Test that lessons are registered as their chunks are yielded"""
+        processor = DocumentProcessor(800, 100)
+        course, lesson_chunks = processor.stream_course_document(course_path)
+
+        first = next(lesson_chunks)
+        assert [lesson.lesson_number for lesson in course.lessons] == [0]
+        assert first[0].content.startswith("Lesson 0 content: Welcome")
+        assert course.lessons[0].lesson_link == "https://example.com/stream/0"
+
+        second = next(lesson_chunks)
+        assert [lesson.lesson_number for lesson in course.lessons] == [0, 1]
+        assert second[0].content.startswith(
+            "Course Streaming Course Lesson 1 content: Details"
+        )
+        assert second[0].chunk_index == len(first)
+
+    def test_process_course_document_matches_stream(self, course_path):
+        """Test that the list API returns the streamed chunks in order"""
+        processor = DocumentProcessor(30, 10)
+        course, lesson_chunks = processor.stream_course_document(course_path)
+        streamed = [chunk for chunks in lesson_chunks for chunk in chunks]
+
+        listed_course, listed = processor.process_course_document(course_path)
+
+        assert listed == streamed
+        assert listed_course == course
+        assert [chunk.chunk_index for chunk in listed] == list(range(len(listed)))
+
+    def test_document_without_lessons(self, tmp_path):
+        """Test that content without lesson markers becomes plain chunks"""
+        path = tmp_path / "plain.txt"
+        path.write_text(
+            "Course Title: Plain\nCourse Link: l\nCourse Instructor: i\n\n"
+            "Just text. More text here.",
+            encoding="utf-8",
+        )
+
+        course, chunks = DocumentProcessor(800, 0).process_course_document(str(path))
+
+        assert course.lessons == []
+        assert [chunk.content for chunk in chunks] == ["Just text. More text here."]
+        assert chunks[0].lesson_number is None
+
+    def test_undecodable_bytes_are_dropped(self, tmp_path):
+        """Test that invalid UTF-8 does not abort parsing"""
+        path = tmp_path / "binary.txt"
+        path.write_bytes(
+            b"Course Title: Bytes\xff\nCourse Link: l\nCourse Instructor: i\n\n"
+            b"Lesson 1: Only\nSome\xfe text.\n"
+        )
+
+        course, chunks = DocumentProcessor(800, 100).process_course_document(str(path))
+
+        assert course.title == "Bytes"
+        assert chunks[0].content == "Course Bytes Lesson 1 content: Some text."
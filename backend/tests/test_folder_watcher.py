@@ -0,0 +1,151 @@
+"""
+Unit tests for FolderWatcher in folder_watcher.py
+"""
+
+import os
+import sys
+import threading
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from folder_watcher import FolderWatcher
+
+
+def touch(path, text):
+    """Write text to a file and bump its mtime so the change is always visible"""
+    with open(path, "w", encoding="utf-8") as file:
+        file.write(text)
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+@pytest.fixture
+def folder(tmp_path):
+    """Folder with two course files and one unrelated file"""
+    touch(tmp_path / "a.txt", "Course Title: A")
+    touch(tmp_path / "b.txt", "Course Title: B")
+    touch(tmp_path / "notes.md", "ignored")
+    return tmp_path
+
+
+class TestFolderWatcherCheck:
+    """Test snapshot diffing"""
+
+    def test_no_changes(self, folder):
+        """Test that an untouched folder reports nothing"""
+        watcher = FolderWatcher(str(folder), lambda changed, deleted: None)
+        watcher.snapshot = watcher.scan()
+
+        assert watcher.check() == ([], [])
+
+    def test_created_modified_and_deleted(self, folder):
+        """Test that each kind of change is detected"""
+        watcher = FolderWatcher(str(folder), lambda changed, deleted: None)
+        watcher.snapshot = watcher.scan()
+
+        touch(folder / "a.txt", "Course Title: A edited")
+        touch(folder / "c.txt", "Course Title: C")
+        os.remove(folder / "b.txt")
+        touch(folder / "notes.md", "still ignored")
+
+        changed, deleted = watcher.check()
+
+        assert changed == [str(folder / "a.txt"), str(folder / "c.txt")]
+        assert deleted == [str(folder / "b.txt")]
+        assert watcher.check() == ([], [])
+
+    def test_retry_reports_paths_again(self, folder):
+        """Test that files that failed to ingest are reported by the next check"""
+        watcher = FolderWatcher(str(folder), lambda changed, deleted: None)
+        watcher.snapshot = watcher.scan()
+        touch(folder / "c.txt", "Course Title: C")
+        os.remove(folder / "b.txt")
+        watcher.check()
+
+        watcher.retry(
+            [str(folder / "a.txt"), str(folder / "c.txt")], [str(folder / "b.txt")]
+        )
+
+        changed, deleted = watcher.check()
+        assert changed == [str(folder / "a.txt"), str(folder / "c.txt")]
+        assert deleted == [str(folder / "b.txt")]
+
+    def test_missing_folder(self, tmp_path):
+        """Test that a missing folder scans as empty"""
+        watcher = FolderWatcher(str(tmp_path / "missing"), lambda c, d: None)
+
+        assert watcher.scan() == {}
+
+
+class TestFolderWatcherPolling:
+    """Test the background polling loop"""
+
+    @pytest.fixture
+    def reports(self):
+        reports = []
+        reported = threading.Event()
+
+        def on_changes(changed, deleted):
+            reports.append((changed, deleted))
+            reported.set()
+
+        return reports, reported, on_changes
+
+    def test_burst_is_reported_once(self, folder, reports):
+        """Test that several quick changes are debounced into one report"""
+        report_list, reported, on_changes = reports
+        watcher = FolderWatcher(
+            str(folder),
+            on_changes,
+            debounce_seconds=0.2,
+            poll_interval=0.05,
+            use_native=False,
+        )
+        watcher.start()
+        try:
+            touch(folder / "a.txt", "Course Title: A v2")
+            touch(folder / "c.txt", "Course Title: C")
+            os.remove(folder / "b.txt")
+
+            assert reported.wait(5)
+        finally:
+            watcher.stop(timeout=5)
+
+        assert report_list == [
+            ([str(folder / "a.txt"), str(folder / "c.txt")], [str(folder / "b.txt")])
+        ]
+
+    def test_callback_errors_do_not_stop_watching(self, folder):
+        """Test that a failing callback does not kill the watcher thread"""
+        calls = []
+        first_call = threading.Event()
+        second_call = threading.Event()
+
+        def on_changes(changed, deleted):
+            calls.append(changed)
+            if len(calls) == 1:
+                first_call.set()
+                raise RuntimeError("queue full")
+            second_call.set()
+
+        watcher = FolderWatcher(
+            str(folder),
+            on_changes,
+            debounce_seconds=0.05,
+            poll_interval=0.05,
+            use_native=False,
+        )
+        watcher.start()
+        try:
+            touch(folder / "a.txt", "Course Title: A v2")
+            assert first_call.wait(5)
+            touch(folder / "b.txt", "Course Title: B v2")
+
+            assert second_call.wait(5)
+        finally:
+            watcher.stop(timeout=5)
+
+        assert calls == [[str(folder / "a.txt")], [str(folder / "b.txt")]]
@@ -0,0 +1,247 @@
+"""
+Unit tests for IngestJobManager in ingest_jobs.py
+"""
+
+import os
+import sys
+import threading
+import time
+from unittest.mock import Mock
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from ingest_jobs import IngestJobManager
+
+
+@pytest.fixture
+def mock_rag():
+    """RAG system whose folder ingestion reports progress for two files"""
+    rag = Mock()
+
+    def add_course_folder(
+        folder_path, clear_existing=False, progress=None, errors=None
+    ):
+        if progress:
+            progress(folder_path, 0, 2, 0)
+            progress(os.path.join(folder_path, "a.txt"), 1, 2, 3)
+            progress(os.path.join(folder_path, "b.txt"), 2, 2, 7)
+        return 2, 7
+
+    rag.add_course_folder = Mock(side_effect=add_course_folder)
+    rag.add_course_document = Mock(return_value=(Mock(), 4))
+    return rag
+
+
+@pytest.fixture
+def manager(mock_rag):
+    manager = IngestJobManager(mock_rag)
+    yield manager
+    manager.shutdown(timeout=5)
+
+
+class TestIngestJobManager:
+    """Test queuing, progress reporting and failure handling"""
+
+    def test_folder_job_reports_progress(self, manager, mock_rag, tmp_path):
+        """Test that folder progress and totals are recorded on the job"""
+        job = manager.submit([str(tmp_path)])
+        assert manager.wait(timeout=5)
+
+        assert job.status == "completed"
+        assert job.files_total == 2
+        assert job.files_done == 2
+        assert job.courses_added == 2
+        assert job.chunks_added == 7
+        assert job.current_path is None
+        assert job.finished_at >= job.started_at
+        mock_rag.add_course_folder.assert_called_once()
+
+    def test_files_and_folders_accumulate(self, manager, mock_rag, tmp_path):
+        """Test a job mixing a folder and a single file"""
+        file_path = tmp_path / "course.txt"
+        file_path.write_text("Course Title: One", encoding="utf-8")
+
+        job = manager.submit([str(tmp_path), str(file_path)])
+        assert manager.wait(timeout=5)
+
+        assert job.status == "completed"
+        assert job.files_total == 3
+        assert job.courses_added == 3
+        assert job.chunks_added == 11
+        mock_rag.add_course_document.assert_called_once_with(str(file_path))
+
+    def test_clear_existing_only_for_first_path(self, manager, mock_rag, tmp_path):
+        """Test that clearing happens once, before the first path"""
+        first, second = tmp_path / "first", tmp_path / "second"
+        first.mkdir()
+        second.mkdir()
+
+        manager.submit([str(first), str(second)], clear_existing=True)
+        assert manager.wait(timeout=5)
+
+        clear_flags = [
+            call.kwargs["clear_existing"]
+            for call in mock_rag.add_course_folder.call_args_list
+        ]
+        assert clear_flags == [True, False]
+
+    def test_removed_paths_remove_courses(self, manager, mock_rag, tmp_path):
+        """Test that deleted files are removed before changed files are added"""
+        mock_rag.remove_course_file = Mock(side_effect=["Old Course", None])
+        file_path = tmp_path / "course.txt"
+        file_path.write_text("Course Title: One", encoding="utf-8")
+
+        job = manager.submit(
+            [str(file_path)],
+            removed_paths=[str(tmp_path / "old.txt"), str(tmp_path / "unknown.txt")],
+        )
+        assert manager.wait(timeout=5)
+
+        assert job.status == "completed"
+        assert job.courses_removed == 1
+        assert job.courses_added == 1
+        assert mock_rag.remove_course_file.call_count == 2
+
+    def test_missing_path_fails_job(self, manager, tmp_path):
+        """Test that a vanished path marks the job as failed"""
+        job = manager.submit([str(tmp_path / "missing")])
+        assert manager.wait(timeout=5)
+
+        assert job.status == "failed"
+        assert "missing" in job.error
+
+    def test_failed_file_does_not_stop_the_job(self, manager, mock_rag, tmp_path):
+        """Test that paths after a file that cannot be ingested still run"""
+        paths = [str(tmp_path / name) for name in ("a_bad.txt", "b.txt", "c.txt")]
+        for path in paths:
+            open(path, "w").close()
+        mock_rag.add_course_document.side_effect = [(None, 0), (Mock(), 2), (Mock(), 3)]
+
+        job = manager.submit(paths)
+        assert manager.wait(timeout=5)
+
+        assert job.status == "completed"
+        assert mock_rag.add_course_document.call_count == 3
+        assert list(job.file_errors) == [paths[0]]
+        assert (job.courses_added, job.chunks_added) == (2, 5)
+
+    def test_failed_file_in_folder_is_recorded(self, manager, mock_rag, tmp_path):
+        """Test that a folder's unparsable file shows up in the job's file errors"""
+        bad = str(tmp_path / "bad.txt")
+
+        def add_course_folder(
+            folder_path, clear_existing=False, progress=None, errors=None
+        ):
+            progress(folder_path, 0, 2, 0)
+            errors[bad] = "No course found in file"
+            progress(bad, 1, 2, 0)
+            progress(str(tmp_path / "good.txt"), 2, 2, 5)
+            return 1, 5
+
+        mock_rag.add_course_folder.side_effect = add_course_folder
+        job = manager.submit([str(tmp_path)])
+        assert manager.wait(timeout=5)
+
+        assert job.status == "completed"
+        assert job.file_errors == {bad: "No course found in file"}
+        assert (job.courses_added, job.chunks_added) == (1, 5)
+
+    def test_folder_where_every_file_fails_fails_job(self, manager, mock_rag, tmp_path):
+        """Test that a folder job with no ingestible file is not reported as done"""
+        bad = str(tmp_path / "bad.txt")
+
+        def add_course_folder(
+            folder_path, clear_existing=False, progress=None, errors=None
+        ):
+            progress(folder_path, 0, 1, 0)
+            errors[bad] = "No course found in file"
+            progress(bad, 1, 1, 0)
+            return 0, 0
+
+        mock_rag.add_course_folder.side_effect = add_course_folder
+        job = manager.submit([str(tmp_path)])
+        assert manager.wait(timeout=5)
+
+        assert job.status == "failed"
+        assert bad in job.file_errors
+
+    def test_on_done_receives_finished_job(self, manager, mock_rag, tmp_path):
+        """Test that the completion callback sees the job's file errors"""
+        bad = tmp_path / "bad.txt"
+        bad.write_text("", encoding="utf-8")
+        mock_rag.add_course_document.return_value = (None, 0)
+        finished = []
+
+        manager.submit([str(bad)], on_done=finished.append)
+        assert manager.wait(timeout=5)
+
+        assert finished[0].status == "failed"
+        assert list(finished[0].file_errors) == [str(bad)]
+
+    def test_ingestion_error_fails_job_and_worker_continues(
+        self, manager, mock_rag, tmp_path
+    ):
+        """Test that one failing job does not stop later jobs"""
+        mock_rag.add_course_folder.side_effect = [RuntimeError("disk full"), (1, 1)]
+
+        failed = manager.submit([str(tmp_path)])
+        succeeded = manager.submit([str(tmp_path)])
+        assert manager.wait(timeout=5)
+
+        assert failed.status == "failed"
+        assert failed.error == "disk full"
+        assert succeeded.status == "completed"
+
+    def test_jobs_run_one_at_a_time(self, manager, mock_rag, tmp_path):
+        """Test that queued jobs wait for the running one"""
+        release = threading.Event()
+        running = threading.Event()
+
+        def slow_folder(folder_path, clear_existing=False, progress=None, errors=None):
+            running.set()
+            release.wait(5)
+            return 1, 1
+
+        mock_rag.add_course_folder.side_effect = slow_folder
+        first = manager.submit([str(tmp_path)])
+        second = manager.submit([str(tmp_path)])
+        assert running.wait(5)
+
+        assert first.status == "running"
+        assert second.status == "queued"
+        assert manager.get(second.job_id) is second
+
+        release.set()
+        assert manager.wait(timeout=5)
+        assert second.status == "completed"
+
+    def test_shutdown_cancels_queued_jobs(self, manager, mock_rag, tmp_path):
+        """Test that jobs not yet started are cancelled at shutdown"""
+        release = threading.Event()
+        running = threading.Event()
+
+        def slow_folder(folder_path, clear_existing=False, progress=None, errors=None):
+            running.set()
+            release.wait(5)
+            return 1, 1
+
+        mock_rag.add_course_folder.side_effect = slow_folder
+        first = manager.submit([str(tmp_path)])
+        second = manager.submit([str(tmp_path)])
+        assert running.wait(5)
+
+        # Shut down while the first job is still running
+        stopper = threading.Thread(target=manager.shutdown, kwargs={"timeout": 5})
+        stopper.start()
+        deadline = time.monotonic() + 5
+        while second.status == "queued" and time.monotonic() < deadline:
+            time.sleep(0.01)
+        release.set()
+        stopper.join(5)
+
+        assert first.status == "completed"
+        assert second.status == "failed"
+        assert second.error == "Cancelled at shutdown"
@@ -0,0 +1,97 @@
+"""
+Unit tests for IngestManifest in ingest_manifest.py
+"""
+
+import os
+import sys
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from ingest_manifest import IngestManifest
+
+
+@pytest.fixture
+def course_file(tmp_path):
+    """A small course file on disk"""
+    path = tmp_path / "course.txt"
+    path.write_text("Course Title: Manifest Course\n\nLesson 0: Intro\nHello.")
+    return str(path)
+
+
+class TestIngestManifest:
+    """Test change detection and persistence"""
+
+    def test_unknown_file_is_changed(self, tmp_path, course_file):
+        """Test that files not in the manifest are reported as changed"""
+        manifest = IngestManifest(str(tmp_path / "manifest.json"))
+
+        assert manifest.is_unchanged(course_file) is False
+
+    def test_recorded_file_is_unchanged(self, tmp_path, course_file):
+        """Test that a recorded file is unchanged after reloading from disk"""
+        manifest_path = str(tmp_path / "manifest.json")
+        manifest = IngestManifest(manifest_path)
+        manifest.record(course_file, "Manifest Course", ["id_0", "id_1"])
+        manifest.save()
+
+        reloaded = IngestManifest(manifest_path)
+        entry = reloaded.get(course_file)
+
+        assert reloaded.is_unchanged(course_file) is True
+        assert entry["course_title"] == "Manifest Course"
+        assert entry["chunk_ids"] == ["id_0", "id_1"]
+
+    def test_modified_content_is_changed(self, tmp_path, course_file):
+        """Test that editing a file is detected"""
+        manifest = IngestManifest(str(tmp_path / "manifest.json"))
+        manifest.record(course_file, "Manifest Course", [])
+
+        with open(course_file, "a", encoding="utf-8") as file:
+            file.write(" More content.")
+
+        assert manifest.is_unchanged(course_file) is False
+
+    def test_touched_file_with_same_content_is_unchanged(self, tmp_path, course_file):
+        """Test that an mtime-only change falls back to the content hash"""
+        manifest = IngestManifest(str(tmp_path / "manifest.json"))
+        manifest.record(course_file, "Manifest Course", [])
+        stat = os.stat(course_file)
+        os.utime(course_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+        assert manifest.is_unchanged(course_file) is True
+        assert manifest.get(course_file)["mtime_ns"] == stat.st_mtime_ns + 10**9
+
+    def test_corrupt_manifest_starts_empty(self, tmp_path):
+        """Test that an unreadable manifest does not break startup"""
+        manifest_path = tmp_path / "manifest.json"
+        manifest_path.write_text("{not json")
+
+        manifest = IngestManifest(str(manifest_path))
+
+        assert manifest.entries == {}
+
+    def test_remove_and_clear(self, tmp_path, course_file):
+        """Test removing single entries and clearing the manifest"""
+        manifest = IngestManifest(str(tmp_path / "manifest.json"))
+        manifest.record(course_file, "Manifest Course", ["id_0"])
+
+        assert manifest.remove(course_file)["chunk_ids"] == ["id_0"]
+        assert manifest.get(course_file) is None
+
+        manifest.record(course_file, "Manifest Course", [])
+        manifest.clear()
+        assert manifest.entries == {}
+
+    def test_layout_round_trip(self, tmp_path):
+        """Test that the recorded index layout survives a reload"""
+        manifest_path = str(tmp_path / "manifest.json")
+        manifest = IngestManifest(manifest_path)
+        assert manifest.layout is None
+
+        manifest.set_layout({"shard_by_course": True})
+        manifest.save()
+
+        assert IngestManifest(manifest_path).layout == {"shard_by_course": True}
@@ -0,0 +1,133 @@
+"""
+Unit tests for speculative search prefetch in prefetch.py
+"""
+
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import Mock
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from prefetch import PrefetchStats, SpeculativeSearch
+from search_tools import CourseSearchTool
+from vector_store import SearchResults
+
+QUESTION = "What is prompt caching in the Anthropic API?"
+
+
+@pytest.fixture
+def executor():
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        yield executor
+
+
+def slow_store(seconds=0.0, error=None):
+    """Store whose search takes a while and returns one document"""
+    store = Mock()
+
+    def search(query, course_name=None, lesson_number=None, limit=None):
+        time.sleep(seconds)
+        if error:
+            return SearchResults.empty(error)
+        return SearchResults(
+            documents=[f"About {query}"],
+            metadata=[{"course_title": "Course A", "lesson_number": 1}],
+            distances=[0.1],
+        )
+
+    store.search = Mock(side_effect=search)
+    return store
+
+
+class TestSpeculativeSearch:
+    """Test matching, single use and hit/miss accounting"""
+
+    @pytest.mark.parametrize(
+        "query, course_name, lesson_number, expected",
+        [
+            ("prompt caching", None, None, True),
+            ("What is prompt caching?", None, None, True),
+            ("prompt caching pricing", None, None, False),
+            ("prompt caching", "Course A", None, False),
+            ("prompt caching", None, 2, False),
+            ("?", None, None, False),
+        ],
+    )
+    def test_matches(self, executor, query, course_name, lesson_number, expected):
+        """Test that only unfiltered queries made of question words match"""
+        prefetch = SpeculativeSearch(
+            slow_store(), QUESTION, executor, PrefetchStats(), min_overlap=0.8
+        )
+
+        assert prefetch.matches(query, course_name, lesson_number) is expected
+
+    def test_results_served_once(self, executor):
+        """Test that the first matching call gets the results and later ones search"""
+        store = slow_store(seconds=0.05)
+        stats = PrefetchStats()
+        prefetch = SpeculativeSearch(store, QUESTION, executor, stats)
+        time.sleep(0.1)  # Claude's first round
+
+        assert prefetch.take("prompt caching").documents == [f"About {QUESTION}"]
+        assert prefetch.take("prompt caching") is None
+        prefetch.close()
+
+        result = stats.stats()
+        assert (result["launched"], result["hits"], result["misses"]) == (1, 1, 0)
+        assert result["saved_ms"] >= 40
+        store.search.assert_called_once_with(QUESTION)
+
+    def test_unused_prefetch_is_a_miss(self, executor):
+        """Test that close() counts a prefetch no tool call used"""
+        stats = PrefetchStats()
+        prefetch = SpeculativeSearch(slow_store(), QUESTION, executor, stats)
+
+        assert prefetch.take("lesson 3 outline", "Course A") is None
+        prefetch.close()
+
+        assert stats.stats()["misses"] == 1
+        assert stats.stats()["hit_rate"] == 0.0
+
+    def test_failed_search_falls_back(self, executor):
+        """Test that a prefetch error is not served as the tool's result"""
+        stats = PrefetchStats()
+        prefetch = SpeculativeSearch(
+            slow_store(error="Search error: down"), QUESTION, executor, stats
+        )
+
+        assert prefetch.take("prompt caching") is None
+        assert stats.stats()["misses"] == 1
+
+
+class TestSearchToolPrefetch:
+    """Test that the search tool consumes the current query's prefetch"""
+
+    def test_batch_searches_only_unmatched_calls(self, executor):
+        """Test that a matching call skips the vector store batch"""
+        store = slow_store()
+        store.search_many = Mock(
+            return_value=[SearchResults(["Lesson 2 text"], [{}], [0.2])]
+        )
+        store.get_course_link = Mock(return_value=None)
+        store.get_lesson_link = Mock(return_value=None)
+        tool = CourseSearchTool(store)
+        prefetch = SpeculativeSearch(store, QUESTION, executor, PrefetchStats())
+
+        results = tool.run_many(
+            [
+                {"query": "prompt caching"},
+                {"query": "prompt caching", "lesson_number": 2},
+            ],
+            prefetch,
+        )
+
+        assert f"About {QUESTION}" in results[0][0]
+        assert results[0][1][0]["text"] == "Course A - Lesson 1"
+        assert "Lesson 2 text" in results[1][0]
+        requests = store.search_many.call_args[0][0]
+        assert [request.lesson_number for request in requests] == [2]
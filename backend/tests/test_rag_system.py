@@ -2,15 +2,19 @@
 Integration tests for RAGSystem in rag_system.py
 """
 
+import asyncio
 import os
 import sys
-from unittest.mock import MagicMock, Mock, patch
+import time
+from unittest.mock import AsyncMock, MagicMock, Mock, patch
 
 import pytest
 
 # Add parent directory to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
 
+from conftest import write_course_file
+from course_resolver import CourseNameResolver
 from rag_system import RAGSystem
 
 
@@ -116,8 +120,11 @@ class TestRAGSystemQuery:
         mock_ai_gen_class.return_value = mock_ai_instance
 
         mock_session_instance = Mock()
-        mock_session_instance.get_conversation_history = Mock(
-            return_value="User: Previous question\nAssistant: Previous answer"
+        mock_session_instance.get_history_messages = Mock(
+            return_value=[
+                {"role": "user", "content": "Previous question"},
+                {"role": "assistant", "content": "Previous answer"},
+            ]
         )
         mock_session_instance.add_exchange = Mock()
         mock_session_class.return_value = mock_session_instance
@@ -128,7 +135,7 @@ class TestRAGSystemQuery:
         response, sources = rag.query("What is AI?", session_id="test_session")
 
         # Should get history
-        mock_session_instance.get_conversation_history.assert_called_once_with(
+        mock_session_instance.get_history_messages.assert_called_once_with(
             "test_session"
         )
 
@@ -183,12 +190,20 @@ class TestRAGSystemQuery:
         mock_ai_gen_class,
         test_config,
     ):
-        """Test that sources are retrieved from tool manager"""
-        # Setup mocks
+        """Test that sources are collected from the query's own tool calls"""
+        source = {
+            "text": "Course A - Lesson 1",
+            "course_link": "http://test.com",
+            "lesson_link": "http://test.com/1",
+        }
+
+        # Setup mocks: the AI searches once through the query's tool runner
+        def generate_response(**kwargs):
+            kwargs["run_tools"]([("search_course_content", {"query": "caching"})])
+            return "AI response about prompt caching"
+
         mock_ai_instance = Mock()
-        mock_ai_instance.generate_response = Mock(
-            return_value="AI response about prompt caching"
-        )
+        mock_ai_instance.generate_response = Mock(side_effect=generate_response)
         mock_ai_gen_class.return_value = mock_ai_instance
 
         mock_session_instance = Mock()
@@ -196,28 +211,19 @@ class TestRAGSystemQuery:
         mock_session_class.return_value = mock_session_instance
 
         rag = RAGSystem(test_config)
-
-        # Manually set sources in tool manager (simulating a search)
-        rag.tool_manager.tools["search_course_content"].last_sources = [
-            {
-                "text": "Course A - Lesson 1",
-                "course_link": "http://test.com",
-                "lesson_link": "http://test.com/1",
-            }
-        ]
+        rag.tool_manager.run_tools = Mock(return_value=(["Search output"], [source]))
 
         # Execute query
         response, sources = rag.query("What is prompt caching?")
 
-        # Should return sources
-        assert isinstance(sources, list)
-        assert len(sources) > 0
+        # Should return the search's sources
+        assert sources == [source]
 
     @patch("rag_system.AIGenerator")
     @patch("rag_system.VectorStore")
     @patch("rag_system.DocumentProcessor")
     @patch("rag_system.SessionManager")
-    def test_query_resets_sources_after_retrieval(
+    def test_query_ignores_shared_sources(
         self,
         mock_session_class,
         mock_doc_proc,
@@ -225,7 +231,7 @@ class TestRAGSystemQuery:
         mock_ai_gen_class,
         test_config,
     ):
-        """Test that sources are reset after being retrieved"""
+        """Test that sources left on the shared tools are never returned"""
         # Setup mocks
         mock_ai_instance = Mock()
         mock_ai_instance.generate_response = Mock(return_value="AI response")
@@ -237,7 +243,7 @@ class TestRAGSystemQuery:
 
         rag = RAGSystem(test_config)
 
-        # Set sources
+        # Sources from a direct execute_tool call or another query
         rag.tool_manager.tools["search_course_content"].last_sources = [
             {"text": "Source 1", "course_link": None, "lesson_link": None}
         ]
@@ -245,9 +251,8 @@ class TestRAGSystemQuery:
         # Execute query
         response, sources = rag.query("Test")
 
-        # Sources should be reset after query
-        new_sources = rag.tool_manager.get_last_sources()
-        assert len(new_sources) == 0
+        # Only this query's own (here: no) searches provide sources
+        assert sources == []
 
     @patch("rag_system.AIGenerator")
     @patch("rag_system.VectorStore")
@@ -284,6 +289,306 @@ class TestRAGSystemQuery:
         assert "course materials" in call_kwargs["query"]
 
 
+class TestRAGSystemAsyncQuery:
+    """Test the non-blocking query path"""
+
+    @staticmethod
+    def sources_for(query):
+        return [{"text": query, "course_link": None, "lesson_link": None}]
+
+    @pytest.fixture
+    def rag(self, test_config):
+        with (
+            patch("rag_system.VectorStore"),
+            patch("rag_system.DocumentProcessor"),
+            patch("ai_generator.anthropic.Anthropic"),
+            patch("ai_generator.anthropic.AsyncAnthropic"),
+        ):
+            rag = RAGSystem(test_config)
+
+        def search(prefetch=None, **kwargs):
+            # Blocking work, like embedding and a vector store query
+            time.sleep(0.05)
+            return (
+                f"Results for {kwargs['query']}",
+                self.sources_for(kwargs["query"]),
+            )
+
+        rag.search_tool.run = Mock(side_effect=search)
+        return rag
+
+    @staticmethod
+    def fake_claude(delay):
+        """Async messages.create that asks for one search, then answers"""
+
+        async def create(**kwargs):
+            await asyncio.sleep(delay)
+            messages = kwargs["messages"]
+            if len(messages) == 1:
+                question = messages[0]["content"][0]["text"]
+                block = Mock(type="tool_use", id="tool_1", input={"query": question})
+                block.name = "search_course_content"
+                return Mock(stop_reason="tool_use", content=[block])
+            result = messages[-1]["content"][0]["content"]
+            return Mock(
+                stop_reason="end_turn", content=[Mock(type="text", text=result)]
+            )
+
+        return AsyncMock(side_effect=create)
+
+    def test_concurrent_queries_overlap(self, rag):
+        """Test that queries waiting on Claude do not block each other"""
+        rag.ai_generator.async_client.messages.create = self.fake_claude(0.2)
+
+        async def run_all():
+            return await asyncio.gather(
+                *(rag.aquery(f"question {i}", f"session_{i}") for i in range(10))
+            )
+
+        started = time.perf_counter()
+        results = asyncio.run(run_all())
+        elapsed = time.perf_counter() - started
+
+        # Serially this takes 10 x (2 API calls + 1 search) = 4.5s
+        assert elapsed < 2.0
+        prompt = "Answer this question about course materials: "
+        for i, (answer, sources) in enumerate(results):
+            assert answer == f"Results for {prompt}question {i}"
+            assert sources == self.sources_for(f"{prompt}question {i}")
+
+    def test_tool_rounds_of_queries_overlap(self, rag):
+        """Test that one query's searches do not wait for another's"""
+        rag.ai_generator.async_client.messages.create = self.fake_claude(0)
+        rag.search_tool.run.side_effect = lambda prefetch=None, **kwargs: (
+            time.sleep(0.3) or ("Results", self.sources_for(kwargs["query"]))
+        )
+
+        async def run_all():
+            return await asyncio.gather(
+                *(rag.aquery(f"question {i}", f"session_{i}") for i in range(4))
+            )
+
+        started = time.perf_counter()
+        results = asyncio.run(run_all())
+
+        # Searches taking turns would need 4 x 0.3s
+        assert time.perf_counter() - started < 0.9
+        prompt = "Answer this question about course materials: "
+        for i, (_, sources) in enumerate(results):
+            assert sources == self.sources_for(f"{prompt}question {i}")
+
+    def test_identical_queries_share_one_answer(self, rag):
+        """Test that concurrent identical first-turn questions call Claude once"""
+        create = self.fake_claude(0.1)
+        rag.ai_generator.async_client.messages.create = create
+        sessions = [rag.session_manager.create_session() for _ in range(5)]
+
+        async def run_all():
+            return await asyncio.gather(
+                *(rag.aquery("What is MCP?", session_id) for session_id in sessions)
+            )
+
+        results = asyncio.run(run_all())
+
+        assert create.call_count == 2  # One tool round and the final answer
+        assert len({answer for answer, _ in results}) == 1
+        for session_id in sessions:
+            assert rag.session_manager.get_history_messages(session_id)
+        assert rag.get_cache_stats()["query_flights"]["shared"] == 4
+
+    def test_exchange_recorded_in_session(self, rag):
+        """Test that async queries update conversation history"""
+        rag.ai_generator.async_client.messages.create = self.fake_claude(0)
+        session_id = rag.session_manager.create_session()
+
+        answer, _ = asyncio.run(rag.aquery("What is MCP?", session_id))
+
+        history = rag.session_manager.get_conversation_history(session_id)
+        assert "What is MCP?" in history
+        assert answer in history
+        assert rag.tool_manager.get_last_sources() == []
+
+
+class TestRAGSystemStreamQuery:
+    """Test streamed query events"""
+
+    @patch("rag_system.AIGenerator")
+    @patch("rag_system.VectorStore")
+    @patch("rag_system.DocumentProcessor")
+    def test_sources_follow_answer(
+        self, mock_doc_proc, mock_vector_store, mock_ai_gen_class, test_config
+    ):
+        """Test that the answer streams, then sources, then history is saved"""
+        rag = RAGSystem(test_config)
+        source = {"text": "Course A - Lesson 1", "course_link": None}
+
+        async def stream(run_tools, **kwargs):
+            yield {"type": "text", "text": "Let me search."}
+            yield {"type": "status", "text": "Let me search."}
+            yield {"type": "tool", "name": "search_course_content", "input": {}}
+            await run_tools([("search_course_content", {})])
+            yield {"type": "text", "text": "Prompt "}
+            yield {"type": "text", "text": "caching"}
+
+        rag.ai_generator.astream_response = stream
+
+        rag.tool_manager.run_tools = Mock(return_value=(["Search output"], [source]))
+        session_id = rag.session_manager.create_session()
+
+        async def collect():
+            return [event async for event in rag.astream_query("Q?", session_id)]
+
+        events = asyncio.run(collect())
+
+        assert [event["type"] for event in events] == [
+            "text",
+            "status",
+            "tool",
+            "text",
+            "text",
+            "sources",
+        ]
+        assert events[-1]["sources"] == [source]
+        history = rag.session_manager.get_conversation_history(session_id)
+        assert "Prompt caching" in history
+        assert "Let me search." not in history
+
+
+class TestRAGSystemPrefetch:
+    """Test opt-in speculative search during the first Claude round"""
+
+    @patch("rag_system.AIGenerator")
+    @patch("rag_system.VectorStore")
+    @patch("rag_system.DocumentProcessor")
+    def test_tool_call_served_from_prefetch(
+        self, mock_doc_proc, mock_vector_store, mock_ai_gen_class, test_config
+    ):
+        """Test that the raw question is searched once and reused by the tool"""
+        from vector_store import SearchResults
+
+        test_config.SPECULATIVE_PREFETCH = True
+        rag = RAGSystem(test_config)
+        store = rag.vector_store
+        store.search = Mock(
+            return_value=SearchResults(
+                ["Prompt caching stores prefixes."],
+                [{"course_title": "Course A", "lesson_number": 1}],
+                [0.1],
+            )
+        )
+        store.get_course_link = Mock(return_value=None)
+        store.get_lesson_link = Mock(return_value=None)
+
+        def generate_response(run_tools, **kwargs):
+            outputs = run_tools(
+                [("search_course_content", {"query": "prompt caching"})]
+            )
+            return outputs[0]
+
+        rag.ai_generator.generate_response = Mock(side_effect=generate_response)
+
+        response, sources = rag.query("What is prompt caching?")
+
+        assert "Prompt caching stores prefixes." in response
+        assert sources[0]["text"] == "Course A - Lesson 1"
+        store.search.assert_called_once_with("What is prompt caching?")
+        store.search_many.assert_not_called()
+        assert rag.get_cache_stats()["prefetch"]["hits"] == 1
+
+    @patch("rag_system.AIGenerator")
+    @patch("rag_system.VectorStore")
+    @patch("rag_system.DocumentProcessor")
+    def test_disabled_by_default(
+        self, mock_doc_proc, mock_vector_store, mock_ai_gen_class, test_config
+    ):
+        """Test that no speculative search runs unless enabled"""
+        rag = RAGSystem(test_config)
+        rag.ai_generator.generate_response = Mock(return_value="Answer")
+
+        rag.query("What is prompt caching?")
+
+        rag.vector_store.search.assert_not_called()
+        assert rag.get_cache_stats()["prefetch"]["launched"] == 0
+
+
+class TestRAGSystemAnswerCache:
+    """Test the opt-in semantic answer cache in front of Claude"""
+
+    @pytest.fixture
+    def rag(self, test_config):
+        with (
+            patch("rag_system.AIGenerator"),
+            patch("rag_system.VectorStore"),
+            patch("rag_system.DocumentProcessor"),
+        ):
+            test_config.SEMANTIC_ANSWER_CACHE = True
+            rag = RAGSystem(test_config)
+        rag.vector_store.generation = 0
+        rag.vector_store.course_resolver = CourseNameResolver(
+            ["MCP: Build Rich-Context AI Apps with Anthropic"]
+        )
+        rag.vector_store.embed_query = Mock(
+            side_effect=lambda query: [1.0, 0.1] if "MCP" in query else [0.0, 1.0]
+        )
+        rag.ai_generator.generate_response = Mock(return_value="Lesson 1 covers MCP")
+        return rag
+
+    def test_similar_first_turn_skips_claude(self, rag):
+        """Test that a near-identical question is answered without an API call"""
+        sources = [{"text": "MCP - Lesson 1", "link": None}]
+        rag.tool_manager.run_tools = Mock(return_value=(["Search output"], sources))
+
+        def generate_response(**kwargs):
+            kwargs["run_tools"]([("search_course_content", {"query": "MCP"})])
+            return "Lesson 1 covers MCP"
+
+        rag.ai_generator.generate_response.side_effect = generate_response
+        rag.query("What is covered in lesson 1 of the MCP course?")
+
+        session_id = rag.session_manager.create_session()
+        response, cached_sources = rag.query(
+            "what's covered in lesson 1 of MCP?", session_id
+        )
+
+        assert response == "Lesson 1 covers MCP"
+        assert cached_sources == sources
+        rag.ai_generator.generate_response.assert_called_once()
+        assert rag.session_manager.get_history_messages(session_id)
+        assert rag.get_cache_stats()["answers"]["hits"] == 1
+
+    def test_different_lesson_number_misses(self, rag):
+        """Test that questions differing only in a number are answered separately"""
+        rag.query("What is covered in lesson 1 of the MCP course?")
+        rag.query("What is covered in lesson 2 of the MCP course?")
+        rag.query("What is covered in lesson one of the MCP course?")
+
+        assert rag.ai_generator.generate_response.call_count == 2
+        assert rag.get_cache_stats()["answers"]["hits"] == 1
+
+    def test_follow_up_and_index_changes_bypass_cache(self, rag):
+        """Test that later turns and a re-indexed store call Claude again"""
+        session_id = rag.session_manager.create_session()
+        rag.query("What is in the MCP course?", session_id)
+        rag.query("What is in the MCP course?", session_id)
+
+        rag.vector_store.generation = 1
+        rag.query("What is in the MCP course?")
+
+        assert rag.ai_generator.generate_response.call_count == 3
+
+    def test_streamed_hit_yields_answer_and_sources(self, rag):
+        """Test that a cache hit streams the answer as one text event"""
+        rag.query("What is in the MCP course?")
+
+        async def collect():
+            return [event async for event in rag.astream_query("MCP course contents?")]
+
+        events = asyncio.run(collect())
+
+        assert [event["type"] for event in events] == ["text", "sources"]
+        assert events[0]["text"] == "Lesson 1 covers MCP"
+
+
 class TestRAGSystemWithRealToolExecution:
     """Test RAG system with actual tool execution (mocked vector store)"""
 
@@ -481,14 +786,17 @@ class TestRAGSystemConversationHistory:
     ):
         """Test that conversation history is passed to AI"""
         # Setup mocks
-        test_history = "User: What is AI?\nAssistant: AI is artificial intelligence."
+        test_history = [
+            {"role": "user", "content": "What is AI?"},
+            {"role": "assistant", "content": "AI is artificial intelligence."},
+        ]
 
         mock_ai_instance = Mock()
         mock_ai_instance.generate_response = Mock(return_value="Follow-up response")
         mock_ai_gen_class.return_value = mock_ai_instance
 
         mock_session_instance = Mock()
-        mock_session_instance.get_conversation_history = Mock(return_value=test_history)
+        mock_session_instance.get_history_messages = Mock(return_value=test_history)
         mock_session_instance.add_exchange = Mock()
         mock_session_class.return_value = mock_session_instance
 
@@ -535,3 +843,256 @@ class TestRAGSystemConversationHistory:
         assert call_args[0] == "session_123"
         assert call_args[1] == query_text  # Original query
         assert call_args[2] == "AI response"
+
+
+class TestRAGSystemFolderIngestion:
+    """Test serial and parallel folder ingestion"""
+
+    @staticmethod
+    def _mock_store(existing_titles=None):
+        mock_store = Mock()
+        mock_store.get_existing_course_titles = Mock(
+            return_value=list(existing_titles or [])
+        )
+        # Record each upsert's batches, consuming them like the real store
+        mock_store.written = []
+
+        def upsert_course_content(course_title, chunk_batches):
+            batches = [list(batch) for batch in chunk_batches]
+            mock_store.written.append((course_title, batches))
+            return [f"id_{c.chunk_index}" for batch in batches for c in batch]
+
+        mock_store.upsert_course_content = Mock(side_effect=upsert_course_content)
+        return mock_store
+
+    @staticmethod
+    def _rag(test_config, mock_store, tmp_path):
+        test_config.INGEST_MANIFEST_PATH = str(tmp_path / "manifest.json")
+        with (
+            patch("rag_system.VectorStore", return_value=mock_store),
+            patch("rag_system.AIGenerator"),
+            patch("rag_system.SessionManager"),
+        ):
+            return RAGSystem(test_config)
+
+    def _ingest(self, test_config, course_folder, tmp_path, workers):
+        mock_store = self._mock_store()
+        rag = self._rag(test_config, mock_store, tmp_path / f"workers{workers}")
+        totals = rag.add_course_folder(course_folder, workers=workers)
+        written = [
+            (title, [chunk for batch in batches for chunk in batch])
+            for title, batches in mock_store.written
+        ]
+        return totals, written
+
+    def test_parallel_matches_serial(self, test_config, course_folder, tmp_path):
+        """Test that a process pool produces the same writes as the serial path"""
+        serial_totals, serial_chunks = self._ingest(
+            test_config, course_folder, tmp_path, 1
+        )
+        parallel_totals, parallel_chunks = self._ingest(
+            test_config, course_folder, tmp_path, 2
+        )
+
+        assert serial_totals[0] == 3
+        assert serial_totals[1] > 0
+        assert parallel_totals == serial_totals
+        assert parallel_chunks == serial_chunks
+
+    def test_duplicate_course_files_skipped(self, test_config, course_folder, tmp_path):
+        """Test that a second file with an already indexed title is not added"""
+        write_course_file(course_folder, "copy.txt", "Test Course 0")
+        mock_store = self._mock_store()
+        rag = self._rag(test_config, mock_store, tmp_path)
+
+        courses, chunks = rag.add_course_folder(course_folder)
+
+        assert courses == 3
+        written_titles = [
+            call.args[0].title for call in mock_store.add_course_metadata.call_args_list
+        ]
+        assert sorted(written_titles) == [
+            "Test Course 0",
+            "Test Course 1",
+            "Test Course 2",
+        ]
+
+    def test_unparsable_file_reported(self, test_config, course_folder, tmp_path):
+        """Test that a file that cannot be parsed is reported, not just printed"""
+        broken = os.path.join(course_folder, "broken.docx")
+        with open(broken, "wb") as file:
+            file.write(b"\x00\x01 not a zip")
+        rag = self._rag(test_config, self._mock_store(), tmp_path)
+
+        errors = {}
+        courses, _ = rag.add_course_folder(course_folder, workers=1, errors=errors)
+
+        assert courses == 3
+        assert list(errors) == [broken]
+
+    def test_duplicate_course_document_not_counted(
+        self, test_config, course_folder, tmp_path
+    ):
+        """Test that a single file duplicating an indexed course reports no course"""
+        titles = ["Test Course 0", "Test Course 1", "Test Course 2"]
+        rag = self._rag(test_config, self._mock_store(titles), tmp_path)
+        rag.add_course_folder(course_folder)
+        copy = write_course_file(course_folder, "copy.txt", "Test Course 0")
+
+        assert rag.add_course_document(str(copy)) == (None, 0)
+
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test_duplicate_files_are_not_parsed(
+        self, test_config, course_folder, tmp_path, workers
+    ):
+        """Test that a duplicate of an indexed course is skipped after a header peek"""
+        rag = self._rag(test_config, self._mock_store(), tmp_path)
+        rag.add_course_folder(course_folder)
+        write_course_file(course_folder, "copy.txt", "Test Course 0")
+
+        restarted = self._rag(
+            test_config,
+            self._mock_store(["Test Course 0", "Test Course 1", "Test Course 2"]),
+            tmp_path,
+        )
+        with patch.object(
+            restarted,
+            "_process_course_files",
+            wraps=restarted._process_course_files,
+        ) as mock_process:
+            courses, chunks = restarted.add_course_folder(
+                course_folder, workers=workers
+            )
+
+        assert (courses, chunks) == (0, 0)
+        assert mock_process.call_args.args[0] == []
+
+    def test_edited_file_is_reindexed(self, test_config, course_folder, tmp_path):
+        """Test that an edited file is upserted on the next run"""
+        rag = self._rag(test_config, self._mock_store(), tmp_path)
+        rag.add_course_folder(course_folder)
+
+        write_course_file(course_folder, "course1.txt", "Test Course 1", lessons=3)
+        restarted_store = self._mock_store(
+            ["Test Course 0", "Test Course 1", "Test Course 2"]
+        )
+        restarted = self._rag(test_config, restarted_store, tmp_path)
+        courses, chunks = restarted.add_course_folder(course_folder)
+
+        assert courses == 1
+        upserted = [chunk for batch in restarted_store.written[0][1] for chunk in batch]
+        assert {chunk.course_title for chunk in upserted} == {"Test Course 1"}
+        assert {chunk.lesson_number for chunk in upserted} == {0, 1, 2}
+
+    def test_writes_are_bounded_batches(self, test_config, tmp_path):
+        """Test that streamed chunks reach the store in bounded batches"""
+        folder = tmp_path / "docs"
+        folder.mkdir()
+        write_course_file(folder, "large.txt", "Large Course", lessons=6)
+        test_config.INGEST_BATCH_SIZE = 4
+        mock_store = self._mock_store()
+        rag = self._rag(test_config, mock_store, tmp_path)
+
+        courses, chunks = rag.add_course_folder(str(folder))
+
+        batches = mock_store.written[0][1]
+        assert courses == 1
+        assert sum(len(batch) for batch in batches) == chunks
+        assert len(batches) > 1
+        assert all(len(batch) <= 4 for batch in batches)
+        # The catalog entry is written once all lessons have been parsed
+        course = mock_store.add_course_metadata.call_args.args[0]
+        assert len(course.lessons) == 6
+
+    def test_retitled_file_removes_old_course(
+        self, test_config, course_folder, tmp_path
+    ):
+        """Test that changing a file's course title deletes the old course"""
+        rag = self._rag(test_config, self._mock_store(), tmp_path)
+        rag.add_course_folder(course_folder)
+
+        write_course_file(course_folder, "course2.txt", "Renamed Course")
+        restarted_store = self._mock_store(
+            ["Test Course 0", "Test Course 1", "Test Course 2"]
+        )
+        restarted = self._rag(test_config, restarted_store, tmp_path)
+        restarted.add_course_folder(course_folder)
+
+        restarted_store.delete_course.assert_called_once_with("Test Course 2")
+
+    def test_restart_skips_unchanged_files(self, test_config, course_folder, tmp_path):
+        """Test that a restart does not re-read files recorded in the manifest"""
+        mock_store = self._mock_store()
+        rag = self._rag(test_config, mock_store, tmp_path)
+        rag.add_course_folder(course_folder)
+
+        # Simulate a restart against the same index and manifest
+        restarted_store = self._mock_store(
+            ["Test Course 0", "Test Course 1", "Test Course 2"]
+        )
+        restarted = self._rag(test_config, restarted_store, tmp_path)
+        with patch.object(
+            restarted.document_processor, "process_course_document"
+        ) as mock_process:
+            courses, chunks = restarted.add_course_folder(course_folder)
+
+        assert (courses, chunks) == (0, 0)
+        mock_process.assert_not_called()
+
+    def test_restart_reprocesses_when_index_missing_course(
+        self, test_config, course_folder, tmp_path
+    ):
+        """Test that manifest entries are ignored for courses no longer indexed"""
+        rag = self._rag(test_config, self._mock_store(), tmp_path)
+        rag.add_course_folder(course_folder)
+
+        restarted_store = self._mock_store(["Test Course 0", "Test Course 1"])
+        restarted = self._rag(test_config, restarted_store, tmp_path)
+        courses, chunks = restarted.add_course_folder(course_folder)
+
+        assert courses == 1
+        assert chunks > 0
+
+    def test_layout_change_reindexes(self, test_config, course_folder, tmp_path):
+        """Test that switching SHARD_BY_COURSE clears the index and re-ingests"""
+        test_config.SHARD_BY_COURSE = False
+        rag = self._rag(test_config, self._mock_store(), tmp_path)
+        rag.add_course_folder(course_folder)
+
+        test_config.SHARD_BY_COURSE = True
+        restarted_store = self._mock_store(
+            ["Test Course 0", "Test Course 1", "Test Course 2"]
+        )
+        restarted = self._rag(test_config, restarted_store, tmp_path)
+        restarted_store.get_existing_course_titles.return_value = []
+        courses, chunks = restarted.add_course_folder(course_folder)
+
+        restarted_store.clear_all_data.assert_called_once_with(drop_shards=True)
+        assert restarted.manifest.layout == {"shard_by_course": True}
+        assert courses == 3
+        assert chunks > 0
+
+    def test_unchanged_layout_keeps_index(self, test_config, course_folder, tmp_path):
+        """Test that a restart with the same layout does not clear the index"""
+        rag = self._rag(test_config, self._mock_store(), tmp_path)
+        rag.add_course_folder(course_folder)
+
+        restarted_store = self._mock_store()
+        self._rag(test_config, restarted_store, tmp_path)
+
+        restarted_store.clear_all_data.assert_not_called()
+
+    def test_remove_course_file(self, test_config, course_folder, tmp_path):
+        """Test that a deleted file's course is removed from store and manifest"""
+        mock_store = self._mock_store()
+        rag = self._rag(test_config, mock_store, tmp_path)
+        rag.add_course_folder(course_folder)
+        deleted_path = os.path.join(course_folder, "course1.txt")
+        os.remove(deleted_path)
+
+        removed = rag.remove_course_file(deleted_path)
+
+        assert removed == "Test Course 1"
+        mock_store.delete_course.assert_called_once_with("Test Course 1")
+        assert rag.manifest.get(deleted_path) is None
+        assert rag.remove_course_file(deleted_path) is None
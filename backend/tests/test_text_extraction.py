@@ -0,0 +1,166 @@
+"""
+Unit tests for PDF and DOCX text extraction in text_extraction.py
+"""
+
+import os
+import sys
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import text_extraction
+from document_processor import DocumentProcessor
+from text_extraction import DocumentExtractionError, extract_lines
+
+
+def write_docx(path, paragraphs):
+    """Write a minimal DOCX whose paragraphs are lists of runs"""
+    namespace = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+    body = "".join(
+        "<w:p>"
+        + "".join(
+            {"\t": "<w:r><w:tab/></w:r>", "\n": "<w:r><w:br/></w:r>"}.get(
+                run, f"<w:r><w:t xml:space='preserve'>{run}</w:t></w:r>"
+            )
+            for run in runs
+        )
+        + "</w:p>"
+        for runs in paragraphs
+    )
+    with zipfile.ZipFile(path, "w") as archive:
+        archive.writestr(
+            "word/document.xml",
+            f"<w:document xmlns:w='{namespace}'><w:body>{body}</w:body></w:document>",
+        )
+    return str(path)
+
+
+class FakePage:
+    def __init__(self, text):
+        self.text = text
+
+    def extract_text(self):
+        return self.text
+
+
+class FakePdfReader:
+    """Stands in for pypdf.PdfReader with numbered single-line pages"""
+
+    PAGE_COUNT = 40
+
+    def __init__(self, file_path):
+        self.pages = [FakePage(f"Page {i} text.") for i in range(self.PAGE_COUNT)]
+
+
+class TestDocxExtraction:
+    """Test streaming DOCX paragraph extraction"""
+
+    def test_paragraphs_become_lines(self, tmp_path):
+        """Test that runs are joined and tabs and breaks are kept"""
+        path = write_docx(
+            tmp_path / "course.docx",
+            [["Course Title: ", "Word Course"], ["a", "\t", "b"], ["line", "\n", "2"]],
+        )
+
+        assert list(extract_lines(path)) == [
+            "Course Title: Word Course",
+            "a\tb",
+            "line",
+            "2",
+        ]
+
+    def test_docx_course_is_parsed(self, tmp_path):
+        """Test that a DOCX course goes through normal lesson parsing"""
+        path = write_docx(
+            tmp_path / "course.docx",
+            [
+                ["Course Title: Word Course"],
+                ["Course Link: https://example.com/word"],
+                ["Course Instructor: Ada"],
+                [],
+                ["Lesson 1: Intro"],
+                ["Words are extracted from paragraphs."],
+            ],
+        )
+
+        course, chunks = DocumentProcessor(800, 100).process_course_document(path)
+
+        assert course.title == "Word Course"
+        assert course.instructor == "Ada"
+        assert [lesson.title for lesson in course.lessons] == ["Intro"]
+        assert chunks[0].content.endswith("Words are extracted from paragraphs.")
+
+    def test_invalid_docx_raises(self, tmp_path):
+        """Test that a non-zip .docx is rejected instead of chunked"""
+        path = tmp_path / "broken.docx"
+        path.write_bytes(b"\x00\x01 not a zip")
+
+        with pytest.raises(DocumentExtractionError):
+            list(extract_lines(str(path)))
+
+
+class TestPdfExtraction:
+    """Test PDF extraction with and without page parallelism"""
+
+    @pytest.fixture
+    def pdf_path(self, tmp_path):
+        path = tmp_path / "course.pdf"
+        path.write_bytes(b"%PDF-1.4 fake")
+        return str(path)
+
+    def test_missing_pypdf_raises(self, pdf_path):
+        """Test that PDFs are rejected when pypdf is not installed"""
+        with patch.object(text_extraction, "PdfReader", None):
+            with pytest.raises(DocumentExtractionError, match="pypdf"):
+                list(extract_lines(pdf_path))
+
+    def test_pdf_not_garbage_chunked(self, pdf_path):
+        """Test that an unreadable PDF fails parsing instead of producing chunks"""
+        with patch.object(text_extraction, "PdfReader", None):
+            with pytest.raises(DocumentExtractionError):
+                DocumentProcessor(800, 100).process_course_document(pdf_path)
+
+    @pytest.mark.parametrize("page_workers", [1, 3])
+    def test_pages_streamed_in_order(self, pdf_path, page_workers):
+        """Test that serial and parallel extraction yield pages in order"""
+        contexts = []
+
+        def thread_pool(max_workers, mp_context):
+            contexts.append(mp_context.get_start_method())
+            return ThreadPoolExecutor(max_workers)
+
+        with (
+            patch.object(text_extraction, "PdfReader", FakePdfReader),
+            patch.object(text_extraction, "ProcessPoolExecutor", thread_pool),
+            patch.object(
+                text_extraction,
+                "_extract_pdf_page_range",
+                wraps=text_extraction._extract_pdf_page_range,
+            ) as page_range,
+        ):
+            lines = list(
+                extract_lines(pdf_path, page_workers=page_workers, parallel_min_pages=8)
+            )
+
+        assert lines == [f"Page {i} text." for i in range(FakePdfReader.PAGE_COUNT)]
+        if page_workers == 1:
+            page_range.assert_not_called()
+        else:
+            assert page_range.call_count > page_workers
+            assert contexts == ["spawn"]
+
+    def test_small_pdf_extracted_serially(self, pdf_path):
+        """Test that PDFs below the page threshold skip the process pool"""
+        with (
+            patch.object(text_extraction, "PdfReader", FakePdfReader),
+            patch.object(text_extraction, "ProcessPoolExecutor") as pool,
+        ):
+            lines = list(extract_lines(pdf_path, page_workers=4, parallel_min_pages=64))
+
+        assert len(lines) == FakePdfReader.PAGE_COUNT
+        pool.assert_not_called()
@@ -0,0 +1,260 @@
+"""
+Unit tests for the NumPy vector backend in vector_backends.py
+"""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from vector_backends import NumpyBackend, NumpyCollection, create_backend
+
+FIELDS = ("course_title", "lesson_number")
+
+
+def records(count, course="A"):
+    """IDs, unit embeddings and metadata for count records"""
+    ids = [f"{course}-{i}" for i in range(count)]
+    embeddings = np.eye(8, dtype=np.float32)[[i % 8 for i in range(count)]]
+    metadatas = [{"course_title": course, "lesson_number": i % 2} for i in range(count)]
+    documents = [f"{course} document {i}" for i in range(count)]
+    return ids, embeddings, metadatas, documents
+
+
+@pytest.fixture
+def collection(tmp_path, fake_embedding_function):
+    return NumpyCollection(str(tmp_path / "content"), fake_embedding_function, FIELDS)
+
+
+class TestNumpyCollection:
+    """Test reads, writes and filters against the Chroma-compatible API"""
+
+    def test_query_orders_by_squared_l2(self, collection):
+        """Test that results are closest first with Chroma's distance"""
+        ids, embeddings, metadatas, documents = records(3)
+        collection.add(
+            ids=ids, embeddings=embeddings, metadatas=metadatas, documents=documents
+        )
+
+        results = collection.query(query_embeddings=[[0, 1, 0, 0, 0, 0, 0, 0]])
+
+        assert results["ids"][0][0] == "A-1"
+        assert results["distances"][0] == pytest.approx([0.0, 2.0, 2.0])
+
+    def test_filters_use_row_masks(self, collection):
+        """Test equality, $and and $in filters"""
+        for course in ("A", "B"):
+            ids, embeddings, metadatas, documents = records(4, course)
+            collection.add(
+                ids=ids, embeddings=embeddings, metadatas=metadatas, documents=documents
+            )
+
+        both = {"$and": [{"course_title": "B"}, {"lesson_number": 1}]}
+        assert collection.get(where=both)["ids"] == ["B-1", "B-3"]
+        assert collection.query(
+            query_embeddings=[np.ones(8)], n_results=10, where=both
+        )["ids"][0] == ["B-1", "B-3"]
+        assert (
+            len(collection.get(where={"course_title": {"$in": ["A", "B"]}})["ids"]) == 8
+        )
+        assert collection.get(where={"course_title": "C"})["ids"] == []
+
+    def test_update_merges_metadata(self, collection):
+        """Test that metadata-only updates keep other keys and the vector"""
+        ids, embeddings, metadatas, documents = records(1)
+        collection.add(
+            ids=ids, embeddings=embeddings, metadatas=metadatas, documents=documents
+        )
+
+        collection.update(ids=["A-0", "missing"], metadatas=[{"lesson_number": 5}, {}])
+
+        assert collection.get(where={"lesson_number": 5})["metadatas"] == [
+            {"course_title": "A", "lesson_number": 5}
+        ]
+        assert collection.get(where={"lesson_number": 0})["ids"] == []
+        assert collection.query(query_embeddings=[embeddings[0]])["distances"] == [
+            [0.0]
+        ]
+
+    def test_add_ignores_existing_ids_and_upsert_replaces(self, collection):
+        """Test add and upsert semantics"""
+        collection.add(ids=["x"], documents=["first text"])
+        collection.add(ids=["x"], documents=["second text"])
+        assert collection.get(ids=["x"])["documents"] == ["first text"]
+
+        collection.upsert(ids=["x"], documents=["second text"])
+        assert collection.get(ids=["x"])["documents"] == ["second text"]
+        assert collection.count() == 1
+
+    def test_delete_by_filter(self, collection):
+        """Test that deleted records disappear from gets and queries"""
+        ids, embeddings, metadatas, documents = records(4)
+        collection.add(
+            ids=ids, embeddings=embeddings, metadatas=metadatas, documents=documents
+        )
+
+        collection.delete(where={"lesson_number": 0})
+
+        assert collection.get()["ids"] == ["A-1", "A-3"]
+        assert collection.query(query_embeddings=[embeddings[0]], n_results=10)[
+            "ids"
+        ] == [["A-1", "A-3"]]
+
+    def test_dimension_mismatch_raises(self, collection):
+        """Test that vectors of another model are rejected"""
+        collection.add(ids=["a"], embeddings=[np.ones(8)])
+
+        with pytest.raises(ValueError):
+            collection.add(ids=["b"], embeddings=[np.ones(4)])
+        with pytest.raises(ValueError):
+            collection.query(query_embeddings=[np.ones(4)])
+
+
+class TestNumpyPersistence:
+    """Test that collections survive reopening, growth and compaction"""
+
+    def test_reopen_restores_records_and_masks(self, tmp_path, collection):
+        """Test that a reopened collection answers the same queries"""
+        ids, embeddings, metadatas, documents = records(3000)
+        collection.add(
+            ids=ids, embeddings=embeddings, metadatas=metadatas, documents=documents
+        )
+        collection.delete(ids=["A-0"])
+        collection.update(ids=["A-1"], metadatas=[{"course_title": "Moved"}])
+        expected = collection.query(
+            query_embeddings=[embeddings[2]], n_results=3, where={"lesson_number": 0}
+        )
+
+        reopened = NumpyCollection(collection.path, None, FIELDS)
+
+        assert reopened.count() == 2999
+        assert reopened.get(where={"course_title": "Moved"})["ids"] == ["A-1"]
+        assert (
+            reopened.query(
+                query_embeddings=[embeddings[2]],
+                n_results=3,
+                where={"lesson_number": 0},
+            )
+            == expected
+        )
+
+    def test_compaction_drops_dead_rows(self, collection):
+        """Test that re-embedding everything rewrites the files"""
+        ids, embeddings, metadatas, documents = records(1500)
+        collection.add(
+            ids=ids, embeddings=embeddings, metadatas=metadatas, documents=documents
+        )
+
+        collection.upsert(
+            ids=ids, embeddings=embeddings, metadatas=metadatas, documents=documents
+        )
+
+        assert collection._size == 1500
+        assert sorted(os.listdir(collection.path)) == [
+            "index.json",
+            "records-1",
+            "vectors-1",
+        ]
+        reopened = NumpyCollection(collection.path, None, FIELDS)
+        assert reopened.get(ids=["A-7"])["documents"] == ["A document 7"]
+
+    def test_delete_collection(self, tmp_path, fake_embedding_function):
+        """Test that a dropped collection comes back empty"""
+        backend = create_backend("numpy", str(tmp_path), FIELDS)
+        assert isinstance(backend, NumpyBackend)
+        content = backend.get_or_create_collection("content", fake_embedding_function)
+        content.add(ids=["a"], documents=["some text"])
+
+        backend.delete_collection("content")
+        content = backend.get_or_create_collection("content", fake_embedding_function)
+
+        assert content.count() == 0
+        content.add(ids=["b"], documents=["other text"])
+        assert content.get()["ids"] == ["b"]
+
+    def test_unknown_backend(self, tmp_path):
+        """Test that a misspelled backend name fails loudly"""
+        with pytest.raises(ValueError, match="Unknown vector backend"):
+            create_backend("faiss", str(tmp_path))
+
+
+class TestQuantizedSearch:
+    """Test int8 and binary candidate search with exact rerank"""
+
+    @pytest.fixture
+    def clustered(self):
+        """Clustered unit vectors, like sentence embeddings of related chunks"""
+        rng = np.random.default_rng(0)
+        centers = rng.standard_normal((20, 64))
+        vectors = centers[rng.integers(0, 20, 2000)] + 0.5 * rng.standard_normal(
+            (2000, 64)
+        )
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors.astype(np.float32), vectors[:50] + 0.1
+
+    def load(self, path, vectors, quantization, rerank_factor=8):
+        collection = NumpyCollection(
+            str(path), None, FIELDS, quantization, rerank_factor
+        )
+        ids = [f"row-{i}" for i in range(len(vectors))]
+        metadatas = [{"lesson_number": i % 3} for i in range(len(vectors))]
+        collection.add(ids=ids, embeddings=vectors, metadatas=metadatas)
+        return collection
+
+    @pytest.mark.parametrize("quantization", ["int8", "binary"])
+    def test_rerank_matches_exact_search(self, tmp_path, clustered, quantization):
+        """Test that reranked results keep exact distances and high recall"""
+        vectors, queries = clustered
+        exact = self.load(tmp_path / "exact", vectors, "none").query(
+            query_embeddings=queries, n_results=5, where={"lesson_number": 1}
+        )
+        quantized = self.load(tmp_path / quantization, vectors, quantization)
+
+        results = quantized.query(
+            query_embeddings=queries, n_results=5, where={"lesson_number": 1}
+        )
+
+        recall = np.mean(
+            [
+                len(set(got) & set(expected)) / 5
+                for got, expected in zip(results["ids"], exact["ids"])
+            ]
+        )
+        assert recall >= 0.9
+        for got_ids, got, expected_ids, expected in zip(
+            results["ids"], results["distances"], exact["ids"], exact["distances"]
+        ):
+            exact_by_id = dict(zip(expected_ids, expected))
+            for record_id, distance in zip(got_ids, got):
+                if record_id in exact_by_id:
+                    assert distance == pytest.approx(exact_by_id[record_id], abs=1e-5)
+
+    @pytest.mark.parametrize("quantization, ratio", [("int8", 3.5), ("binary", 20)])
+    def test_codes_are_smaller(self, tmp_path, clustered, quantization, ratio):
+        """Test that scans read several times fewer bytes than float32"""
+        vectors, _ = clustered
+        full = self.load(tmp_path / "exact", vectors, "none").search_memory_bytes()
+        quantized = self.load(tmp_path / quantization, vectors, quantization)
+
+        assert full / quantized.search_memory_bytes() >= ratio / 2
+
+    def test_codes_rebuilt_on_open(self, tmp_path, clustered):
+        """Test that codes are recomputed from the stored float vectors"""
+        vectors, queries = clustered
+        original = self.load(tmp_path / "int8", vectors, "int8")
+        expected = original.query(query_embeddings=queries[:5], n_results=3)
+
+        reopened = NumpyCollection(str(tmp_path / "int8"), None, FIELDS, "int8")
+
+        assert reopened.query(query_embeddings=queries[:5], n_results=3) == expected
+
+    def test_invalid_quantization(self, tmp_path):
+        """Test that unknown modes and quantized Chroma are rejected"""
+        with pytest.raises(ValueError, match="Unknown quantization"):
+            NumpyCollection(str(tmp_path), None, quantization="int4")
+        with pytest.raises(ValueError, match="numpy backend"):
+            create_backend("chroma", str(tmp_path), quantization="int8")
@@ -0,0 +1,641 @@
+"""
+Tests for VectorStore in vector_store.py using a temporary ChromaDB
+"""
+
+import os
+import sys
+from unittest.mock import Mock, patch
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from models import Course, CourseChunk, Lesson
+
+
+def make_chunks(title: str, texts):
+    """Build chunks for a course, one lesson per text"""
+    return [
+        CourseChunk(
+            content=text, course_title=title, lesson_number=index, chunk_index=index
+        )
+        for index, text in enumerate(texts)
+    ]
+
+
+@pytest.fixture
+def course():
+    """Course metadata with two lessons"""
+    return Course(
+        title="Vector Course",
+        course_link="https://example.com/vector",
+        instructor="Test Instructor",
+        lessons=[
+            Lesson(lesson_number=0, title="Intro", lesson_link="https://l/0"),
+            Lesson(lesson_number=1, title="Embeddings", lesson_link="https://l/1"),
+        ],
+    )
+
+
+class TestIncrementalContentUpsert:
+    """Test content-hash keyed upserts in add_course_content"""
+
+    TEXTS = [
+        "Vectors represent text as numbers.",
+        "Embeddings capture semantic meaning.",
+        "Chunks are stored with metadata.",
+    ]
+
+    def test_first_ingest_embeds_every_chunk(
+        self, real_vector_store, fake_embedding_function
+    ):
+        """Test that a new course embeds all of its chunks"""
+        ids = real_vector_store.add_course_content(
+            make_chunks("Vector Course", self.TEXTS)
+        )
+
+        assert len(ids) == 3
+        assert len(set(ids)) == 3
+        assert fake_embedding_function.embedded == self.TEXTS
+
+    def test_reingest_unchanged_embeds_nothing(
+        self, real_vector_store, fake_embedding_function
+    ):
+        """Test that re-adding identical chunks costs no embeddings"""
+        first_ids = real_vector_store.add_course_content(
+            make_chunks("Vector Course", self.TEXTS)
+        )
+        fake_embedding_function.embedded.clear()
+
+        second_ids = real_vector_store.add_course_content(
+            make_chunks("Vector Course", self.TEXTS)
+        )
+
+        assert second_ids == first_ids
+        assert fake_embedding_function.embedded == []
+
+    def test_edit_embeds_only_changed_chunk(
+        self, real_vector_store, fake_embedding_function
+    ):
+        """Test that editing one chunk embeds it and deletes the old version"""
+        real_vector_store.add_course_content(make_chunks("Vector Course", self.TEXTS))
+        fake_embedding_function.embedded.clear()
+
+        edited = list(self.TEXTS)
+        edited[1] = "Embeddings capture meaning and similarity."
+        real_vector_store.add_course_content(make_chunks("Vector Course", edited))
+
+        stored = real_vector_store.course_content.get(include=["documents"])
+        assert fake_embedding_function.embedded == [edited[1]]
+        assert sorted(stored["documents"]) == sorted(edited)
+
+    def test_removed_chunks_are_deleted(self, real_vector_store):
+        """Test that chunks missing from the new version are deleted"""
+        real_vector_store.add_course_content(make_chunks("Vector Course", self.TEXTS))
+
+        real_vector_store.add_course_content(
+            make_chunks("Vector Course", self.TEXTS[:1])
+        )
+
+        stored = real_vector_store.course_content.get(include=["documents"])
+        assert stored["documents"] == self.TEXTS[:1]
+
+    def test_moved_chunk_updates_metadata_only(
+        self, real_vector_store, fake_embedding_function
+    ):
+        """Test that a chunk whose index shifts is not re-embedded"""
+        real_vector_store.add_course_content(make_chunks("Vector Course", self.TEXTS))
+        fake_embedding_function.embedded.clear()
+
+        chunks = make_chunks("Vector Course", self.TEXTS)
+        chunks[2].chunk_index = 7
+        real_vector_store.add_course_content(chunks)
+
+        stored = real_vector_store.course_content.get(
+            where={"chunk_index": 7}, include=["documents"]
+        )
+        assert fake_embedding_function.embedded == []
+        assert stored["documents"] == [self.TEXTS[2]]
+
+    def test_legacy_chunks_matched_by_text(
+        self, real_vector_store, fake_embedding_function
+    ):
+        """Test that chunks stored without a content hash are not re-embedded"""
+        chunks = make_chunks("Vector Course", self.TEXTS)
+        real_vector_store.course_content.add(
+            documents=[chunk.content for chunk in chunks],
+            metadatas=[
+                {
+                    "course_title": chunk.course_title,
+                    "lesson_number": chunk.lesson_number,
+                    "chunk_index": chunk.chunk_index,
+                }
+                for chunk in chunks
+            ],
+            ids=[f"Vector_Course_{chunk.chunk_index}" for chunk in chunks],
+        )
+        fake_embedding_function.embedded.clear()
+
+        ids = real_vector_store.add_course_content(chunks)
+
+        assert fake_embedding_function.embedded == []
+        assert ids == [f"Vector_Course_{index}" for index in range(3)]
+
+    def test_duplicate_chunks_get_unique_ids(self, real_vector_store):
+        """Test that identical chunks within a lesson are stored separately"""
+        chunks = [
+            CourseChunk(
+                content="Repeated text.",
+                course_title="Vector Course",
+                lesson_number=0,
+                chunk_index=index,
+            )
+            for index in range(2)
+        ]
+
+        ids = real_vector_store.add_course_content(chunks)
+
+        assert len(set(ids)) == 2
+        assert real_vector_store.course_content.count() == 2
+
+
+class TestBatchedWrites:
+    """Test bounded, optionally pipelined content writes"""
+
+    TEXTS = [f"Sentence number {index} about vectors." for index in range(10)]
+
+    @pytest.fixture
+    def add_calls(self, real_vector_store):
+        """Record the IDs passed to each collection.add call"""
+        real_vector_store.write_batch_size = 3
+        real_vector_store.course_content.add = Mock(
+            wraps=real_vector_store.course_content.add
+        )
+        return real_vector_store.course_content.add
+
+    @pytest.mark.parametrize("pipeline", [True, False])
+    def test_adds_are_split_into_batches(
+        self, real_vector_store, fake_embedding_function, add_calls, pipeline
+    ):
+        """Test that no add call exceeds the write batch size"""
+        real_vector_store.pipeline_embeddings = pipeline
+
+        ids = real_vector_store.add_course_content(
+            make_chunks("Vector Course", self.TEXTS)
+        )
+
+        batch_sizes = [len(call.kwargs["ids"]) for call in add_calls.call_args_list]
+        assert batch_sizes == [3, 3, 3, 1]
+        assert sorted(fake_embedding_function.embedded) == sorted(self.TEXTS)
+        stored = real_vector_store.course_content.get()
+        assert sorted(stored["ids"]) == sorted(ids)
+
+    def test_pipeline_passes_precomputed_embeddings(self, real_vector_store, add_calls):
+        """Test that pipelined batches are embedded before they are added"""
+        real_vector_store.add_course_content(make_chunks("Vector Course", self.TEXTS))
+
+        for call in add_calls.call_args_list:
+            assert len(call.kwargs["embeddings"]) == len(call.kwargs["ids"])
+
+    def test_pipeline_results_match_serial(self, real_vector_store):
+        """Test that pipelining does not change what gets stored or found"""
+        real_vector_store.write_batch_size = 4
+        real_vector_store.pipeline_embeddings = False
+        real_vector_store.add_course_content(make_chunks("Serial", self.TEXTS))
+        real_vector_store.pipeline_embeddings = True
+        real_vector_store.add_course_content(make_chunks("Piped", self.TEXTS))
+
+        serial = real_vector_store.search("number 7 vectors", course_name="Serial")
+        piped = real_vector_store.search("number 7 vectors", course_name="Piped")
+
+        assert serial.documents == piped.documents
+        assert serial.distances == pytest.approx(piped.distances)
+
+    def test_failed_stream_writes_nothing_pending(self, real_vector_store, add_calls):
+        """Test that an error mid-stream does not add the buffered batch"""
+
+        def batches():
+            yield make_chunks("Vector Course", self.TEXTS[:5])
+            raise ValueError("parse failed")
+
+        with pytest.raises(ValueError):
+            real_vector_store.upsert_course_content("Vector Course", batches())
+
+        assert real_vector_store.course_content.count() == 0
+
+    def test_batch_size_clamped_to_chroma_limit(
+        self, tmp_path, fake_embedding_function
+    ):
+        """Test that the configured size never exceeds Chroma's max batch size"""
+        with patch(
+            "chromadb.utils.embedding_functions.SentenceTransformerEmbeddingFunction",
+            return_value=fake_embedding_function,
+        ):
+            from vector_store import VectorStore
+
+            store = VectorStore(
+                str(tmp_path / "chroma"), "fake-model", write_batch_size=10**9
+            )
+
+        assert store.write_batch_size == store.client.get_max_batch_size()
+
+
+class TestCourseMetadata:
+    """Test catalog writes"""
+
+    def test_metadata_upsert_replaces_lessons(self, real_vector_store, course):
+        """Test that re-adding a course updates its lesson list"""
+        real_vector_store.add_course_metadata(course)
+        course.lessons.append(Lesson(lesson_number=2, title="Search"))
+        course.lessons[-1].lesson_link = "https://l/2"
+
+        real_vector_store.add_course_metadata(course)
+
+        outline = real_vector_store.get_course_outline("Vector Course")
+        assert real_vector_store.get_course_count() == 1
+        assert [lesson["lesson_number"] for lesson in outline["lessons"]] == [0, 1, 2]
+
+    def test_delete_course(self, real_vector_store, course):
+        """Test that deleting a course removes catalog entry and content"""
+        real_vector_store.add_course_metadata(course)
+        real_vector_store.add_course_content(make_chunks("Vector Course", ["Text."]))
+
+        real_vector_store.delete_course("Vector Course")
+
+        assert real_vector_store.get_existing_course_titles() == []
+        assert real_vector_store.course_content.count() == 0
+
+
+class TestCatalogView:
+    """Test the in-memory catalog view behind link and outline lookups"""
+
+    @pytest.fixture
+    def store(self, real_vector_store, course):
+        real_vector_store.add_course_metadata(course)
+        real_vector_store.course_catalog.get = Mock(
+            wraps=real_vector_store.course_catalog.get
+        )
+        return real_vector_store
+
+    def test_lookups_read_catalog_once(self, store):
+        """Test that repeated link lookups are served from memory"""
+        for _ in range(5):
+            assert (
+                store.get_course_link("Vector Course") == "https://example.com/vector"
+            )
+            assert store.get_lesson_link("Vector Course", 1) == "https://l/1"
+
+        assert store.get_lesson_link("Vector Course", 9) is None
+        assert store.get_course_link("Missing Course") is None
+        assert store.course_catalog.get.call_count == 1
+
+    def test_format_results_has_no_per_result_lookups(self, store):
+        """Test that formatting several hits costs at most one catalog read"""
+        from search_tools import CourseSearchTool
+        from vector_store import SearchResults
+
+        results = SearchResults(
+            documents=[f"doc {i}" for i in range(5)],
+            metadata=[
+                {"course_title": "Vector Course", "lesson_number": i % 2}
+                for i in range(5)
+            ],
+            distances=[0.1] * 5,
+        )
+
+        CourseSearchTool(store)._format_results(results)
+        formatted, _ = CourseSearchTool(store)._format_results(results)
+
+        assert store.course_catalog.get.call_count == 1
+        assert formatted.count("[Vector Course - Lesson") == 5
+
+    def test_view_invalidated_by_catalog_writes(self, store, course):
+        """Test that ingest and delete are visible to the next lookup"""
+        store.get_course_link("Vector Course")
+
+        course.course_link = "https://example.com/moved"
+        store.add_course_metadata(course)
+        assert store.get_course_link("Vector Course") == "https://example.com/moved"
+
+        store.delete_course("Vector Course")
+        assert store.get_course_link("Vector Course") is None
+        assert store.get_course_count() == 0
+
+    def test_outline_and_metadata_from_view(self, store):
+        """Test outline and metadata listing"""
+        outline = store.get_course_outline("Vector Course")
+        metadata = store.get_all_courses_metadata()
+
+        assert outline["lessons"][1] == {
+            "lesson_number": 1,
+            "lesson_title": "Embeddings",
+        }
+        assert metadata[0]["lessons"][0]["lesson_link"] == "https://l/0"
+        assert "lessons_json" not in metadata[0]
+        assert store.course_catalog.get.call_count == 1
+
+
+class TestSearchMany:
+    """Test batched multi-query search"""
+
+    TEXTS = [
+        "Vectors represent text as numbers.",
+        "Embeddings capture semantic meaning.",
+    ]
+
+    @pytest.fixture
+    def store(self, real_vector_store, course):
+        real_vector_store.add_course_metadata(course)
+        real_vector_store.add_course_content(make_chunks("Vector Course", self.TEXTS))
+        real_vector_store.course_content.query = Mock(
+            wraps=real_vector_store.course_content.query
+        )
+        return real_vector_store
+
+    def test_results_in_input_order(self, store):
+        """Test that each request gets its own results, in order"""
+        results = store.search_many(
+            [
+                ("semantic meaning", "Vector Course", None, 1),
+                ("text as numbers", "Vector Course", None, 1),
+            ]
+        )
+
+        assert [r.documents for r in results] == [[self.TEXTS[1]], [self.TEXTS[0]]]
+
+    def test_same_filter_shares_one_query(self, store, fake_embedding_function):
+        """Test one embedding batch and one content query per distinct filter"""
+        from vector_store import SearchRequest
+
+        fake_embedding_function.embedded.clear()
+        results = store.search_many(
+            [
+                SearchRequest("numbers", "Vector Course"),
+                SearchRequest("meaning", "vector course"),
+                SearchRequest("meaning", "Vector Course", lesson_number=1),
+            ]
+        )
+
+        assert fake_embedding_function.embedded == ["numbers", "meaning"]
+        assert store.course_content.query.call_count == 2
+        assert results[2].documents == [self.TEXTS[1]]
+
+    def test_limit_applies_per_request(self, store):
+        """Test that a shared query is truncated to each request's limit"""
+        results = store.search_many(
+            [("numbers", None, None, 1), ("numbers", None, None, 2)]
+        )
+
+        assert store.course_content.query.call_count == 1
+        assert [len(r.documents) for r in results] == [1, 2]
+        assert results[0].documents == results[1].documents[:1]
+
+    def test_unknown_course_only_fails_its_request(self, store):
+        """Test that a failed course lookup does not affect other requests"""
+        store.course_catalog.query = Mock(
+            return_value={"documents": [[]], "metadatas": [[]]}
+        )
+
+        results = store.search_many([("numbers", "Nonexistent"), ("numbers",)])
+
+        assert results[0].error == "No course found matching 'Nonexistent'"
+        assert not results[1].is_empty()
+        store.course_catalog.query.assert_called_once()
+
+    def test_embedding_failure_returns_error_results(self, store):
+        """Test that a failing embedding model yields error results, not a raise"""
+        store._embed_queries = Mock(side_effect=RuntimeError("model unavailable"))
+
+        results = store.search_many([("numbers",), ("meaning", "Vector Course")])
+
+        assert [result.error for result in results] == [
+            "Search error: model unavailable"
+        ] * 2
+        assert store.search("other").error == "Search error: model unavailable"
+
+    def test_search_delegates_to_batch(self, store):
+        """Test that single searches keep their result and error behavior"""
+        assert store.search("numbers", course_name="Vector", limit=1).documents == [
+            self.TEXTS[0]
+        ]
+        assert store.search_many([]) == []
+
+
+class TestSearchResultCache:
+    """Test the generation-stamped search result and outline cache"""
+
+    @pytest.fixture
+    def store(self, real_vector_store, course):
+        real_vector_store.add_course_metadata(course)
+        real_vector_store.add_course_content(
+            make_chunks("Vector Course", ["Vectors represent text as numbers."])
+        )
+        real_vector_store.course_content.query = Mock(
+            wraps=real_vector_store.course_content.query
+        )
+        return real_vector_store
+
+    def test_repeated_search_served_from_cache(self, store):
+        """Test that identical searches for the same course query Chroma once"""
+        first = store.search("numbers", course_name="Vector Course")
+        second = store.search(" numbers ", course_name="vector")
+
+        assert second is first
+        assert store.course_content.query.call_count == 1
+
+    def test_different_parameters_miss(self, store):
+        """Test that lesson and limit are part of the cache key"""
+        store.search("numbers")
+        store.search("numbers", lesson_number=0)
+        store.search("numbers", limit=1)
+
+        assert store.course_content.query.call_count == 3
+
+    @pytest.mark.parametrize(
+        "write",
+        [
+            lambda store, course: store.add_course_metadata(course),
+            lambda store, course: store.add_course_content(
+                make_chunks("Vector Course", ["Numbers changed."])
+            ),
+            lambda store, course: store.delete_course(course.title),
+            lambda store, course: store.clear_all_data(),
+        ],
+    )
+    def test_writes_invalidate_results(self, store, course, write):
+        """Test that no entry from before a write is served after it"""
+        store.search("numbers")
+        store.get_course_outline("Vector Course")
+        generation = store._generation
+
+        write(store, course)
+        store.course_content.query = Mock(wraps=store.course_content.query)
+        store.search("numbers")
+
+        assert store._generation > generation
+        assert store.course_content.query.call_count == 1
+        assert store.result_cache.get(("outline", generation, "Vector Course")) is None
+
+    def test_outline_cached(self, store):
+        """Test that repeated outline lookups skip course name resolution"""
+        store._resolve_course_name = Mock(wraps=store._resolve_course_name)
+
+        first = store.get_course_outline("Vector")
+        second = store.get_course_outline("Vector")
+
+        assert first == second
+        store._resolve_course_name.assert_called_once()
+
+    def test_search_during_write_is_not_cached_as_current(self, store):
+        """Test that results read before a write finishes are stamped stale"""
+        original_query = store.course_content.query
+
+        def query_then_write(**kwargs):
+            results = original_query(**kwargs)
+            store.add_course_metadata(
+                Course(title="Late Course", course_link="l", instructor="i")
+            )
+            return results
+
+        store.course_content.query = Mock(side_effect=query_then_write)
+        store.search("numbers")
+        store.course_content.query = Mock(wraps=original_query)
+        store.search("numbers")
+
+        assert store.course_content.query.call_count == 1
+
+
+class TestShardedContent:
+    """Test per-course content shards and fan-out search"""
+
+    COURSES = {
+        "Vector Course": [
+            "Vectors represent text as numbers.",
+            "Embeddings capture semantic meaning.",
+        ],
+        "Search Course": [
+            "Search ranks chunks by distance.",
+            "Filters narrow search to one lesson.",
+        ],
+    }
+
+    def load(self, store):
+        for title, texts in self.COURSES.items():
+            store.add_course_content(make_chunks(title, texts))
+            store.add_course_metadata(
+                Course(title=title, course_link="l", instructor="i")
+            )
+        return store
+
+    @pytest.fixture
+    def store(self, real_vector_store):
+        # Shards open lazily, so sharding can be switched on before any write
+        real_vector_store.shard_by_course = True
+        return self.load(real_vector_store)
+
+    def test_courses_written_to_own_shards(self, store):
+        """Test that each course's chunks live only in its shard"""
+        assert store.course_content.count() == 0
+        for title, texts in self.COURSES.items():
+            shard = store._content_collection(title)
+            assert sorted(shard.get()["documents"]) == sorted(texts)
+
+    def test_course_search_reads_one_shard(self, store):
+        """Test that a course-filtered search queries exactly one shard"""
+        shards = {title: store._content_collection(title) for title in self.COURSES}
+        for shard in shards.values():
+            shard.query = Mock(wraps=shard.query)
+
+        results = store.search("numbers", course_name="Vector Course", lesson_number=0)
+
+        assert results.documents == [self.COURSES["Vector Course"][0]]
+        assert shards["Vector Course"].query.call_count == 1
+        assert shards["Search Course"].query.call_count == 0
+
+    def test_unfiltered_search_matches_unsharded(
+        self, store, tmp_path, fake_embedding_function
+    ):
+        """Test that merged fan-out results equal a single-collection search"""
+        with patch(
+            "chromadb.utils.embedding_functions.SentenceTransformerEmbeddingFunction",
+            return_value=fake_embedding_function,
+        ):
+            from vector_store import VectorStore
+
+            unsharded = self.load(
+                VectorStore(
+                    str(tmp_path / "unsharded"),
+                    "fake-model",
+                    backend=store.backend_name,
+                )
+            )
+
+        for query, lesson_number in [("search numbers", None), ("meaning", 1)]:
+            sharded_results = store.search(query, lesson_number=lesson_number, limit=3)
+            expected = unsharded.search(query, lesson_number=lesson_number, limit=3)
+            assert sharded_results.documents == expected.documents
+            assert sharded_results.distances == pytest.approx(expected.distances)
+
+    def test_reopened_store_finds_shards(
+        self, store, tmp_path, fake_embedding_function
+    ):
+        """Test that shards written before a restart are searched"""
+        with patch(
+            "chromadb.utils.embedding_functions.SentenceTransformerEmbeddingFunction",
+            return_value=fake_embedding_function,
+        ):
+            from vector_store import VectorStore
+
+            reopened = VectorStore(
+                str(tmp_path / "chroma"),
+                "fake-model",
+                backend=store.backend_name,
+                shard_by_course=True,
+            )
+
+        results = reopened.search("distance", limit=1)
+
+        assert results.documents == [self.COURSES["Search Course"][0]]
+
+    def test_delete_course_drops_shard(self, store):
+        """Test that deleting a course removes its shard from searches"""
+        store.delete_course("Vector Course")
+
+        assert "Vector Course" not in store._shards
+        assert store._content_collection("Vector Course").count() == 0
+        results = store.search("numbers meaning", limit=4)
+        assert sorted(results.documents) == sorted(self.COURSES["Search Course"])
+
+    def test_clear_all_data_drops_every_shard(self, store):
+        """Test that clearing the store empties all shards"""
+        store.clear_all_data()
+
+        assert store._shards == {}
+        for title in self.COURSES:
+            assert store._content_collection(title).count() == 0
+        assert store.search("numbers").is_empty()
+
+    def test_unsharded_clear_leaves_no_shards(self, real_vector_store, tmp_path):
+        """Test that clearing an unsharded store does not touch shard storage"""
+        self.load(real_vector_store)
+
+        real_vector_store.clear_all_data()
+
+        created = [
+            name
+            for _, dirs, files in os.walk(tmp_path)
+            for name in dirs + files
+            if name.startswith("course_content_")
+        ]
+        assert created == []
+
+    def test_clear_drops_shards_of_a_previous_layout(self, store):
+        """Test that an unsharded store can remove shards left by sharding"""
+        store.shard_by_course = False
+
+        store.clear_all_data(drop_shards=True)
+
+        store.shard_by_course = True
+        for title in self.COURSES:
+            assert store._content_collection(title).count() == 0
@@ -0,0 +1,836 @@
+import json
+import os
+import shutil
+import threading
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import chromadb
+import numpy as np
+from chromadb.config import Settings
+
+
+class VectorCollection(ABC):
+    """
+    The part of the ChromaDB collection API that VectorStore relies on.
+
+    Results use Chroma's shapes: get returns flat lists and query returns one
+    list per query. Filters are Chroma `where` dicts.
+    """
+
+    @abstractmethod
+    def add(
+        self,
+        ids: List[str],
+        embeddings: Optional[Sequence] = None,
+        metadatas: Optional[List[Dict]] = None,
+        documents: Optional[List[str]] = None,
+    ):
+        """Add new records; IDs that already exist are ignored"""
+        pass
+
+    @abstractmethod
+    def upsert(
+        self,
+        ids: List[str],
+        embeddings: Optional[Sequence] = None,
+        metadatas: Optional[List[Dict]] = None,
+        documents: Optional[List[str]] = None,
+    ):
+        """Add records or replace the ones with the same IDs"""
+        pass
+
+    @abstractmethod
+    def update(
+        self,
+        ids: List[str],
+        embeddings: Optional[Sequence] = None,
+        metadatas: Optional[List[Dict]] = None,
+        documents: Optional[List[str]] = None,
+    ):
+        """Change existing records, merging metadata; unknown IDs are ignored"""
+        pass
+
+    @abstractmethod
+    def delete(self, ids: Optional[List[str]] = None, where: Optional[Dict] = None):
+        """Remove records by ID and/or filter"""
+        pass
+
+    @abstractmethod
+    def get(
+        self,
+        ids: Optional[List[str]] = None,
+        where: Optional[Dict] = None,
+        include: Optional[List[str]] = None,
+    ) -> Dict[str, Any]:
+        """Read records by ID and/or filter"""
+        pass
+
+    @abstractmethod
+    def query(
+        self,
+        query_embeddings: Optional[Sequence] = None,
+        query_texts: Optional[List[str]] = None,
+        n_results: int = 10,
+        where: Optional[Dict] = None,
+    ) -> Dict[str, Any]:
+        """Nearest records to each query, closest first"""
+        pass
+
+    @abstractmethod
+    def count(self) -> int:
+        """Number of records"""
+        pass
+
+
+class VectorBackend(ABC):
+    """Storage engine that holds the named collections of a VectorStore"""
+
+    @abstractmethod
+    def get_or_create_collection(
+        self, name: str, embedding_function: Callable
+    ) -> VectorCollection:
+        """Open a collection, creating it if needed"""
+        pass
+
+    @abstractmethod
+    def delete_collection(self, name: str):
+        """Drop a collection and its data"""
+        pass
+
+    @abstractmethod
+    def get_max_batch_size(self) -> int:
+        """Most records accepted by a single write call"""
+        pass
+
+
+class ChromaBackend(VectorBackend):
+    """ChromaDB persistent client; Chroma collections are used as they are"""
+
+    def __init__(self, path: str):
+        self.client = chromadb.PersistentClient(
+            path=path, settings=Settings(anonymized_telemetry=False)
+        )
+
+    def get_or_create_collection(self, name: str, embedding_function: Callable):
+        return self.client.get_or_create_collection(
+            name=name, embedding_function=embedding_function
+        )
+
+    def delete_collection(self, name: str):
+        self.client.delete_collection(name)
+
+    def get_max_batch_size(self) -> int:
+        return self.client.get_max_batch_size()
+
+
+class NumpyBackend(VectorBackend):
+    """In-process backend keeping each collection in a NumpyCollection directory"""
+
+    MAX_BATCH_SIZE = 100_000
+
+    def __init__(
+        self,
+        path: str,
+        indexed_fields: Iterable[str] = (),
+        quantization: str = "none",
+        rerank_factor: int = 8,
+    ):
+        """
+        Args:
+            path: Directory holding one subdirectory per collection
+            indexed_fields: Metadata fields to keep row masks for
+            quantization: "none", "int8" or "binary" codes for candidate search
+            rerank_factor: Candidates per requested result rescored exactly
+        """
+        self.path = path
+        self.indexed_fields = tuple(indexed_fields)
+        self.quantization = quantization
+        self.rerank_factor = rerank_factor
+        self._collections: Dict[str, "NumpyCollection"] = {}
+        os.makedirs(path, exist_ok=True)
+
+    def get_or_create_collection(self, name: str, embedding_function: Callable):
+        if name not in self._collections:
+            self._collections[name] = NumpyCollection(
+                os.path.join(self.path, name),
+                embedding_function,
+                self.indexed_fields,
+                quantization=self.quantization,
+                rerank_factor=self.rerank_factor,
+            )
+        return self._collections[name]
+
+    def delete_collection(self, name: str):
+        collection = self._collections.pop(name, None)
+        if collection is not None:
+            collection.drop()
+        shutil.rmtree(os.path.join(self.path, name), ignore_errors=True)
+
+    def get_max_batch_size(self) -> int:
+        return self.MAX_BATCH_SIZE
+
+
+def create_backend(
+    name: str,
+    path: str,
+    indexed_fields: Iterable[str] = (),
+    quantization: str = "none",
+    rerank_factor: int = 8,
+) -> VectorBackend:
+    """
+    Build a vector backend by name.
+
+    Args:
+        name: "chroma" or "numpy"
+        path: Storage directory
+        indexed_fields: Metadata fields the numpy backend keeps row masks for
+        quantization: "none", "int8" or "binary"; only the numpy backend
+            supports quantized codes
+        rerank_factor: Candidates per requested result rescored exactly
+
+    Returns:
+        The backend instance
+    """
+    if name == "chroma":
+        if quantization != "none":
+            raise ValueError("Quantized vectors require the numpy backend")
+        return ChromaBackend(path)
+    if name == "numpy":
+        return NumpyBackend(path, indexed_fields, quantization, rerank_factor)
+    raise ValueError(f"Unknown vector backend '{name}'")
+
+
+class NumpyCollection(VectorCollection):
+    """
+    Flat vector index searched with one matrix product per query batch.
+
+    Vectors live in a memory-mapped float32 file that grows by doubling.
+    IDs, documents and metadata are held in memory and persisted as an
+    append-only JSON lines log replayed on open. Deletes and re-embedded
+    records leave tombstoned rows that are dropped by compaction. Equality
+    filters on indexed fields are answered from boolean row masks kept
+    current on every write. Distances are squared L2, like Chroma's default.
+
+    With quantization, searches scan compact in-memory codes instead of the
+    float matrix: int8 codes with a per-row scale, or packed sign bits
+    compared by Hamming distance. The best rerank_factor * n_results
+    candidates are then rescored exactly from their float vectors, so only
+    those rows of the memory-mapped file are read.
+    """
+
+    INITIAL_CAPACITY = 1024
+    MIN_COMPACT_ROWS = 1024  # Never compact for fewer dead rows than this
+    SCAN_BLOCK_ROWS = 4096  # Codes widened to float32 at a time
+    QUANTIZATIONS = ("none", "int8", "binary")
+
+    def __init__(
+        self,
+        path: str,
+        embedding_function: Optional[Callable],
+        indexed_fields: Iterable[str] = (),
+        quantization: str = "none",
+        rerank_factor: int = 8,
+    ):
+        if quantization not in self.QUANTIZATIONS:
+            raise ValueError(f"Unknown quantization '{quantization}'")
+        self.path = path
+        self.embedding_function = embedding_function
+        self.indexed_fields = tuple(indexed_fields)
+        self.quantization = quantization
+        self.rerank_factor = max(1, rerank_factor)
+        self._lock = threading.RLock()
+        self._reset()
+        os.makedirs(path, exist_ok=True)
+        self._load()
+
+    def _reset(self):
+        self._generation = 0
+        self._dimension = 0
+        self._size = 0  # Rows in use, live or dead
+        self._vectors: Optional[np.memmap] = None
+        self._norms = np.zeros(0, dtype=np.float32)  # Squared row norms
+        self._codes: Optional[np.ndarray] = None  # Quantized rows
+        self._scales = np.zeros(0, dtype=np.float32)  # Per-row int8 scales
+        self._live = np.zeros(0, dtype=bool)
+        self._masks: Dict[Tuple[str, Any], np.ndarray] = {}
+        self._ids: List[Optional[str]] = []
+        self._documents: List[Optional[str]] = []
+        self._metadatas: List[Optional[Dict[str, Any]]] = []
+        self._rows: Dict[str, int] = {}
+
+    # Files
+
+    def _file(self, name: str, generation: Optional[int] = None) -> str:
+        generation = self._generation if generation is None else generation
+        return os.path.join(self.path, f"{name}-{generation}")
+
+    def _index_path(self) -> str:
+        return os.path.join(self.path, "index.json")
+
+    def _write_index(self):
+        # Written last and atomically, so a crash keeps the previous generation
+        temp_path = self._index_path() + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as file:
+            json.dump(
+                {"generation": self._generation, "dimension": self._dimension}, file
+            )
+        os.replace(temp_path, self._index_path())
+
+    def _load(self):
+        if not os.path.exists(self._index_path()):
+            return
+        with open(self._index_path(), encoding="utf-8") as file:
+            index = json.load(file)
+        self._generation = index["generation"]
+        self._dimension = index["dimension"]
+        if self._dimension:
+            self._open_vectors()
+
+        records_path = self._file("records")
+        if os.path.exists(records_path):
+            with open(records_path, encoding="utf-8") as file:
+                for line in file:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        break  # Torn final line from an interrupted write
+                    if record.get("deleted"):
+                        self._clear_row(record["row"])
+                    else:
+                        self._set_row(
+                            record["row"],
+                            record["id"],
+                            record["document"],
+                            record["metadata"],
+                        )
+
+    def _open_vectors(self, capacity: Optional[int] = None):
+        path = self._file("vectors")
+        row_bytes = self._dimension * 4
+        if capacity is None:
+            capacity = os.path.getsize(path) // row_bytes if os.path.exists(path) else 0
+        if capacity == 0:
+            return
+        if self._vectors is not None:
+            self._vectors.flush()
+            self._vectors = None
+        open(path, "ab").close()
+        if os.path.getsize(path) < capacity * row_bytes:
+            os.truncate(path, capacity * row_bytes)
+        self._vectors = np.memmap(
+            path, dtype=np.float32, mode="r+", shape=(capacity, self._dimension)
+        )
+
+        # Row-aligned arrays grow with the matrix
+        old_norms = self._norms
+        self._norms = np.zeros(capacity, dtype=np.float32)
+        self._norms[: len(old_norms)] = old_norms
+        self._norms[len(old_norms) :] = np.einsum(
+            "ij,ij->i", self._vectors[len(old_norms) :], self._vectors[len(old_norms) :]
+        )
+        self._live = self._grow(self._live, capacity)
+        self._masks = {
+            key: self._grow(mask, capacity) for key, mask in self._masks.items()
+        }
+        if self.quantization != "none":
+            self._grow_codes(capacity)
+
+    def _grow_codes(self, capacity: int):
+        filled = 0 if self._codes is None else len(self._codes)
+        width = self._dimension if self.quantization == "int8" else self._code_words()
+        dtype = np.int8 if self.quantization == "int8" else np.uint64
+        codes = np.zeros((capacity, width), dtype=dtype)
+        scales = np.zeros(capacity, dtype=np.float32)
+        if filled:
+            codes[:filled] = self._codes
+            scales[:filled] = self._scales
+        self._codes, self._scales = codes, scales
+
+        # Rows already in the file (when opening) are quantized block by block
+        for start in range(filled, capacity, self.SCAN_BLOCK_ROWS):
+            end = min(start + self.SCAN_BLOCK_ROWS, capacity)
+            self._quantize_rows(start, self._vectors[start:end])
+
+    def _code_words(self) -> int:
+        """64-bit words per packed sign-bit code"""
+        return -(-self._dimension // 64)
+
+    def _quantize_rows(self, start: int, vectors: np.ndarray):
+        end = start + len(vectors)
+        if self.quantization == "int8":
+            peaks = np.abs(vectors).max(axis=1)
+            scales = np.where(peaks > 0, peaks / 127.0, 1.0).astype(np.float32)
+            self._codes[start:end] = np.rint(vectors / scales[:, None])
+            self._scales[start:end] = scales
+        else:
+            self._codes[start:end] = self._pack_signs(vectors)
+
+    def _pack_signs(self, vectors: np.ndarray) -> np.ndarray:
+        bits = np.packbits(vectors > 0, axis=1)
+        padded = np.zeros((len(vectors), self._code_words() * 8), dtype=np.uint8)
+        padded[:, : bits.shape[1]] = bits
+        return padded.view(np.uint64)
+
+    @staticmethod
+    def _grow(mask: np.ndarray, capacity: int) -> np.ndarray:
+        grown = np.zeros(capacity, dtype=bool)
+        grown[: len(mask)] = mask[:capacity]
+        return grown
+
+    def _capacity(self) -> int:
+        return 0 if self._vectors is None else self._vectors.shape[0]
+
+    def _append_records(self, records: List[Dict[str, Any]]):
+        if not records:
+            return
+        with open(self._file("records"), "a", encoding="utf-8") as file:
+            file.writelines(json.dumps(record) + "\n" for record in records)
+
+    def drop(self):
+        """Delete the collection's files"""
+        with self._lock:
+            self._vectors = None
+            for name in os.listdir(self.path) if os.path.isdir(self.path) else []:
+                os.remove(os.path.join(self.path, name))
+            self._reset()
+
+    # Rows and masks
+
+    def _set_row(self, row: int, record_id: str, document: str, metadata: Dict):
+        if row < self._size and self._ids[row] is not None:
+            self._unindex(row)
+        while self._size <= row:
+            self._ids.append(None)
+            self._documents.append(None)
+            self._metadatas.append(None)
+            self._size += 1
+        self._ids[row] = record_id
+        self._documents[row] = document
+        self._metadatas[row] = metadata
+        self._rows[record_id] = row
+        self._live[row] = True
+        for field in self.indexed_fields:
+            value = metadata.get(field)
+            if value is not None:
+                mask = self._masks.get((field, value))
+                if mask is None:
+                    mask = self._masks[(field, value)] = np.zeros(
+                        self._capacity(), dtype=bool
+                    )
+                mask[row] = True
+
+    def _clear_row(self, row: int):
+        if row >= self._size or self._ids[row] is None:
+            return
+        self._unindex(row)
+        self._rows.pop(self._ids[row], None)
+        self._ids[row] = None
+        self._documents[row] = None
+        self._metadatas[row] = None
+        self._live[row] = False
+
+    def _unindex(self, row: int):
+        metadata = self._metadatas[row] or {}
+        for field in self.indexed_fields:
+            mask = self._masks.get((field, metadata.get(field)))
+            if mask is not None:
+                mask[row] = False
+
+    def _write(
+        self,
+        ids: List[str],
+        embeddings: Sequence,
+        metadatas: Optional[List[Dict]],
+        documents: Optional[List[str]],
+    ):
+        """Append records as new rows, tombstoning rows they replace"""
+        if not ids:
+            return
+        vectors = np.asarray(embeddings, dtype=np.float32).reshape(len(ids), -1)
+        if not self._dimension:
+            self._dimension = vectors.shape[1]
+            self._write_index()
+        elif vectors.shape[1] != self._dimension:
+            raise ValueError(
+                f"Embedding dimension {vectors.shape[1]} does not match "
+                f"collection dimension {self._dimension}"
+            )
+
+        start = self._size
+        capacity = max(self._capacity(), self.INITIAL_CAPACITY)
+        while capacity < start + len(ids):
+            capacity *= 2
+        if capacity != self._capacity():
+            self._open_vectors(capacity)
+
+        # Vectors reach disk before the log that makes their rows visible
+        self._vectors[start : start + len(ids)] = vectors
+        self._vectors.flush()
+        self._norms[start : start + len(ids)] = np.einsum("ij,ij->i", vectors, vectors)
+        if self.quantization != "none":
+            self._quantize_rows(start, vectors)
+
+        records = []
+        for offset, record_id in enumerate(ids):
+            old_row = self._rows.get(record_id)
+            if old_row is not None:
+                self._clear_row(old_row)
+                records.append({"row": old_row, "deleted": True})
+            row = start + offset
+            document = documents[offset] if documents else None
+            metadata = dict(metadatas[offset] or {}) if metadatas else {}
+            self._set_row(row, record_id, document, metadata)
+            records.append(
+                {
+                    "row": row,
+                    "id": record_id,
+                    "document": document,
+                    "metadata": metadata,
+                }
+            )
+        self._append_records(records)
+
+    def _embed_documents(self, documents: Optional[List[str]]) -> Sequence:
+        if documents is None:
+            raise ValueError("Either embeddings or documents are required")
+        return self.embedding_function(documents)
+
+    def _compact_if_needed(self):
+        dead = self._size - len(self._rows)
+        if dead >= self.MIN_COMPACT_ROWS and dead >= len(self._rows):
+            self._compact()
+
+    def _compact(self):
+        """Rewrite live rows into a new generation of files"""
+        rows = [row for row in range(self._size) if self._ids[row] is not None]
+        old_files = [self._file("vectors"), self._file("records")]
+        vectors = np.array(self._vectors[rows]) if rows else None
+        records = [
+            (self._ids[row], self._documents[row], self._metadatas[row]) for row in rows
+        ]
+
+        self._vectors = None
+        dimension = self._dimension
+        generation = self._generation + 1
+        self._reset()
+        self._generation, self._dimension = generation, dimension
+        # Leftovers from a compaction that was interrupted before switching over
+        for name in ("vectors", "records"):
+            if os.path.exists(self._file(name)):
+                os.remove(self._file(name))
+        if records:
+            ids, documents, metadatas = (list(column) for column in zip(*records))
+            self._write(ids, vectors, metadatas, documents)
+        else:
+            open(self._file("records"), "a").close()
+        self._write_index()
+
+        for path in old_files:
+            if os.path.exists(path):
+                os.remove(path)
+
+    # Filters
+
+    def _where_mask(self, where: Optional[Dict]) -> np.ndarray:
+        live = self._live[: self._size]
+        if not where:
+            return live.copy()
+        return self._evaluate(where) & live
+
+    def _evaluate(self, where: Dict) -> np.ndarray:
+        result = np.ones(self._size, dtype=bool)
+        for key, condition in where.items():
+            if key == "$and":
+                for clause in condition:
+                    result &= self._evaluate(clause)
+            elif key == "$or":
+                matched = np.zeros(self._size, dtype=bool)
+                for clause in condition:
+                    matched |= self._evaluate(clause)
+                result &= matched
+            elif isinstance(condition, dict):
+                for operator, value in condition.items():
+                    result &= self._evaluate_operator(key, operator, value)
+            else:
+                result &= self._equals(key, condition)
+        return result
+
+    def _evaluate_operator(self, field: str, operator: str, value: Any) -> np.ndarray:
+        if operator == "$eq":
+            return self._equals(field, value)
+        if operator == "$ne":
+            return ~self._equals(field, value)
+        if operator == "$in":
+            matched = np.zeros(self._size, dtype=bool)
+            for item in value:
+                matched |= self._equals(field, item)
+            return matched
+        if operator == "$nin":
+            matched = np.ones(self._size, dtype=bool)
+            for item in value:
+                matched &= ~self._equals(field, item)
+            return matched
+        raise ValueError(f"Unsupported filter operator '{operator}'")
+
+    def _equals(self, field: str, value: Any) -> np.ndarray:
+        if field in self.indexed_fields:
+            mask = self._masks.get((field, value))
+            if mask is None:
+                return np.zeros(self._size, dtype=bool)
+            return mask[: self._size].copy()
+        # Fields without masks are compared row by row
+        return np.fromiter(
+            (
+                metadata is not None and metadata.get(field) == value
+                for metadata in self._metadatas
+            ),
+            dtype=bool,
+            count=self._size,
+        )
+
+    # Collection API
+
+    def add(self, ids, embeddings=None, metadatas=None, documents=None):
+        with self._lock:
+            keep = [i for i, record_id in enumerate(ids) if record_id not in self._rows]
+            if not keep:
+                return
+            ids = [ids[i] for i in keep]
+            metadatas = [metadatas[i] for i in keep] if metadatas else None
+            documents = [documents[i] for i in keep] if documents else None
+            embeddings = (
+                [embeddings[i] for i in keep]
+                if embeddings is not None
+                else self._embed_documents(documents)
+            )
+            self._write(ids, embeddings, metadatas, documents)
+
+    def upsert(self, ids, embeddings=None, metadatas=None, documents=None):
+        if embeddings is None:
+            embeddings = self._embed_documents(documents)
+        with self._lock:
+            self._write(list(ids), embeddings, metadatas, documents)
+            self._compact_if_needed()
+
+    def update(self, ids, embeddings=None, metadatas=None, documents=None):
+        with self._lock:
+            known = [i for i, record_id in enumerate(ids) if record_id in self._rows]
+            if not known:
+                return
+
+            # Merge metadata like Chroma: given keys replace, others are kept
+            merged_metadatas, merged_documents = [], []
+            for i in known:
+                row = self._rows[ids[i]]
+                metadata = dict(self._metadatas[row])
+                if metadatas:
+                    metadata.update(metadatas[i] or {})
+                merged_metadatas.append(metadata)
+                merged_documents.append(
+                    documents[i] if documents else self._documents[row]
+                )
+
+            if embeddings is None and documents is None:
+                # Metadata only: rewrite the rows in place, vectors unchanged
+                records = []
+                for i, metadata, document in zip(
+                    known, merged_metadatas, merged_documents
+                ):
+                    row = self._rows[ids[i]]
+                    self._set_row(row, ids[i], document, metadata)
+                    records.append(
+                        {
+                            "row": row,
+                            "id": ids[i],
+                            "document": document,
+                            "metadata": metadata,
+                        }
+                    )
+                self._append_records(records)
+                return
+
+            if embeddings is None:
+                vectors = self._embed_documents(merged_documents)
+            else:
+                vectors = [embeddings[i] for i in known]
+            self._write(
+                [ids[i] for i in known], vectors, merged_metadatas, merged_documents
+            )
+            self._compact_if_needed()
+
+    def delete(self, ids=None, where=None):
+        with self._lock:
+            mask = self._where_mask(where)
+            if ids is not None:
+                selected = np.zeros(self._size, dtype=bool)
+                for record_id in ids:
+                    row = self._rows.get(record_id)
+                    if row is not None:
+                        selected[row] = True
+                mask &= selected
+            rows = np.flatnonzero(mask).tolist()
+            for row in rows:
+                self._clear_row(row)
+            self._append_records([{"row": row, "deleted": True} for row in rows])
+            self._compact_if_needed()
+
+    def get(self, ids=None, where=None, include=None, limit=None, offset=None):
+        include = include if include is not None else ["metadatas", "documents"]
+        with self._lock:
+            if ids is not None:
+                mask = self._where_mask(where)
+                rows = [
+                    self._rows[record_id]
+                    for record_id in ids
+                    if record_id in self._rows and mask[self._rows[record_id]]
+                ]
+            else:
+                rows = np.flatnonzero(self._where_mask(where)).tolist()
+            rows = rows[offset or 0 :][:limit]
+            return {
+                "ids": [self._ids[row] for row in rows],
+                "documents": (
+                    [self._documents[row] for row in rows]
+                    if "documents" in include
+                    else None
+                ),
+                "metadatas": (
+                    [dict(self._metadatas[row]) for row in rows]
+                    if "metadatas" in include
+                    else None
+                ),
+            }
+
+    def query(self, query_embeddings=None, query_texts=None, n_results=10, where=None):
+        if query_embeddings is None:
+            query_embeddings = self._embed_documents(query_texts)
+        queries = np.asarray(query_embeddings, dtype=np.float32)
+        queries = queries.reshape(len(queries), -1)
+        results = {"ids": [], "documents": [], "metadatas": [], "distances": []}
+
+        with self._lock:
+            if self._vectors is not None and queries.shape[1] != self._dimension:
+                raise ValueError(
+                    f"Query dimension {queries.shape[1]} does not match "
+                    f"collection dimension {self._dimension}"
+                )
+            mask = self._where_mask(where)
+            k = min(n_results, int(mask.sum()))
+            if k <= 0:
+                for _ in range(len(queries)):
+                    for column in results.values():
+                        column.append([])
+                return results
+
+            if self.quantization == "none":
+                matches = self._exact_top_k(queries, mask, bool(where), k)
+            else:
+                matches = self._quantized_top_k(queries, mask, k)
+
+            for matched, distances in matches:
+                results["ids"].append([self._ids[row] for row in matched])
+                results["documents"].append([self._documents[row] for row in matched])
+                results["metadatas"].append(
+                    [dict(self._metadatas[row]) for row in matched]
+                )
+                results["distances"].append([float(value) for value in distances])
+        return results
+
+    def _exact_top_k(
+        self, queries: np.ndarray, mask: np.ndarray, filtered: bool, k: int
+    ) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """Closest rows and distances for each query, scored from the float matrix"""
+        if filtered:
+            # Filtered searches only score the matching rows
+            rows = np.flatnonzero(mask)
+            vectors, norms = self._vectors[rows], self._norms[rows]
+        else:
+            rows = np.arange(self._size)
+            vectors, norms = self._vectors[: self._size], self._norms[: self._size]
+
+        distances = (
+            np.einsum("ij,ij->i", queries, queries)[:, None]
+            + norms[None, :]
+            - 2.0 * (queries @ vectors.T)
+        )
+        np.maximum(distances, 0.0, out=distances)
+        if not filtered:
+            distances[:, ~mask] = np.inf
+
+        matches = []
+        top = np.argpartition(distances, k - 1, axis=1)[:, :k]
+        for query_distances, candidates in zip(distances, top):
+            ordered = candidates[np.argsort(query_distances[candidates])]
+            matches.append((rows[ordered], query_distances[ordered]))
+        return matches
+
+    def _quantized_top_k(
+        self, queries: np.ndarray, mask: np.ndarray, k: int
+    ) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """Shortlist rows from the codes, then rerank them with exact distances"""
+        rows = np.flatnonzero(mask)
+        shortlist = min(len(rows), k * self.rerank_factor)
+        approximate = self._approximate_distances(queries, rows)
+        top = np.argpartition(approximate, shortlist - 1, axis=1)[:, :shortlist]
+
+        matches = []
+        for query, candidates in zip(queries, top):
+            # Sorted rows keep the reads from the memory-mapped file in order
+            candidate_rows = np.sort(rows[candidates])
+            distances = (
+                float(query @ query)
+                + self._norms[candidate_rows]
+                - 2.0 * (self._vectors[candidate_rows] @ query)
+            )
+            np.maximum(distances, 0.0, out=distances)
+            best = np.argsort(distances, kind="stable")[:k]
+            matches.append((candidate_rows[best], distances[best]))
+        return matches
+
+    def _approximate_distances(
+        self, queries: np.ndarray, rows: np.ndarray
+    ) -> np.ndarray:
+        """Distances estimated from the codes; only their order matters"""
+        distances = np.empty((len(queries), len(rows)), dtype=np.float32)
+        query_codes = (
+            self._pack_signs(queries) if self.quantization == "binary" else None
+        )
+        query_norms = np.einsum("ij,ij->i", queries, queries)[:, None]
+
+        for start in range(0, len(rows), self.SCAN_BLOCK_ROWS):
+            block_rows = rows[start : start + self.SCAN_BLOCK_ROWS]
+            end = start + len(block_rows)
+            first, last = block_rows[0], block_rows[-1]
+            # Unfiltered scans read contiguous blocks without copying them
+            selector = (
+                slice(first, last + 1)
+                if last - first + 1 == len(block_rows)
+                else block_rows
+            )
+            codes = self._codes[selector]
+
+            if query_codes is not None:
+                for i, code in enumerate(query_codes):
+                    distances[i, start:end] = np.bitwise_count(codes ^ code).sum(axis=1)
+            else:
+                products = (queries @ codes.astype(np.float32).T) * self._scales[
+                    selector
+                ]
+                distances[:, start:end] = (
+                    query_norms + self._norms[selector] - 2.0 * products
+                )
+        return distances
+
+    def search_memory_bytes(self) -> int:
+        """Bytes a full scan reads: the float matrix, or the codes when quantized"""
+        if self.quantization == "none":
+            row_bytes = self._dimension * 4
+        else:
+            row_bytes = self._codes.shape[1] * self._codes.itemsize if self._size else 0
+            if self.quantization == "int8":
+                row_bytes += 4  # Scale
+        return self._size * (row_bytes + 4)  # Plus the squared norm
+
+    def count(self) -> int:
+        return len(self._rows)
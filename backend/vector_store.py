@@ -1,10 +1,16 @@
+import hashlib
+import json
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple, Union
 
 import chromadb
-from chromadb.config import Settings
+from caching import LRUCache, QueryEmbeddingCache, SingleFlight
+from course_resolver import CourseNameResolver
 from models import Course, CourseChunk
 from sentence_transformers import SentenceTransformer
+from vector_backends import create_backend
 
 
 @dataclass
@@ -17,18 +23,25 @@ class SearchResults:
     error: Optional[str] = None
 
     @classmethod
-    def from_chroma(cls, chroma_results: Dict) -> "SearchResults":
-        """Create SearchResults from ChromaDB query results"""
+    def from_chroma(
+        cls, chroma_results: Dict, index: int = 0, limit: Optional[int] = None
+    ) -> "SearchResults":
+        """
+        Create SearchResults from ChromaDB query results.
+
+        Args:
+            chroma_results: Raw result of a collection query
+            index: Which of the query's embeddings to take results for
+            limit: Keep at most this many of the closest results
+        """
+
+        def column(name: str) -> List:
+            return chroma_results[name][index][:limit] if chroma_results[name] else []
+
         return cls(
-            documents=(
-                chroma_results["documents"][0] if chroma_results["documents"] else []
-            ),
-            metadata=(
-                chroma_results["metadatas"][0] if chroma_results["metadatas"] else []
-            ),
-            distances=(
-                chroma_results["distances"][0] if chroma_results["distances"] else []
-            ),
+            documents=column("documents"),
+            metadata=column("metadatas"),
+            distances=column("distances"),
         )
 
     @classmethod
@@ -41,16 +54,59 @@ class SearchResults:
         return len(self.documents) == 0
 
 
+class SearchRequest(NamedTuple):
+    """One search in a VectorStore.search_many batch"""
+
+    query: str
+    course_name: Optional[str] = None
+    lesson_number: Optional[int] = None
+    limit: Optional[int] = None
+
+
 class VectorStore:
-    """Vector storage using ChromaDB for course content and metadata"""
+    """Vector storage for course content and metadata on a pluggable backend"""
+
+    # Metadata fields that content searches filter on
+    FILTER_FIELDS = ("course_title", "lesson_number")
 
-    def __init__(self, chroma_path: str, embedding_model: str, max_results: int = 5):
+    def __init__(
+        self,
+        chroma_path: str,
+        embedding_model: str,
+        max_results: int = 5,
+        write_batch_size: int = 256,
+        pipeline_embeddings: bool = True,
+        query_cache_size: int = 1024,
+        query_cache_path: Optional[str] = None,
+        result_cache_size: int = 1024,
+        backend: str = "chroma",
+        quantization: str = "none",
+        rerank_factor: int = 8,
+        shard_by_course: bool = False,
+        shard_search_workers: int = 4,
+    ):
         self.max_results = max_results
-        # Initialize ChromaDB client
-        self.client = chromadb.PersistentClient(
-            path=chroma_path, settings=Settings(anonymized_telemetry=False)
+        self.pipeline_embeddings = pipeline_embeddings
+        # Initialize the vector backend ("chroma" or "numpy") at chroma_path
+        self.backend_name = backend
+        self.client = create_backend(
+            backend,
+            chroma_path,
+            indexed_fields=self.FILTER_FIELDS,
+            quantization=quantization,
+            rerank_factor=rerank_factor,
         )
 
+        # Never send more records per call than the backend accepts
+        self.write_batch_size = max(1, write_batch_size)
+        try:
+            self.write_batch_size = min(
+                self.write_batch_size, self.client.get_max_batch_size()
+            )
+        except Exception:
+            pass
+        self._embedding_executor: Optional[ThreadPoolExecutor] = None
+
         # Set up sentence transformer embedding function
         self.embedding_function = (
             chromadb.utils.embedding_functions.SentenceTransformerEmbeddingFunction(
@@ -58,6 +114,18 @@ class VectorStore:
             )
         )
 
+        # Repeated queries and course names skip the embedding model
+        self.query_embedding_cache = QueryEmbeddingCache(
+            embedding_model, max_entries=query_cache_size, disk_path=query_cache_path
+        )
+
+        # Search results and outlines, keyed by the index generation they were
+        # read at; every write bumps the generation so stale entries never match
+        self.result_cache = LRUCache(result_cache_size)
+        self.search_flights = SingleFlight()
+        self._generation = 0
+        self._generation_lock = threading.Lock()
+
         # Create collections for different types of data
         self.course_catalog = self._create_collection(
             "course_catalog"
@@ -66,12 +134,65 @@ class VectorStore:
             "course_content"
         )  # Actual course material
 
+        # With sharding, each course's chunks live in their own collection,
+        # opened on first use; course_content is then left empty
+        self.shard_by_course = shard_by_course
+        self.shard_search_workers = max(1, shard_search_workers)
+        self._shards: Dict[str, Any] = {}
+        self._shards_lock = threading.Lock()
+        self._shard_executor: Optional[ThreadPoolExecutor] = None
+
+        # Catalog metadata read once and reused until the next catalog write
+        self._catalog_lock = threading.Lock()
+        self._catalog_version = 0
+        self._catalog_view: Optional[Dict[str, Dict[str, Any]]] = None
+
+        # Resolves most course names without a vector query; kept in sync on ingest
+        self.course_resolver = CourseNameResolver(self.get_existing_course_titles())
+
     def _create_collection(self, name: str):
         """Create or get a ChromaDB collection"""
         return self.client.get_or_create_collection(
             name=name, embedding_function=self.embedding_function
         )
 
+    @staticmethod
+    def shard_name(course_title: str) -> str:
+        """Collection name of a course's content shard"""
+        digest = hashlib.sha1(course_title.encode("utf-8")).hexdigest()[:16]
+        return f"course_content_{digest}"
+
+    def _content_collection(self, course_title: str):
+        """Collection holding a course's chunks: its shard, or course_content"""
+        if not self.shard_by_course:
+            return self.course_content
+
+        shard = self._shards.get(course_title)
+        if shard is None:
+            with self._shards_lock:
+                shard = self._shards.get(course_title)
+                if shard is None:
+                    shard = self._create_collection(self.shard_name(course_title))
+                    self._shards[course_title] = shard
+        return shard
+
+    def _drop_shard(self, course_title: str):
+        """Delete a course's content shard"""
+        with self._shards_lock:
+            self._shards.pop(course_title, None)
+        try:
+            self.client.delete_collection(self.shard_name(course_title))
+        except Exception:
+            pass  # The course never had content
+
+    def _get_shard_executor(self) -> ThreadPoolExecutor:
+        """Thread pool that queries course shards in parallel"""
+        if self._shard_executor is None:
+            self._shard_executor = ThreadPoolExecutor(
+                max_workers=self.shard_search_workers, thread_name_prefix="shard"
+            )
+        return self._shard_executor
+
     def search(
         self,
         query: str,
@@ -91,40 +212,279 @@ class VectorStore:
         Returns:
             SearchResults object with documents and metadata
         """
-        # Step 1: Resolve course name if provided
-        course_title = None
-        if course_name:
-            course_title = self._resolve_course_name(course_name)
-            if not course_title:
-                return SearchResults.empty(f"No course found matching '{course_name}'")
+        request = SearchRequest(query, course_name, lesson_number, limit)
+        # An identical search already in flight is waited for, not repeated
+        key = (
+            self._generation,
+            QueryEmbeddingCache.normalize(query),
+            course_name,
+            lesson_number,
+            self._search_limit(request),
+        )
+        return self.search_flights.do(key, lambda: self.search_many([request])[0])
 
-        # Step 2: Build filter for content search
-        filter_dict = self._build_filter(course_title, lesson_number)
+    def search_many(
+        self, requests: Iterable[Union[SearchRequest, Tuple]]
+    ) -> List[SearchResults]:
+        """
+        Run several searches with one embedding pass and as few queries as possible.
+
+        Course names are resolved together, all queries and any course names
+        that need a catalog lookup are embedded in a single model batch, and
+        requests that share a filter are answered by one content query.
 
-        # Step 3: Search course content
-        # Use provided limit or fall back to configured max_results
-        search_limit = limit if limit is not None else self.max_results
+        Args:
+            requests: SearchRequest values or (query, course_name,
+                lesson_number, limit) tuples; trailing fields may be omitted
 
+        Returns:
+            One SearchResults per request, in input order
+        """
+        requests = [SearchRequest(*request) for request in requests]
+        if not requests:
+            return []
+        results: List[Optional[SearchResults]] = [None] * len(requests)
+        generation = self._generation
+
+        # Step 1: Resolve each distinct course name, in memory where possible
+        course_titles = {
+            request.course_name: self.course_resolver.resolve(request.course_name)
+            for request in requests
+            if request.course_name
+        }
+        unresolved = [name for name, title in course_titles.items() if not title]
+
+        # Step 2: Answer repeated searches from the result cache
+        pending = []
+        for i, request in enumerate(requests):
+            course_title = course_titles.get(request.course_name)
+            if not request.course_name or course_title:
+                results[i] = self.result_cache.get(
+                    self._search_key(request, course_title, generation)
+                )
+            if results[i] is None:
+                pending.append(i)
+        if not pending:
+            return results
+
+        # Step 3: Embed the remaining queries and unresolved names in one batch
         try:
-            results = self.course_content.query(
-                query_texts=[query], n_results=search_limit, where=filter_dict
+            vectors = self._embed_queries(
+                [requests[i].query for i in pending] + unresolved
+            )
+            embeddings = dict(zip(pending, vectors))
+            course_titles.update(
+                self._query_course_titles(unresolved, vectors[len(pending) :])
             )
-            return SearchResults.from_chroma(results)
         except Exception as e:
-            return SearchResults.empty(f"Search error: {str(e)}")
+            for i in pending:
+                results[i] = SearchResults.empty(f"Search error: {str(e)}")
+            return results
+
+        # Step 4: Group requests that search with the same filter
+        groups: Dict[str, Tuple[Optional[str], Optional[int], List[int]]] = {}
+        for i in pending:
+            request = requests[i]
+            course_title = None
+            if request.course_name:
+                course_title = course_titles.get(request.course_name)
+                if not course_title:
+                    results[i] = SearchResults.empty(
+                        f"No course found matching '{request.course_name}'"
+                    )
+                    continue
+                if request.course_name in unresolved:
+                    results[i] = self.result_cache.get(
+                        self._search_key(request, course_title, generation)
+                    )
+                    if results[i] is not None:
+                        continue
+
+            key = json.dumps([course_title, request.lesson_number])
+            groups.setdefault(key, (course_title, request.lesson_number, []))[2].append(
+                i
+            )
+
+        # Step 5: One content query per group, split back per request
+        for course_title, lesson_number, indices in groups.values():
+            limits = [self._search_limit(requests[i]) for i in indices]
+            try:
+                response = self._query_content(
+                    [embeddings[i] for i in indices],
+                    max(limits),
+                    course_title,
+                    lesson_number,
+                )
+            except Exception as e:
+                for i in indices:
+                    results[i] = SearchResults.empty(f"Search error: {str(e)}")
+                continue
+
+            for row, (i, limit) in enumerate(zip(indices, limits)):
+                results[i] = SearchResults.from_chroma(response, row, limit)
+                course_title = course_titles.get(requests[i].course_name)
+                self.result_cache.put(
+                    self._search_key(requests[i], course_title, generation), results[i]
+                )
+
+        return results
+
+    def _query_content(
+        self,
+        embeddings: List[Any],
+        n_results: int,
+        course_title: Optional[str],
+        lesson_number: Optional[int],
+    ) -> Dict:
+        """
+        Query course content, in one shard or across all of them.
+
+        Without sharding this is a single filtered query. With sharding a
+        course-filtered search reads only that course's shard, and other
+        searches query every shard in parallel and merge the top results.
+        """
+        if not self.shard_by_course:
+            return self.course_content.query(
+                query_embeddings=embeddings,
+                n_results=n_results,
+                where=self._build_filter(course_title, lesson_number),
+            )
+
+        # A shard holds one course, so only the lesson needs filtering
+        where = self._build_filter(None, lesson_number)
+        if course_title:
+            return self._content_collection(course_title).query(
+                query_embeddings=embeddings, n_results=n_results, where=where
+            )
+
+        # Catalog titles find shards written before a restart
+        with self._shards_lock:
+            known = list(self._shards)
+        titles = dict.fromkeys(self.get_existing_course_titles())
+        titles.update(dict.fromkeys(known))
+        shards = [self._content_collection(title) for title in titles]
+        responses = list(
+            self._get_shard_executor().map(
+                lambda shard: shard.query(
+                    query_embeddings=embeddings, n_results=n_results, where=where
+                ),
+                shards,
+            )
+        )
+        return self._merge_shard_results(responses, len(embeddings), n_results)
+
+    @staticmethod
+    def _merge_shard_results(
+        responses: List[Dict], query_count: int, n_results: int
+    ) -> Dict:
+        """Merge per-shard query results into one result with the closest n"""
+        merged: Dict[str, List[List[Any]]] = {
+            "ids": [],
+            "documents": [],
+            "metadatas": [],
+            "distances": [],
+        }
+        for row in range(query_count):
+            hits = sorted(
+                (
+                    hit
+                    for response in responses
+                    for hit in zip(
+                        response["distances"][row],
+                        response["ids"][row],
+                        response["documents"][row],
+                        response["metadatas"][row],
+                    )
+                ),
+                key=lambda hit: hit[0],
+            )[:n_results]
+            merged["distances"].append([hit[0] for hit in hits])
+            merged["ids"].append([hit[1] for hit in hits])
+            merged["documents"].append([hit[2] for hit in hits])
+            merged["metadatas"].append([hit[3] for hit in hits])
+        return merged
+
+    def _search_limit(self, request: SearchRequest) -> int:
+        """Use provided limit or fall back to configured max_results"""
+        return request.limit if request.limit is not None else self.max_results
+
+    def _search_key(
+        self, request: SearchRequest, course_title: Optional[str], generation: int
+    ) -> Tuple:
+        """Result cache key; searches for the same resolved course share entries"""
+        return (
+            "search",
+            generation,
+            QueryEmbeddingCache.normalize(request.query),
+            course_title,
+            request.lesson_number,
+            self._search_limit(request),
+        )
+
+    def _bump_generation(self):
+        """Invalidate cached search results and outlines after an index write"""
+        with self._generation_lock:
+            self._generation += 1
+        self.result_cache.clear()
+
+    def _embed_queries(self, texts: List[str]) -> List[Any]:
+        """Embed query texts through the query embedding cache"""
+        return self.query_embedding_cache.embed(texts, self.embedding_function)
+
+    def embed_query(self, query: str) -> Any:
+        """Embedding of a query text, from the query embedding cache if possible"""
+        return self._embed_queries([query])[0]
+
+    @property
+    def generation(self) -> int:
+        """Counter bumped by every index write; answers are valid for one value"""
+        return self._generation
+
+    def get_cache_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Hit/miss counters for the store's caches"""
+        return {
+            "query_embeddings": self.query_embedding_cache.stats(),
+            "search_results": self.result_cache.stats(),
+            "search_flights": self.search_flights.stats(),
+        }
 
     def _resolve_course_name(self, course_name: str) -> Optional[str]:
-        """Use vector search to find best matching course by name"""
-        try:
-            results = self.course_catalog.query(query_texts=[course_name], n_results=1)
+        """
+        Find the best matching course title for a name.
+
+        Exact, partial and misspelled names are resolved in memory; names that
+        are ambiguous or unknown there fall back to vector search on the catalog.
+        """
+        course_title = self.course_resolver.resolve(course_name)
+        if course_title:
+            return course_title
+
+        return self._query_course_titles(
+            [course_name], self._embed_queries([course_name])
+        ).get(course_name)
 
-            if results["documents"][0] and results["metadatas"][0]:
-                # Return the title (which is now the ID)
-                return results["metadatas"][0][0]["title"]
+    def _query_course_titles(
+        self, course_names: List[str], embeddings: List[Any]
+    ) -> Dict[str, Optional[str]]:
+        """Find the closest catalog title for each name with one vector query"""
+        if not course_names:
+            return {}
+
+        try:
+            results = self.course_catalog.query(
+                query_embeddings=list(embeddings), n_results=1
+            )
         except Exception as e:
             print(f"Error resolving course name: {e}")
+            return {}
 
-        return None
+        # Return the title (which is now the ID)
+        return {
+            name: metadatas[0]["title"] if documents and metadatas else None
+            for name, documents, metadatas in zip(
+                course_names, results["documents"], results["metadatas"]
+            )
+        }
 
     def _build_filter(
         self, course_title: Optional[str], lesson_number: Optional[int]
@@ -148,9 +508,7 @@ class VectorStore:
         return {"lesson_number": lesson_number}
 
     def add_course_metadata(self, course: Course):
-        """Add course information to the catalog for semantic search"""
-        import json
-
+        """Add or replace course information in the catalog for semantic search"""
         course_text = course.title
 
         # Build lessons metadata and serialize as JSON string
@@ -164,7 +522,7 @@ class VectorStore:
                 }
             )
 
-        self.course_catalog.add(
+        self.course_catalog.upsert(
             documents=[course_text],
             metadatas=[
                 {
@@ -179,118 +537,313 @@ class VectorStore:
             ],
             ids=[course.title],
         )
+        self._invalidate_catalog_view()
+        self.course_resolver.add_title(course.title)
+        self._bump_generation()
+
+    @staticmethod
+    def chunk_content_keys(
+        contents: List[str],
+        lesson_numbers: List[Optional[int]],
+        seen: Optional[Dict[str, int]] = None,
+    ) -> List[str]:
+        """
+        Compute stable content keys for a course's chunks.
+
+        Each key hashes the lesson number and chunk text; repeated identical
+        chunks get an occurrence suffix so every key within a course is unique.
+        Pass the same `seen` dict when keying a course in several batches.
+        """
+        keys = []
+        if seen is None:
+            seen = {}
+        for content, lesson_number in zip(contents, lesson_numbers):
+            digest = hashlib.sha256(
+                f"{lesson_number}\x00{content}".encode("utf-8")
+            ).hexdigest()[:32]
+            occurrence = seen.get(digest, 0)
+            seen[digest] = occurrence + 1
+            keys.append(f"{digest}-{occurrence}" if occurrence else digest)
+        return keys
+
+    def add_course_content(self, chunks: List[CourseChunk]) -> List[str]:
+        """
+        Upsert course content chunks, returning their IDs in chunk order.
 
-    def add_course_content(self, chunks: List[CourseChunk]):
-        """Add course content chunks to the vector store"""
+        Chunks are matched against the ones already stored for the same course
+        by content hash: only new or changed chunks are embedded, chunks that
+        disappeared are deleted, and moved chunks only get their metadata updated.
+        """
         if not chunks:
-            return
+            return []
 
-        documents = [chunk.content for chunk in chunks]
-        metadatas = [
-            {
-                "course_title": chunk.course_title,
-                "lesson_number": chunk.lesson_number,
-                "chunk_index": chunk.chunk_index,
-            }
-            for chunk in chunks
+        chunks_by_course: Dict[str, List[CourseChunk]] = {}
+        for chunk in chunks:
+            chunks_by_course.setdefault(chunk.course_title, []).append(chunk)
+
+        ids_by_chunk: Dict[int, str] = {}
+        for course_title, course_chunks in chunks_by_course.items():
+            course_ids = self.upsert_course_content(course_title, [course_chunks])
+            for chunk, chunk_id in zip(course_chunks, course_ids):
+                ids_by_chunk[id(chunk)] = chunk_id
+
+        return [ids_by_chunk[id(chunk)] for chunk in chunks]
+
+    def _get_stored_chunks(self, course_title: str) -> Dict[str, Dict[str, Any]]:
+        """Map content key to stored ID and metadata for a course's chunks"""
+        collection = self._content_collection(course_title)
+        results = collection.get(
+            where={"course_title": course_title}, include=["metadatas"]
+        )
+        if not results or not results.get("ids"):
+            return {}
+
+        rows = sorted(
+            zip(results["ids"], results["metadatas"]),
+            key=lambda row: row[1].get("chunk_index", 0),
+        )
+
+        # Chunks written before content hashing get their key from the stored text
+        legacy_ids = [
+            chunk_id for chunk_id, metadata in rows if not metadata.get("content_hash")
         ]
-        # Use title with chunk index for unique IDs
-        ids = [
-            f"{chunk.course_title.replace(' ', '_')}_{chunk.chunk_index}"
-            for chunk in chunks
+        legacy_keys: Dict[str, str] = {}
+        if legacy_ids:
+            legacy = collection.get(ids=legacy_ids, include=["documents"])
+            documents = dict(zip(legacy["ids"], legacy["documents"]))
+            legacy_rows = [row for row in rows if row[0] in documents]
+            keys = self.chunk_content_keys(
+                [documents[chunk_id] for chunk_id, _ in legacy_rows],
+                [metadata.get("lesson_number") for _, metadata in legacy_rows],
+            )
+            legacy_keys = {row[0]: key for row, key in zip(legacy_rows, keys)}
+
+        stored = {}
+        for chunk_id, metadata in rows:
+            key = metadata.get("content_hash") or legacy_keys.get(chunk_id)
+            if key:
+                stored[key] = {"id": chunk_id, "metadata": metadata}
+        return stored
+
+    def upsert_course_content(
+        self, course_title: str, chunk_batches: Iterable[List[CourseChunk]]
+    ) -> List[str]:
+        """
+        Stream one course's chunks into the store, batch by batch.
+
+        Each batch is diffed against the chunks already stored for the course
+        and written before the next batch is consumed, so only one batch of
+        chunks is held in memory. Stored chunks that did not appear in any
+        batch are deleted at the end.
+
+        Args:
+            course_title: Course all chunks belong to
+            chunk_batches: Iterable of chunk lists, in chunk order
+
+        Returns:
+            IDs of the course's chunks in chunk order
+        """
+        try:
+            return self._write_course_content(course_title, chunk_batches)
+        finally:
+            # Even a failed write may have changed what searches return
+            self._bump_generation()
+
+    def _write_course_content(
+        self, course_title: str, chunk_batches: Iterable[List[CourseChunk]]
+    ) -> List[str]:
+        stored = self._get_stored_chunks(course_title)
+        id_prefix = course_title.replace(" ", "_")
+        seen: Dict[str, int] = {}
+        kept_keys = set()
+        ids: List[str] = []
+        embedded = 0
+        collection = self._content_collection(course_title)
+        writer = _ContentWriter(self, collection)
+
+        try:
+            for chunks in chunk_batches:
+                keys = self.chunk_content_keys(
+                    [chunk.content for chunk in chunks],
+                    [chunk.lesson_number for chunk in chunks],
+                    seen,
+                )
+                add_documents, add_metadatas, add_ids = [], [], []
+                update_metadatas, update_ids = [], []
+                for chunk, key in zip(chunks, keys):
+                    metadata = {
+                        "course_title": chunk.course_title,
+                        "lesson_number": chunk.lesson_number,
+                        "chunk_index": chunk.chunk_index,
+                        "content_hash": key,
+                    }
+                    existing = stored.get(key)
+                    if existing is None:
+                        chunk_id = f"{id_prefix}_{key}"
+                        add_documents.append(chunk.content)
+                        add_metadatas.append(metadata)
+                        add_ids.append(chunk_id)
+                    else:
+                        chunk_id = existing["id"]
+                        if existing["metadata"] != metadata:
+                            update_metadatas.append(metadata)
+                            update_ids.append(chunk_id)
+                    ids.append(chunk_id)
+                kept_keys.update(keys)
+
+                for start in range(0, len(update_ids), self.write_batch_size):
+                    end = start + self.write_batch_size
+                    collection.update(
+                        ids=update_ids[start:end], metadatas=update_metadatas[start:end]
+                    )
+                writer.add(add_documents, add_metadatas, add_ids)
+                embedded += len(add_ids)
+            writer.close()
+        except BaseException:
+            writer.abort()
+            raise
+
+        delete_ids = [
+            entry["id"] for key, entry in stored.items() if key not in kept_keys
         ]
+        for start in range(0, len(delete_ids), self.write_batch_size):
+            collection.delete(ids=delete_ids[start : start + self.write_batch_size])
 
-        self.course_content.add(documents=documents, metadatas=metadatas, ids=ids)
+        if stored:
+            print(
+                f"Updated content for {course_title}: {embedded} embedded, "
+                f"{len(delete_ids)} removed, {len(ids) - embedded} unchanged"
+            )
+        return ids
 
-    def clear_all_data(self):
-        """Clear all data from both collections"""
+    def _embed(self, documents: List[str]) -> List[Any]:
+        """Compute embeddings for documents with the collection's function"""
+        return self.embedding_function(documents)
+
+    def _get_embedding_executor(self) -> ThreadPoolExecutor:
+        """Single background thread used to embed the next write batch"""
+        if self._embedding_executor is None:
+            self._embedding_executor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="embed"
+            )
+        return self._embedding_executor
+
+    def delete_course(self, course_title: str):
+        """Remove a course and all of its content chunks"""
         try:
+            if self.shard_by_course:
+                self._drop_shard(course_title)
+            else:
+                self.course_content.delete(where={"course_title": course_title})
+            self.course_catalog.delete(ids=[course_title])
+            self._invalidate_catalog_view()
+            self.course_resolver.remove_title(course_title)
+        except Exception as e:
+            print(f"Error deleting course {course_title}: {e}")
+        self._bump_generation()
+
+    def clear_all_data(self, drop_shards: Optional[bool] = None):
+        """
+        Clear all data from the catalog and content collections.
+
+        Args:
+            drop_shards: Also delete per-course shards; defaults to whether
+                sharding is on. Pass True to remove shards left by an index
+                that was sharded before.
+        """
+        if drop_shards is None:
+            drop_shards = self.shard_by_course
+        try:
+            if drop_shards:
+                with self._shards_lock:
+                    known = list(self._shards)
+                for course_title in {*self.get_existing_course_titles(), *known}:
+                    self._drop_shard(course_title)
             self.client.delete_collection("course_catalog")
             self.client.delete_collection("course_content")
             # Recreate collections
             self.course_catalog = self._create_collection("course_catalog")
             self.course_content = self._create_collection("course_content")
+            self._invalidate_catalog_view()
+            self.course_resolver.set_titles([])
         except Exception as e:
             print(f"Error clearing data: {e}")
+        self._bump_generation()
 
-    def get_existing_course_titles(self) -> List[str]:
-        """Get all existing course titles from the vector store"""
+    def _get_catalog_view(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Materialized view of the catalog: course title -> metadata and lessons.
+
+        Loaded with a single catalog read and reused until the next catalog
+        write, so link and outline lookups are dictionary reads.
+        """
+        view = self._catalog_view
+        if view is not None:
+            return view
+
+        with self._catalog_lock:
+            if self._catalog_view is not None:
+                return self._catalog_view
+            version = self._catalog_version
+            view = self._load_catalog_view()
+            # Only keep the view if no write happened while it was loading
+            if view is not None and version == self._catalog_version:
+                self._catalog_view = view
+            return view or {}
+
+    def _load_catalog_view(self) -> Optional[Dict[str, Dict[str, Any]]]:
         try:
-            # Get all documents from the catalog
             results = self.course_catalog.get()
-            if results and "ids" in results:
-                return results["ids"]
-            return []
         except Exception as e:
-            print(f"Error getting existing course titles: {e}")
-            return []
+            print(f"Error loading course catalog: {e}")
+            return None
+
+        view = {}
+        for course_id, metadata in zip(
+            results.get("ids") or [], results.get("metadatas") or []
+        ):
+            course_meta = dict(metadata or {})
+            lessons = json.loads(course_meta.pop("lessons_json", None) or "[]")
+            course_meta["lessons"] = lessons
+            view[course_id] = {
+                "metadata": course_meta,
+                "lessons": {lesson.get("lesson_number"): lesson for lesson in lessons},
+            }
+        return view
+
+    def _invalidate_catalog_view(self):
+        """Drop the catalog view after a catalog write"""
+        with self._catalog_lock:
+            self._catalog_version += 1
+            self._catalog_view = None
+
+    def get_existing_course_titles(self) -> List[str]:
+        """Get all existing course titles from the vector store"""
+        return list(self._get_catalog_view())
 
     def get_course_count(self) -> int:
         """Get the total number of courses in the vector store"""
-        try:
-            results = self.course_catalog.get()
-            if results and "ids" in results:
-                return len(results["ids"])
-            return 0
-        except Exception as e:
-            print(f"Error getting course count: {e}")
-            return 0
+        return len(self._get_catalog_view())
 
     def get_all_courses_metadata(self) -> List[Dict[str, Any]]:
         """Get metadata for all courses in the vector store"""
-        import json
-
-        try:
-            results = self.course_catalog.get()
-            if results and "metadatas" in results:
-                # Parse lessons JSON for each course
-                parsed_metadata = []
-                for metadata in results["metadatas"]:
-                    course_meta = metadata.copy()
-                    if "lessons_json" in course_meta:
-                        course_meta["lessons"] = json.loads(course_meta["lessons_json"])
-                        del course_meta[
-                            "lessons_json"
-                        ]  # Remove the JSON string version
-                    parsed_metadata.append(course_meta)
-                return parsed_metadata
-            return []
-        except Exception as e:
-            print(f"Error getting courses metadata: {e}")
-            return []
+        return [
+            {**course["metadata"], "lessons": list(course["metadata"]["lessons"])}
+            for course in self._get_catalog_view().values()
+        ]
 
     def get_course_link(self, course_title: str) -> Optional[str]:
         """Get course link for a given course title"""
-        try:
-            # Get course by ID (title is the ID)
-            results = self.course_catalog.get(ids=[course_title])
-            if results and "metadatas" in results and results["metadatas"]:
-                metadata = results["metadatas"][0]
-                return metadata.get("course_link")
-            return None
-        except Exception as e:
-            print(f"Error getting course link: {e}")
-            return None
+        course = self._get_catalog_view().get(course_title)
+        return course["metadata"].get("course_link") if course else None
 
     def get_lesson_link(self, course_title: str, lesson_number: int) -> Optional[str]:
         """Get lesson link for a given course title and lesson number"""
-        import json
-
-        try:
-            # Get course by ID (title is the ID)
-            results = self.course_catalog.get(ids=[course_title])
-            if results and "metadatas" in results and results["metadatas"]:
-                metadata = results["metadatas"][0]
-                lessons_json = metadata.get("lessons_json")
-                if lessons_json:
-                    lessons = json.loads(lessons_json)
-                    # Find the lesson with matching number
-                    for lesson in lessons:
-                        if lesson.get("lesson_number") == lesson_number:
-                            return lesson.get("lesson_link")
+        course = self._get_catalog_view().get(course_title)
+        if not course:
             return None
-        except Exception as e:
-            print(f"Error getting lesson link: {e}")
+        lesson = course["lessons"].get(lesson_number)
+        return lesson.get("lesson_link") if lesson else None
 
     def get_course_outline(self, course_name: str) -> Optional[Dict[str, Any]]:
         """
@@ -303,40 +856,105 @@ class VectorStore:
         Returns:
             Dict with course_title, course_link, and lessons list, or None if not found
         """
-        import json
-
-        try:
-            # Resolve course name using fuzzy matching
-            course_title = self._resolve_course_name(course_name)
-            if not course_title:
-                return None
-
-            # Get course metadata by ID (title is the ID)
-            results = self.course_catalog.get(ids=[course_title])
-            if not results or not results.get("metadatas"):
-                return None
-
-            metadata = results["metadatas"][0]
-
-            # Parse lessons from JSON
-            lessons = []
-            lessons_json = metadata.get("lessons_json")
-            if lessons_json:
-                lessons_data = json.loads(lessons_json)
-                # Extract lesson number and title only
-                for lesson in lessons_data:
-                    lessons.append(
-                        {
-                            "lesson_number": lesson.get("lesson_number"),
-                            "lesson_title": lesson.get("lesson_title"),
-                        }
-                    )
+        generation = self._generation
+        cache_key = ("outline", generation, course_name)
+        outline = self.result_cache.get(cache_key)
+        if outline is not None:
+            return outline
+
+        # Resolve course name using fuzzy matching
+        course_title = self._resolve_course_name(course_name)
+        if not course_title:
+            return None
 
-            return {
-                "course_title": metadata.get("title"),
-                "course_link": metadata.get("course_link"),
-                "lessons": lessons,
-            }
-        except Exception as e:
-            print(f"Error getting course outline: {e}")
+        course = self._get_catalog_view().get(course_title)
+        if not course:
             return None
+
+        metadata = course["metadata"]
+        outline = {
+            "course_title": metadata.get("title"),
+            "course_link": metadata.get("course_link"),
+            "lessons": [
+                {
+                    "lesson_number": lesson.get("lesson_number"),
+                    "lesson_title": lesson.get("lesson_title"),
+                }
+                for lesson in metadata["lessons"]
+            ],
+        }
+        self.result_cache.put(cache_key, outline)
+        return outline
+
+
+class _ContentWriter:
+    """
+    Buffers new content chunks and adds them to a collection in bounded batches.
+
+    With pipelining enabled, each full batch is handed to a background thread
+    for embedding and the previously embedded batch is persisted meanwhile,
+    so embedding batch N+1 overlaps writing batch N. At most two batches are
+    held at once whatever the size of the course.
+    """
+
+    def __init__(self, store: VectorStore, collection):
+        self.store = store
+        self.collection = collection
+        self.documents: List[str] = []
+        self.metadatas: List[Dict[str, Any]] = []
+        self.ids: List[str] = []
+        self.pending: Optional[Tuple[List[str], List[Dict], List[str], Future]] = None
+
+    def add(self, documents: List[str], metadatas: List[Dict], ids: List[str]):
+        """Queue chunks, writing every full batch"""
+        self.documents.extend(documents)
+        self.metadatas.extend(metadatas)
+        self.ids.extend(ids)
+        while len(self.ids) >= self.store.write_batch_size:
+            self._dispatch(self.store.write_batch_size)
+
+    def close(self):
+        """Write any buffered chunks and wait for the last batch to persist"""
+        if self.ids:
+            self._dispatch(len(self.ids))
+        self._persist_pending()
+
+    def abort(self):
+        """Drop buffered chunks and any batch that was not yet persisted"""
+        self.documents, self.metadatas, self.ids = [], [], []
+        if self.pending is not None:
+            self.pending[3].cancel()
+            self.pending = None
+
+    def _dispatch(self, size: int):
+        documents, self.documents = self.documents[:size], self.documents[size:]
+        metadatas, self.metadatas = self.metadatas[:size], self.metadatas[size:]
+        ids, self.ids = self.ids[:size], self.ids[size:]
+
+        if not self.store.pipeline_embeddings:
+            self.collection.add(documents=documents, metadatas=metadatas, ids=ids)
+            return
+
+        # Start embedding this batch, then persist the one embedded before it
+        future = self.store._get_embedding_executor().submit(
+            self.store._embed, documents
+        )
+        previous, self.pending = self.pending, (documents, metadatas, ids, future)
+        self._persist(previous)
+
+    def _persist_pending(self):
+        previous, self.pending = self.pending, None
+        self._persist(previous)
+
+    def _persist(
+        self, batch: Optional[Tuple[List[str], List[Dict], List[str], Future]]
+    ):
+        if batch is None:
+            return
+        documents, metadatas, ids, future = batch
+        self.collection.add(
+            documents=documents,
+            metadatas=metadatas,
+            ids=ids,
+            embeddings=future.result(),
+        )
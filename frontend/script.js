@@ -74,8 +74,15 @@ async function sendMessage() {
     chatMessages.appendChild(loadingMessage);
     chatMessages.scrollTop = chatMessages.scrollHeight;
 
+    // The answer is rendered into the loading message as it streams in
+    let answer = '';
+    let answerStarted = false;
+    let roundStart = 0;
+    const content = loadingMessage.querySelector('.message-content');
+    const loadingHTML = content.innerHTML;
+
     try {
-        const response = await fetch(`${API_URL}/query`, {
+        const response = await fetch(`${API_URL}/query/stream`, {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json',
@@ -86,21 +93,49 @@ async function sendMessage() {
             })
         });
 
-        if (!response.ok) throw new Error('Query failed');
+        if (!response.ok || !response.body) throw new Error('Query failed');
 
-        const data = await response.json();
-        
-        // Update session ID if new
-        if (!currentSessionId) {
-            currentSessionId = data.session_id;
-        }
+        await readEvents(response, (event, data) => {
+            if (event === 'session') {
+                // Update session ID if new
+                if (!currentSessionId) {
+                    currentSessionId = data.session_id;
+                }
+            } else if (event === 'status') {
+                // Text streamed since the last tool round was Claude's remark
+                // before calling tools, not part of the answer
+                answer = answer.slice(0, roundStart);
+                answerStarted = answer.length > 0;
+                if (answerStarted) {
+                    content.innerHTML = marked.parse(answer);
+                } else {
+                    content.innerHTML = loadingHTML;
+                    setLoadingStatus(loadingMessage, data.text);
+                }
+            } else if (event === 'tool') {
+                roundStart = answer.length;
+                if (!answerStarted) {
+                    setLoadingStatus(loadingMessage, describeTool(data));
+                }
+            } else if (event === 'text') {
+                answer += data.text;
+                answerStarted = true;
+                content.innerHTML = marked.parse(answer);
+                chatMessages.scrollTop = chatMessages.scrollHeight;
+            } else if (event === 'sources') {
+                if (data.sources && data.sources.length > 0) {
+                    loadingMessage.insertAdjacentHTML('beforeend', formatSources(data.sources));
+                }
+            } else if (event === 'error') {
+                throw new Error(data.detail);
+            }
+        });
 
-        // Replace loading message with response
-        loadingMessage.remove();
-        addMessage(data.answer, 'assistant', data.sources);
+        if (!answerStarted) throw new Error('No answer received');
+        chatMessages.scrollTop = chatMessages.scrollHeight;
 
     } catch (error) {
-        // Replace loading message with error
+        // Replace loading message (or partial answer) with error
         loadingMessage.remove();
         addMessage(`Error: ${error.message}`, 'assistant');
     } finally {
@@ -110,6 +145,57 @@ async function sendMessage() {
     }
 }
 
+// Read a Server-Sent Events response, calling onEvent(event, data) for each event
+async function readEvents(response, onEvent) {
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+
+    while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+
+        // Events are separated by a blank line
+        let boundary;
+        while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+            const block = buffer.slice(0, boundary);
+            buffer = buffer.slice(boundary + 2);
+
+            let event = 'message';
+            let data = '';
+            block.split('\n').forEach(line => {
+                if (line.startsWith('event:')) event = line.slice(6).trim();
+                else if (line.startsWith('data:')) data += line.slice(5).trim();
+            });
+            onEvent(event, data ? JSON.parse(data) : {});
+        }
+    }
+}
+
+function describeTool(call) {
+    const input = call.input || {};
+    if (call.name === 'get_course_outline') {
+        return `Looking up the outline of ${input.course_name || 'the course'}...`;
+    }
+    if (call.name === 'search_course_content') {
+        return input.course_name
+            ? `Searching ${input.course_name}...`
+            : 'Searching course materials...';
+    }
+    return `Running ${call.name}...`;
+}
+
+function setLoadingStatus(loadingMessage, text) {
+    let status = loadingMessage.querySelector('.loading-status');
+    if (!status) {
+        status = document.createElement('div');
+        status.className = 'loading-status';
+        loadingMessage.querySelector('.message-content').appendChild(status);
+    }
+    status.textContent = text;
+}
+
 function createLoadingMessage() {
     const messageDiv = document.createElement('div');
     messageDiv.className = 'message assistant';
@@ -137,32 +223,7 @@ function addMessage(content, type, sources = null, isWelcome = false) {
     let html = `<div class="message-content">${displayContent}</div>`;
     
     if (sources && sources.length > 0) {
-        // Format sources as clickable links
-        const formattedSources = sources.map(source => {
-            // Handle both object format (with links) and legacy string format
-            if (typeof source === 'object' && source !== null) {
-                const text = source.text || 'Unknown Source';
-                const link = source.lesson_link || source.course_link;
-
-                if (link) {
-                    // Create clickable link that opens in new tab
-                    return `<a href="${escapeHtml(link)}" target="_blank" rel="noopener noreferrer">${escapeHtml(text)}</a>`;
-                } else {
-                    // No link available, display as plain text
-                    return escapeHtml(text);
-                }
-            } else {
-                // Legacy string format - display as plain text
-                return escapeHtml(String(source));
-            }
-        }).join(', ');
-
-        html += `
-            <details class="sources-collapsible">
-                <summary class="sources-header">Sources</summary>
-                <div class="sources-content">${formattedSources}</div>
-            </details>
-        `;
+        html += formatSources(sources);
     }
     
     messageDiv.innerHTML = html;
@@ -172,6 +233,35 @@ function addMessage(content, type, sources = null, isWelcome = false) {
     return messageId;
 }
 
+function formatSources(sources) {
+    // Format sources as clickable links
+    const formattedSources = sources.map(source => {
+        // Handle both object format (with links) and legacy string format
+        if (typeof source === 'object' && source !== null) {
+            const text = source.text || 'Unknown Source';
+            const link = source.lesson_link || source.course_link;
+
+            if (link) {
+                // Create clickable link that opens in new tab
+                return `<a href="${escapeHtml(link)}" target="_blank" rel="noopener noreferrer">${escapeHtml(text)}</a>`;
+            } else {
+                // No link available, display as plain text
+                return escapeHtml(text);
+            }
+        } else {
+            // Legacy string format - display as plain text
+            return escapeHtml(String(source));
+        }
+    }).join(', ');
+
+    return `
+        <details class="sources-collapsible">
+            <summary class="sources-header">Sources</summary>
+            <div class="sources-content">${formattedSources}</div>
+        </details>
+    `;
+}
+
 // Helper function to escape HTML for user messages
 function escapeHtml(text) {
     const div = document.createElement('div');